@@ -8,36 +8,53 @@ from __future__ import annotations
 # ==========================
 from dotenv import load_dotenv
 
-from nodes.voyage_estimate import cargo_block
 load_dotenv()
 
 # ==========================
 # Standard Library Imports
 # ==========================
+import asyncio
+import json
 import os
-import tempfile
-from typing import Any, Dict, Optional
+import queue
+import threading
+from typing import Callable, Optional
 
 # ==========================
 # Third-Party Libraries
 # ==========================
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_community.vectorstores import FAISS
 
 from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
 from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_core.tools import tool
 
-from langgraph.graph import START, StateGraph
+from langgraph.graph import END, START, StateGraph
 from langgraph.prebuilt import ToolNode, tools_condition
 
 # =========================
 # Custom 
 # =========================
-from db.chat_db import checkpointer
+from db.chat_db import checkpointer, create_async_checkpointer
+from db.embedding_cache import EmbeddingCache
+from db.vector_store import ThreadIndexStore
 from models.chat_state import ChatState
+from nodes.compaction import compact_history
+from nodes.voyage_estimate import apipeline_node, dead_end_node, pipeline_node, route_after_pipeline
+from prompt.system_prompt import (
+    COMPACT_SYSTEM_PROMPT,
+    STAGE_STEPS,
+    SYSTEM_PROMPT,
+    SYSTEM_PROMPT_HASH,
+    SYSTEM_PROMPT_VERSION,
+    prompt_stage,
+    step_instructions,
+)
 
+from tools.embedding_batcher import EmbeddingBatcher
+from tools.ingestion_queue import IngestionQueue
+from tools.pdf_stream import PDF_WINDOW_CHUNKS, iter_chunk_windows, iter_pdf_pages, make_splitter, pdf_page_count
+from tools.token_estimate import estimate_tokens
 from tools.voyage_estimate import (
     get_vessels_by_name,
     get_vessel_particulars,
@@ -45,17 +62,28 @@ from tools.voyage_estimate import (
     expected_port_arrivals,
     get_port_distance,
     get_bunker_spotprice_by_port,
+    get_bunker_spotprices_for_ports,
     get_weather_speed,
     match_open_vessels,
     calculate_dwt,
+    record_voyage_inputs,
     compute_voyage_days,
     compute_bunker_consumption,
+    compute_voyage_itinerary,
     calculate_required_freight_rate,
     calculate_reverse_freight_rate,
     calculate_reverse_daily_hire,
     calculate_reverse_tce,
+    calculate_reverse_solutions_batch,
     calculate_voyage_pnl,
-    calculate_quick_voyage_pnl
+    calculate_quick_voyage_pnl,
+    calculate_quick_voyage_pnl_grid,
+    solve_voyage_target,
+    optimise_voyage_speed,
+    simulate_voyage_pnl_risk,
+    rank_open_vessels,
+    bunker_price_store,
+    prefetch_vessel_particulars,
 )
 
 # ==========================
@@ -65,7 +93,8 @@ llm = AzureChatOpenAI(
     azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
     api_key=os.getenv("AZURE_OPENAI_API_KEY"),
     api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-    deployment_name=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME")
+    deployment_name=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
+    stream_usage=True,  # token counts on streamed responses too
 )
 embeddings = AzureOpenAIEmbeddings(
     azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
@@ -77,19 +106,33 @@ embeddings = AzureOpenAIEmbeddings(
 # ==========================
 # PDF RAG Storage (Per Thread)
 # ==========================
-_THREAD_RETRIEVERS: Dict[str, Any] = {}
-_THREAD_METADATA: Dict[str, dict] = {}
-
-def _get_retriever(thread_id: Optional[str]):
-    """Return FAISS retriever for a given thread."""
-    if thread_id and thread_id in _THREAD_RETRIEVERS:
-        return _THREAD_RETRIEVERS[thread_id]
-    return None
-
-def ingest_pdf(file_bytes: bytes, thread_id: str, filename: Optional[str] = None) -> dict:
+# Indexes live on disk (db/vector_store.py) and are memory-mapped back on
+# first use, so a restart costs no embedding calls.
+thread_index_store = ThreadIndexStore()
+
+# Content-addressed chunk embeddings, shared by every thread
+embedding_cache = EmbeddingCache(os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME") or "default")
+
+# Concurrent, quota-aware embedding requests for the chunks the cache misses
+embedding_batcher = EmbeddingBatcher(embeddings.embed_documents)
+
+def ingest_pdf(
+    file_bytes: bytes,
+    thread_id: str,
+    filename: Optional[str] = None,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+    cancelled: Optional[threading.Event] = None,
+) -> dict:
     """
-    Ingest a PDF, split into chunks, embed into FAISS vector store,
-    and attach retriever to the active thread.
+    Ingest a PDF straight from its bytes: pages are read one at a time,
+    split and embedded in windows of PDF_WINDOW_CHUNKS chunks, and each
+    window is added to the thread's index as soon as it is embedded, so
+    memory stays bounded and early pages are searchable before the end.
+
+    `progress(stage, done, total)` is called from the calling thread:
+    "pages" after every window, "embed" as a window's new chunks are embedded.
+    Setting `cancelled` stops the ingest at the next embedding batch or
+    window and drops the partial index (RuntimeError).
 
     Returns:
         dict summary of ingestion metadata.
@@ -97,40 +140,79 @@ def ingest_pdf(file_bytes: bytes, thread_id: str, filename: Optional[str] = None
     if not file_bytes:
         raise ValueError("No bytes received for ingestion.")
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp:
-        temp.write(file_bytes)
-        temp_path = temp.name
+    thread_id = str(thread_id)
+    filename = filename or "document.pdf"
+    total_pages = pdf_page_count(file_bytes)
+
+    def embed_new(new_texts):
+        on_batch = (lambda done, total: progress("embed", done, total)) if progress is not None else None
+        return embedding_batcher.embed(new_texts, progress=on_batch, cancelled=cancelled)
 
+    thread_index_store.begin(thread_id, {"filename": filename, "documents": total_pages, "chunks": 0})
+    chunks = cached = pages_read = 0
     try:
-        loader = PyPDFLoader(temp_path)
-        docs = loader.load()
+        pages = iter_pdf_pages(file_bytes, source=filename)
+        for window, pages_read in iter_chunk_windows(pages, make_splitter(), PDF_WINDOW_CHUNKS):
+            if cancelled is not None and cancelled.is_set():
+                raise RuntimeError("Ingestion cancelled")
 
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000, chunk_overlap=200,
-            separators=["\n\n", "\n", " ", ""]
-        )
-        chunks = splitter.split_documents(docs)
+            # ✅ Only chunks never seen before (any thread) hit the embedding endpoint
+            texts = [c.page_content for c in window]
+            vectors, hits = embedding_cache.embed(texts, embed_new)
+            chunks += len(window)
+            cached += hits
 
-        vector_store = FAISS.from_documents(chunks, embeddings)
-        retriever = vector_store.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": 4}
-        )
+            thread_index_store.extend(
+                thread_id, texts, vectors, [c.metadata for c in window], embeddings,
+                progress={"chunks": chunks, "pages_indexed": pages_read},
+            )
+            if progress is not None:
+                progress("pages", pages_read, total_pages)
 
-        _THREAD_RETRIEVERS[str(thread_id)] = retriever
-        _THREAD_METADATA[str(thread_id)] = {
-            "filename": filename or os.path.basename(temp_path),
-            "documents": len(docs),
-            "chunks": len(chunks),
-        }
+        if chunks == 0:
+            raise ValueError("No extractable text found in the PDF.")
 
-        return _THREAD_METADATA[str(thread_id)]
+        hit_ratio = round(cached / chunks, 4)
+        print(f"✅ Embedding cache: {cached}/{chunks} chunks served from cache ({hit_ratio:.0%})")
 
-    finally:
-        try:
-            os.remove(temp_path)
-        except OSError:
-            pass
+        # ✅ Persisted once complete: index + chunks + manifest entry
+        thread_index_store.finish(thread_id, {
+            "filename": filename,
+            "documents": total_pages,
+            "chunks": chunks,
+            "cached_chunks": cached,
+            "embedding_cache_hit_ratio": hit_ratio,
+        })
+    except BaseException:
+        thread_index_store.abort(thread_id)
+        raise
+
+    if progress is not None:
+        progress("pages", total_pages, total_pages)
+    return thread_document_metadata(thread_id)
+
+
+# Background ingestion: uploads return a job id at once, chat turns never wait
+ingestion_queue = IngestionQueue(ingest_pdf)
+
+
+def submit_pdf_ingestion(file_bytes: bytes, thread_id: str, filename: Optional[str] = None) -> str:
+    """Queue a PDF for background ingestion and return its job id."""
+    return ingestion_queue.submit(file_bytes, str(thread_id), filename)
+
+
+def ingestion_job(job_id: str) -> Optional[dict]:
+    return ingestion_queue.status(job_id)
+
+
+def thread_ingestion_job(thread_id: str) -> Optional[dict]:
+    """The thread's latest ingestion job (queued, running or finished), if any."""
+    jobs = ingestion_queue.jobs(str(thread_id))
+    return jobs[0] if jobs else None
+
+
+def cancel_ingestion(job_id: str) -> bool:
+    return ingestion_queue.cancel(job_id)
 
 
 # ==========================
@@ -142,24 +224,45 @@ def rag_tool(query: str, thread_id: Optional[str] = None) -> dict:
     """
     Retrieve context from uploaded PDF using FAISS vector store.
     """
-    retriever = _get_retriever(thread_id)
-
-    if retriever is None:
+    result = thread_index_store.similarity_search(thread_id, query, embeddings, k=4) if thread_id else None
+    job = ingestion_queue.active_job(str(thread_id)) if thread_id else None
+
+    if result is None:
+        if job is not None:
+            return {
+                "status": "indexing",
+                "message": f"Indexing of {job['filename']} in progress; no pages are searchable yet. Try again shortly.",
+                "query": query,
+            }
         return {
             "error": "No document indexed. Upload a PDF first.",
             "query": query,
         }
 
-    result = retriever.invoke(query)
     context = [d.page_content for d in result]
     metadata = [d.metadata for d in result]
+    document = thread_document_metadata(thread_id)
 
-    return {
+    response = {
         "query": query,
         "context": context,
         "metadata": metadata,
-        "source_file": _THREAD_METADATA.get(str(thread_id), {}).get("filename"),
+        "source_file": document.get("filename"),
     }
+    if document.get("status") == "indexing":
+        # ✅ Partial results: only the pages indexed so far were searched
+        response["status"] = "indexing"
+        response["message"] = (
+            f"Indexing in progress: results cover {document.get('pages_indexed', 0)} of "
+            f"{document.get('documents', '?')} pages of {document.get('filename')}."
+        )
+    elif job is not None:
+        response["status"] = "indexing"
+        response["message"] = (
+            f"{job['filename']} is queued for indexing; results are from the previously indexed "
+            f"{document.get('filename')}."
+        )
+    return response
 
 
 tools = [
@@ -169,26 +272,132 @@ tools = [
     expected_port_arrivals,
     get_port_distance,
     get_bunker_spotprice_by_port,
+    get_bunker_spotprices_for_ports,
     get_weather_speed,
     match_open_vessels,
     calculate_dwt,
+    record_voyage_inputs,
     compute_voyage_days,
     compute_bunker_consumption,
+    compute_voyage_itinerary,
     calculate_required_freight_rate,
     calculate_reverse_freight_rate,
     calculate_reverse_daily_hire,
     calculate_reverse_tce,
+    calculate_reverse_solutions_batch,
     calculate_voyage_pnl,
     calculate_quick_voyage_pnl,
+    calculate_quick_voyage_pnl_grid,
+    solve_voyage_target,
+    optimise_voyage_speed,
+    simulate_voyage_pnl_risk,
+    rank_open_vessels,
     # Rag tool
     rag_tool,
 ]
 
 llm_with_tools = llm.bind_tools(tools)
 
+# Refresh bunker price snapshots for the main hubs in the background
+bunker_price_store.prewarm(os.getenv("BUNKER_PREWARM_PORTS", "").split(","))
+
+
+def _prefetch_fleet_particulars(path: str) -> None:
+    """Warm the particulars cache for our regular tonnage (JSON list of vessel ids)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            fleet = json.load(f)
+        result = prefetch_vessel_particulars(fleet)
+        print(f"✅ Fleet particulars prefetch: {result['cached']} cached, {result['fetched']} fetched, {len(result['failed'])} failed")
+    except (OSError, ValueError) as e:
+        print(f"Fleet particulars prefetch skipped: {e}")
+
+
+if os.getenv("PARTICULARS_PREFETCH_FLEET"):
+    threading.Thread(
+        target=_prefetch_fleet_particulars,
+        args=(os.getenv("PARTICULARS_PREFETCH_FLEET"),),
+        daemon=True,
+    ).start()
+
 # ==========================
 # Chat Node
 # ==========================
+# ✅ Built once: byte-identical prompt prefix on every call (provider prompt caching)
+PROMPT_MODE = os.getenv("CHAT_PROMPT_MODE", "full").strip().lower()
+
+_SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT)
+_COMPACT_SYSTEM_MESSAGE = SystemMessage(content=COMPACT_SYSTEM_PROMPT)
+_STEP_MESSAGES = {stage: SystemMessage(content=step_instructions(stage)) for stage in STAGE_STEPS}
+
+print(
+    f"System prompt v{SYSTEM_PROMPT_VERSION} [{SYSTEM_PROMPT_HASH}] ({PROMPT_MODE}): "
+    f"~{estimate_tokens(COMPACT_SYSTEM_PROMPT if PROMPT_MODE == 'compact' else SYSTEM_PROMPT)} tokens"
+)
+
+
+def _build_chat_messages(state: ChatState) -> tuple:
+    """
+    (messages sent to the model, compaction marks to store).
+
+    The static system prompt always comes first, then the compacted history
+    window (nodes/compaction.py). Anything that changes per call — the facts
+    of compacted turns and, in compact mode, the current step's instructions —
+    goes AFTER the history, so the cached prefix is never disturbed.
+    """
+    history, marks, facts = compact_history(state)
+    trailing = [facts] if facts is not None else []
+
+    if PROMPT_MODE == "compact":
+        trailing.append(_STEP_MESSAGES[prompt_stage(state)])
+        return [_COMPACT_SYSTEM_MESSAGE, *history, *trailing], marks
+    return [_SYSTEM_MESSAGE, *history, *trailing], marks
+
+
+def _chat_update(state: ChatState, response, marks: dict) -> dict:
+    update = {"messages": [response]}
+    update.update({k: v for k, v in marks.items() if v != state.get(k)})
+    return update
+
+
+_TOKEN_USAGE = {"calls": 0, "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0}
+_TOKEN_USAGE_LOCK = threading.Lock()
+
+
+def _report_token_usage(response, state: ChatState) -> None:
+    """Log the provider's token counts for one model call and add them to the totals."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens", 0) or 0
+    output_tokens = usage.get("output_tokens", 0) or 0
+    cached = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+
+    with _TOKEN_USAGE_LOCK:
+        _TOKEN_USAGE["calls"] += 1
+        _TOKEN_USAGE["input_tokens"] += input_tokens
+        _TOKEN_USAGE["cached_input_tokens"] += cached
+        _TOKEN_USAGE["output_tokens"] += output_tokens
+
+    stage = prompt_stage(state) if PROMPT_MODE == "compact" else "all"
+    print(
+        f"📊 chat_node tokens (prompt v{SYSTEM_PROMPT_VERSION}, {PROMPT_MODE}/{stage}): "
+        f"input={input_tokens} cached={cached} output={output_tokens}"
+    )
+
+
+def _chat_node_fallback(e: Exception) -> dict:
+    # ✅ LOG FULL ERROR FOR BACKEND DEBUGGING
+    print("❌ CHAT NODE ERROR:", str(e))
+
+    # ✅ CLIENT-SAFE FALLBACK MESSAGE
+    fallback_message = SystemMessage(  # type: ignore
+        content="⚠️ Due to a temporary network or system issue, we are unable to process your request at the moment. Please try again in a few seconds."
+    )
+
+    return {
+        "messages": [fallback_message]
+    }
+
+
 def chat_node(state: ChatState, config=None):
     """
     Main LLM Node:
@@ -197,448 +406,25 @@ def chat_node(state: ChatState, config=None):
     - Use PDF RAG if available for thread
     """
     try:
-        thread_id = None
-        if config and isinstance(config, dict):
-            thread_id = config.get("configurable", {}).get("thread_id")
-
-        system_message = SystemMessage( # type: ignore
-            content=("""
-                You are an Automated Voyage Calculation Agent for maritime chartering, operations, and freight estimation.
-
-                Your responsibility is to execute the complete voyage calculation flow in a STRICTLY SEQUENTIAL, DETERMINISTIC, and TOOL-DRIVEN manner with MINIMAL user interruption.
-
-                ======================================================================
-                GLOBAL OUTPUT & FORMAT RULES (ABSOLUTE PRIORITY)
-                ======================================================================
-
-                1. ALL user-visible numeric data MUST be rendered STRICTLY in MARKDOWN TABLE FORMAT.
-                2. You are STRICTLY FORBIDDEN from presenting numbers in:
-                - Plain text
-                - Bullet points
-                - Paragraphs
-                - Inline explanations
-                3. Any response containing numeric values outside a table is INVALID.
-                4. Tables MUST:
-                - Have headers
-                - Be logically grouped
-                - Use consistent units
-                5. Explanatory text (if required) may appear ONLY AFTER the table(s).
-                6. If you violate any of these rules, you MUST immediately re-render the same data in proper table format.
-
-                This rule OVERRIDES all default conversational behavior.
-
-                ======================================================================
-                CORE BEHAVIOR RULES
-                ======================================================================
-
-                You MUST:
-                - Always use the provided tools for calculations and vessel intelligence.
-                - Never assume numeric values.
-                - Never skip any mandatory step.
-                - Never ask unnecessary questions.
-                - Ask the user ONLY when explicitly instructed below or when a tool returns:
-                "status": "manual_input_required"
-                - Never re-ask for values that are already available.
-                - NEVER re-parse vessel speed or bunker consumption once validated and non-zero.
-
-                ======================================================================
-                GENERAL RULE FOR TOOL ERRORS / MANUAL INPUT
-                ======================================================================
-
-                If ANY tool returns:
-                "status": "manual_input_required"
-
-                You MUST:
-                - Display the tool’s "message" field almost verbatim (NO rewording).
-                - Ask ONLY for the exact values mentioned in that message.
-                - After the user provides the values, IMMEDIATELY call the SAME tool again.
-                - Do NOT invent additional fields.
-                - Do NOT skip any step.
-
-                If a tool returns:
-                "status": "success"
-
-                You MUST proceed to the next step IMMEDIATELY.
-
-                ======================================================================
-                STRICT EXECUTION FLOW (DO NOT DEVIATE)
-                ======================================================================
-
-                ------------------------------------------------------------
-                1. INPUT COLLECTION (MANDATORY — USER PROMPT)
-                ------------------------------------------------------------
-                Collect EXACTLY the following FIVE inputs:
-
-                - Cargo quantity (MT)
-                - Freight rate ($/MT or Lumpsum)
-                - Load port
-                - Discharge port
-                - Hire rate ($/Day)
-
-                RULES:
-                - If ANY input is missing → request ONLY the missing value(s).
-                - Do NOT proceed until ALL FIVE inputs are available.
-                - Do NOT display tables at this step.
-                     
-                ------------------------------------------------------------
-                1B. OPTIONAL INPUT COLLECTION (AFTER MANDATORY FIELDS ONLY)
-                ------------------------------------------------------------
-                After ALL FIVE mandatory inputs are collected, ask the user ONCE for the following OPTIONAL inputs:
-
-                Optional Inputs:
-                1. Weather factor (%)
-                2. Address commission (%)
-
-                Ask EXACTLY:
-                "Optional inputs (press Enter / say 'skip' to ignore):
-                1) Weather factor (%) 
-                2) Address commission (%)
-
-                RULES:
-                - If user provides a value → store it internally.
-                - If user says "skip" / provides blank / refuses → store default values internally:
-                - weather_factor_pct = 0
-                - address_commission_pct = 0
-                - Do NOT ask optional inputs again later.
-                - Do NOT display tables at this step.
-                - Continue immediately to Step 2 (DWT CALCULATION).
-
-                ------------------------------------------------------------
-                2. DWT CALCULATION (AUTOMATIC TOOL CALL)
-                ------------------------------------------------------------
-                Once cargo quantity is received:
-
-                CALL:
-                - calculate_dwt(cargo_quantity)
-
-                FORMULA:
-                DWT = Cargo Quantity + 10%
-
-                Store internally:
-                - dwt (INTEGER, STRING FORMAT)
-
-                DO NOT ask the user anything.
-                DO NOT display output.
-
-                ------------------------------------------------------------
-                3. BEST MATCH VESSEL (AUTOMATIC TOOL CALL + USER SELECTION)
-                ------------------------------------------------------------
-                Using:
-                - dwt (from Step 2, as STRING)
-                - open_port (load port)
-
-                CALL:
-                - match_open_vessels(dwt, open_port)
-
-                DISPLAY vessel options STRICTLY in TABLE FORMAT with ONLY:
-                - Vessel Name
-                - DWT
-                - Open Date
-                - Open Port
-                - Flag
-                - Cranes
-                - Build Year
-
-                Then ask EXACTLY:
-                "Please select ONE vessel from the above list."
-
-                DO NOT proceed without a valid selection.
-
-                ------------------------------------------------------------
-                4. VESSEL IDENTIFIERS & PARTICULARS (FULLY AUTOMATIC)
-                ------------------------------------------------------------
-                After vessel selection:
-
-                STEP 4A — Retrieve identifiers:
-                CALL:
-                - get_vessels_by_name(vessel_name)
-
-                Store internally:
-                - MMSI
-                - IMO
-                - Ship ID
-                - Vessel Name
-
-                STEP 4B — Retrieve vessel particulars:
-                CALL:
-                - get_vessel_particulars(mmsi, imo, ship_id, vessel_name)
-
-                Store internally:
-                - Raw speed & consumption string
-                - Vessel DWT
-                - Build year
-                - Technical specs
-
-                DO NOT ask the user anything.
-                DO NOT display output.
-
-                ------------------------------------------------------------
-                5. ROUTE DISTANCE (AUTOMATIC TOOL CALL)
-                ------------------------------------------------------------
-                CALL:
-                - get_port_distance(from_port=load_port, to_port=discharge_port)
-
-                Store internally:
-                - Total distance (NM)
-                - Route legs
-                - SECA / Canal / Piracy data
-
-                DISPLAY route summary in TABLE FORMAT.
-
-                ------------------------------------------------------------
-                6. SPEED & BUNKER CONSUMPTION PARSING (SINGLE SOURCE OF TRUTH)
-                ------------------------------------------------------------
-                CALL:
-                - parse_speed_and_consumption_ai(speed_and_consumption)
-
-                If status = "success":
-                - Validate ALL values > 0
-                - If ANY value is zero or missing → TREAT AS manual_input_required
-
-                If status = "manual_input_required":
-                - Display tool message verbatim
-                - Ask ONLY for missing values
-                - Re-call the SAME tool
-                - Repeat UNTIL status = success AND all values > 0
-
-                Once validated:
-                STORE internally:
-                - Ballast speed
-                - Laden speed
-                - Ballast consumption
-                - Laden consumption
-                - Fuel type
-                - Parse mode
-
-                DISPLAY validated values in TABLE FORMAT.
-
-                STRICT RULE:
-                Once validated, NEVER ask for speed or consumption again.
-
-                ------------------------------------------------------------
-                7. VOYAGE DAYS (PURE CALCULATION)
-                ------------------------------------------------------------
-                CALL:
-                - compute_voyage_days(
-                    route_distance,
-                    parsed_ballast_speed,
-                    parsed_laden_speed
-                )
-
-                Store internally:
-                - voyage_days
-
-                DISPLAY voyage days in TABLE FORMAT.
-
-                ------------------------------------------------------------
-                8. BUNKER CONSUMPTION (PURE CALCULATION)
-                ------------------------------------------------------------
-                CALL:
-                - compute_bunker_consumption(
-                    voyage_days,
-                    parsed_ballast_consumption,
-                    parsed_laden_consumption,
-                    fuel_type
-                )
-
-                Store internally:
-                - total_bunker_mt
-                - fuel_type
-
-                DISPLAY bunker consumption in TABLE FORMAT.
-
-                ------------------------------------------------------------
-                9. BUNKER PRICE & BUNKER COST (SINGLE USER CONFIRMATION)
-                ------------------------------------------------------------
-
-                STEP 9A — Fetch prices:
-                CALL:
-                - get_bunker_spotprice_by_port(load_port)
-                - get_bunker_spotprice_by_port(discharge_port)
-
-                Extract:
-                - Price for fuel_type
-
-                STEP 9B — Ask ONCE:
-                "Current bunker price for {fuel_type} at {port} is approximately {price}/MT.
-                Do you want to use this price or enter your own bunker price per MT?"
-
-                RULES:
-                - If ACCEPT → use API price
-                - If OVERRIDE → use user value
-
-                STEP 9C — Calculate:
-                bunker_cost = total_bunker_mt × bunker_price_per_mt
-
-                DISPLAY bunker price & bunker cost in TABLE FORMAT.
-
-                ------------------------------------------------------------
-                10. MISCELLANEOUS COSTS (SINGLE PROMPT + EXPLICIT BREAKDOWN)
-                ------------------------------------------------------------
-                Ask ONCE:
-                "Do you want to add any additional voyage costs such as port charges, canal fees, commissions, or other miscellaneous expenses?"
-
-                RULES:
-                - If YES → collect each cost item separately with name and amount
-                - If NO → set all to zero
-
-                MANDATORY INTERNAL STORAGE:
-                - port_cost_usd
-                - canal_cost_usd
-                - broker_commission_usd
-                - address_commission_usd
-                - other_misc_cost_usd
-
-                DISPLAY a table titled:
-                "MISCELLANEOUS / OTHER COSTS"
-
-                TABLE COLUMNS:
-                - Cost Type
-                - Amount ($)
-
-                Include rows ONLY for non-zero values.
-
-                DO NOT merge these costs yet.
-
-                     
-                ------------------------------------------------------------
-                10B. POST-COST MODIFICATION HANDLING (MANDATORY)
-                ------------------------------------------------------------
-                If AFTER Step 10 the user adds or modifies any cost (e.g. "add 5000 misc cost"):
-
-                RULES (ABSOLUTE):
-                - DO NOT re-ask Step 10 questions
-                - DO NOT discard previously collected costs
-                - You MUST:
-                1. Update the relevant internal cost variable
-                2. Re-display the FULL "MISCELLANEOUS / OTHER COSTS" table
-                3. Recalculate Total Voyage Cost
-                4. Re-run Step 11 (Final PNL)
-
-                STRICT:
-                - Costs are CUMULATIVE unless user explicitly says "replace"
-                - Missing cost category defaults to "other_misc_cost_usd"
-                               
-                ------------------------------------------------------------
-                11. FINAL PNL & PERFORMANCE METRICS (AUTOMATIC TOOL CALL)
-                ------------------------------------------------------------
-
-                BEFORE calling the PNL tool:
-
-                MANDATORY PRE-CHECK:
-                - You MUST aggregate ALL cost components collected so far:
-                - bunker_cost_usd
-                - port_cost_usd
-                - canal_cost_usd
-                - broker_commission_usd
-                - address_commission_usd
-                - other_misc_cost_usd
-
-                - Costs are CUMULATIVE.
-                - Do NOT reset or overwrite any previously stored cost unless user explicitly says "replace".
-
-                ------------------------------------------------------------
-                11A. DISPLAY COST BREAKDOWN (MANDATORY)
-                ------------------------------------------------------------
-                If ANY of the following is non-zero:
-                - port_cost_usd
-                - canal_cost_usd
-                - broker_commission_usd
-                - address_commission_usd
-                - other_misc_cost_usd
-
-                YOU MUST display a table titled:
-                "MISCELLANEOUS / OTHER COSTS"
-
-                TABLE FORMAT:
-                - Cost Type
-                - Amount ($)
-
-                Include ONLY non-zero rows.
-
-                ------------------------------------------------------------
-                11B. FINAL PNL CALCULATION (AUTOMATIC TOOL CALL)
-                ------------------------------------------------------------
-                CALL:
-                - calculate_quick_voyage_pnl(
-                    cargo_quantity_mt,
-                    freight_rate,
-                    freight_is_lumpsum,
-                    voyage_days,
-                    hire_rate_per_day,
-                    total_bunker_mt,
-                    bunker_price_per_mt,
-                    port_cost_usd,
-                    other_misc_cost_usd,
-                    canal_cost_usd,
-                    broker_commission_pct,
-                    address_commission_pct
-                )
-
-                ------------------------------------------------------------
-                11C. FINAL OUTPUT (STRICT DISPLAY RULE)
-                ------------------------------------------------------------
-                YOU MUST DISPLAY FINAL OUTPUT STRICTLY IN TABLE FORMAT INCLUDING:
-                - Total Revenue
-                - Total Voyage Cost
-                - Net PNL
-                - Daily Profit
-                - TCE
-                - Gross TCE
-                - Breakeven Freight
-
-                STRICT VALIDATION RULE:
-                Total Voyage Cost MUST EQUAL:
-                bunker_cost
-                + port_cost_usd
-                + canal_cost_usd
-                + broker_commission_usd
-                + address_commission_usd
-                + other_misc_cost_usd
-
-                If this equality is not satisfied → OUTPUT IS INVALID AND MUST BE RE-RENDERED.
-
-                NO narrative summary before the tables.
-
-                ------------------------------------------------------------
-                12. REPORT OPTION (FINAL USER QUESTION)
-                ------------------------------------------------------------
-                Ask EXACTLY:
-                "Do you want a downloadable PDF report for this voyage?"
-
-                - If YES → Generate PDF
-                - If NO → End process
-
-                ======================================================================
-                START
-                ======================================================================
-
-                Begin ONLY by requesting the five mandatory inputs:
-                - Cargo quantity
-                - Freight rate
-                - Load port
-                - Discharge port
-                - Hire rate
-
-            """)
-        )
-
-        messages = [system_message, *state["messages"]]
+        messages, marks = _build_chat_messages(state)
         response = llm_with_tools.invoke(messages, config=config)
-        return {"messages": [response]}
-    
+        _report_token_usage(response, state)
+        return _chat_update(state, response, marks)
+
     except Exception as e:
-        # ✅ LOG FULL ERROR FOR BACKEND DEBUGGING
-        print("❌ CHAT NODE ERROR:", str(e))
+        return _chat_node_fallback(e)
 
-        # ✅ CLIENT-SAFE FALLBACK MESSAGE
-        fallback_message = SystemMessage(  # type: ignore
-            content="⚠️ Due to a temporary network or system issue, we are unable to process your request at the moment. Please try again in a few seconds."
-        )
 
-        return {
-            "messages": [fallback_message]
-        }
+async def achat_node(state: ChatState, config=None):
+    """Async twin of chat_node, used when the graph runs via ainvoke/astream."""
+    try:
+        messages, marks = _build_chat_messages(state)
+        response = await llm_with_tools.ainvoke(messages, config=config)
+        _report_token_usage(response, state)
+        return _chat_update(state, response, marks)
+
+    except Exception as e:
+        return _chat_node_fallback(e)
 
 
 # ==========================
@@ -650,16 +436,73 @@ tool_node = ToolNode(tools)
 # ==========================
 # Build LangGraph
 # ==========================
+# pipeline: deterministic steps (DWT, match, particulars, speeds, distance,
+# itinerary, bunker prices) run without a model call once their inputs are
+# recorded; the model only handles extraction and the user dialogue.
 graph = StateGraph(ChatState)
-graph.add_node("chat_node", chat_node)
+graph.add_node("pipeline", RunnableLambda(pipeline_node, afunc=apipeline_node))
+graph.add_node("dead_end", dead_end_node)
+graph.add_node("chat_node", RunnableLambda(chat_node, afunc=achat_node))
 graph.add_node("tools", tool_node)
 
-graph.add_edge(START, "chat_node")
+graph.add_edge(START, "pipeline")
+graph.add_conditional_edges("pipeline", route_after_pipeline, {"chat_node": "chat_node", "dead_end": "dead_end"})
+graph.add_edge("dead_end", END)
 graph.add_conditional_edges("chat_node", tools_condition)
-graph.add_edge("tools", "chat_node")
+graph.add_edge("tools", "pipeline")
 
 chatbot = graph.compile(checkpointer=checkpointer)
 
+# ==========================
+# Async Runtime
+# ==========================
+# A single long-lived event loop owns the async checkpointer and the pooled
+# httpx clients; sync callers (Streamlit) submit work to it.
+_ASYNC_LOOP = asyncio.new_event_loop()
+threading.Thread(
+    target=_ASYNC_LOOP.run_forever, name="chatbot-async-loop", daemon=True
+).start()
+
+
+def run_async(coro):
+    """Run a coroutine on the backend event loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _ASYNC_LOOP).result()
+
+
+async_checkpointer = run_async(create_async_checkpointer())
+achatbot = graph.compile(checkpointer=async_checkpointer)
+
+_STREAM_DONE = object()
+
+
+def stream_chat(inputs: dict, config: dict, stream_mode: str = "messages"):
+    """
+    Sync generator over achatbot.astream(...).
+    Tool calls emitted in the same model turn are awaited concurrently.
+    """
+    items: queue.Queue = queue.Queue()
+
+    async def _pump():
+        try:
+            async for item in achatbot.astream(inputs, config=config, stream_mode=stream_mode):
+                items.put(item)
+        finally:
+            items.put(_STREAM_DONE)
+
+    future = asyncio.run_coroutine_threadsafe(_pump(), _ASYNC_LOOP)
+
+    try:
+        while (item := items.get()) is not _STREAM_DONE:
+            yield item
+
+        # Re-raise anything the graph run failed with
+        future.result()
+    finally:
+        # Consumer stopped early (Streamlit rerun / stop closes the generator):
+        # stop the graph run instead of letting it finish on the loop
+        future.cancel()
+
+
 # ==========================
 # Helper Utilities
 # ==========================
@@ -672,11 +515,24 @@ def retrieve_all_threads():
 
 
 def thread_has_document(thread_id: str) -> bool:
-    return str(thread_id) in _THREAD_RETRIEVERS
+    return thread_index_store.has_document(str(thread_id))
 
 
 def thread_document_metadata(thread_id: str) -> dict:
-    return _THREAD_METADATA.get(str(thread_id), {})
+    """
+    filename / documents / chunks / cache share of the thread's indexed PDF,
+    from the persisted manifest — or, while it is still being indexed,
+    status "indexing" with the pages / chunks indexed so far.
+    """
+    meta = thread_index_store.metadata(str(thread_id))
+    keys = ("filename", "documents", "chunks", "cached_chunks", "embedding_cache_hit_ratio", "status", "pages_indexed")
+    return {k: meta[k] for k in keys if k in meta}
+
+
+def chat_token_usage() -> dict:
+    """Model calls and token totals since start-up (cached = served from the prompt cache)."""
+    with _TOKEN_USAGE_LOCK:
+        return {**_TOKEN_USAGE, "prompt_version": SYSTEM_PROMPT_VERSION, "prompt_mode": PROMPT_MODE}
 
 
 # ==========================
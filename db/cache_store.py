@@ -0,0 +1,188 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+# ==========================
+# SQLite Cache Store
+# ==========================
+CACHE_DB_PATH = os.getenv("VOYAGE_CACHE_DB", "cache.db")
+
+
+def is_cacheable(data) -> bool:
+    """Only keep non-empty, non-error API responses ({"status": "error"} or {"error": ...})."""
+    if not data:
+        return False
+    if isinstance(data, dict) and (data.get("status") == "error" or "error" in data):
+        return False
+    return True
+
+
+class SqliteCache:
+    """
+    Persistent key/value cache backed by one SQLite table per namespace.
+
+    - Values are stored as JSON (optionally zlib-compressed).
+    - Entries older than `ttl_seconds` are treated as misses by get().
+    - When `max_entries` is exceeded, least-recently-used rows are evicted.
+    - hits / misses / expired / evictions are counted in-process.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        compress: bool = False,
+    ):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", namespace):
+            raise ValueError(f"Invalid cache namespace: {namespace!r}")
+
+        self.namespace = namespace
+        self.path = path or CACHE_DB_PATH
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.compress = compress
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+        self._table = f"cache_{namespace}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table} ("
+                "key TEXT PRIMARY KEY, "
+                "value BLOB NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self._table}_accessed "
+                f"ON {self._table} (accessed_at)"
+            )
+
+    # ------------------------------
+    # Serialization
+    # ------------------------------
+    def _dump(self, value: Any) -> bytes:
+        raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        return zlib.compress(raw) if self.compress else raw
+
+    def _load(self, blob: bytes) -> Any:
+        raw = zlib.decompress(blob) if self.compress else blob
+        return json.loads(raw)
+
+    # ------------------------------
+    # Reads
+    # ------------------------------
+    def lookup(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Return (value, age_seconds) regardless of TTL, or None if absent.
+        Does not touch the hit/miss counters.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self._table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+
+        return self._load(row[0]), now - row[1]
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """Return the cached value if present and younger than max_age (default: TTL)."""
+        entry = self.lookup(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, age = entry
+        limit = self.ttl_seconds if max_age is None else max_age
+        if limit is not None and age > limit:
+            self.expired += 1
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Yield every (key, value) pair regardless of TTL (bulk loads)."""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT key, value FROM {self._table}").fetchall()
+
+        for key, blob in rows:
+            yield key, self._load(blob)
+
+    # ------------------------------
+    # Writes
+    # ------------------------------
+    def set(self, key: str, value: Any) -> None:
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """Insert/replace several entries in one transaction."""
+        now = time.time()
+        rows = [(key, self._dump(value), now, now) for key, value in items]
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+            if self.max_entries is not None:
+                cur = self._conn.execute(
+                    f"DELETE FROM {self._table} WHERE key IN ("
+                    f"SELECT key FROM {self._table} ORDER BY accessed_at ASC "
+                    f"LIMIT MAX(0, (SELECT COUNT(*) FROM {self._table}) - ?))",
+                    (self.max_entries,),
+                )
+                self.evictions += max(cur.rowcount, 0)
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self._table}")
+
+    # ------------------------------
+    # Metrics
+    # ------------------------------
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -6,10 +6,23 @@ import sqlite3
 # ==========================
 # Third-Party Libraries
 # ==========================
+import aiosqlite
 from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
 # ==========================
 # SQLite Checkpoint Store
 # ==========================
-conn = sqlite3.connect(database="chatbot.db", check_same_thread=False)
-checkpointer = SqliteSaver(conn=conn)
\ No newline at end of file
+DB_PATH = "chatbot.db"
+
+conn = sqlite3.connect(database=DB_PATH, check_same_thread=False)
+checkpointer = SqliteSaver(conn=conn)
+
+
+async def create_async_checkpointer() -> AsyncSqliteSaver:
+    """
+    Async checkpointer over the same database, used for ainvoke/astream runs.
+    Must be created on the event loop that will drive the graph.
+    """
+    aconn = await aiosqlite.connect(DB_PATH)
+    return AsyncSqliteSaver(conn=aconn)
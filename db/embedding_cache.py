@@ -0,0 +1,158 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# ==========================
+# Third-Party Libraries
+# ==========================
+import numpy as np
+
+# ==========================
+# Embedding Cache
+# ==========================
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache")
+
+VECTORS_FILE = "vectors.f32"
+KEYS_FILE = "keys.txt"
+META_FILE = "meta.json"
+
+KEY_LINE = 65  # sha256 hex digest + newline
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_chunk(text: str) -> str:
+    """NFC + collapsed whitespace: the same clause re-extracted from another upload hashes the same."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def chunk_key(text: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_chunk(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache, one directory per embedding model.
+
+    - vectors.f32: append-only float32 rows (row-major, `dim` columns).
+    - keys.txt: append-only sha256(model + normalized text), one line per
+      row; the key → row dict is rebuilt from it at load.
+    - meta.json: {"model", "dim"}, written once.
+
+    An append writes only the new rows and keys (vectors first), so its cost
+    does not grow with the cache. Rows or keys past the shorter of the two
+    files (an interrupted append) are ignored and overwritten by the next
+    append.
+    """
+
+    def __init__(self, model: str, root: Optional[str] = None):
+        self.model = model
+        safe = "".join(c for c in model if c.isalnum() or c in "-_.") or "default"
+        self.directory = os.path.join(root or EMBEDDING_CACHE_DIR, safe)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        self._keys_path = os.path.join(self.directory, KEYS_FILE)
+        self._meta_path = os.path.join(self.directory, META_FILE)
+        self._lock = threading.Lock()
+
+        self.dim: Optional[int] = None
+        self._rows: Dict[str, int] = {}
+        self._count = 0  # rows stored (a key appended twice by two processes counts twice)
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f).get("dim")
+        except (OSError, ValueError):
+            pass
+        if self.dim:
+            self._load_keys()
+
+    def _load_keys(self) -> None:
+        try:
+            stored = os.path.getsize(self._vectors_path) // (self.dim * 4)
+            with open(self._keys_path, "r", encoding="ascii") as f:
+                lines = f.read().split("\n")
+        except (OSError, ValueError):
+            return
+        for row, key in enumerate(lines[:stored]):
+            if len(key) != KEY_LINE - 1:
+                break  # torn last line
+            self._rows.setdefault(key, row)
+            self._count = row + 1
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _read(self, rows: Sequence[int]) -> np.ndarray:
+        vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r").reshape(-1, self.dim)
+        return np.array(vectors[np.asarray(rows, dtype=np.int64)])
+
+    def _append(self, keys: List[str], vectors: np.ndarray) -> None:
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            tmp = f"{self._meta_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model, "dim": self.dim}, f)
+            os.replace(tmp, self._meta_path)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding size changed ({vectors.shape[1]} ≠ {self.dim}) for model {self.model}")
+
+        start = self._count
+        with open(self._vectors_path, "r+b" if os.path.exists(self._vectors_path) else "wb") as f:
+            f.seek(start * self.dim * 4)
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            f.truncate()
+
+        with open(self._keys_path, "r+b" if os.path.exists(self._keys_path) else "wb") as f:
+            f.seek(start * KEY_LINE)
+            f.write("".join(f"{key}\n" for key in keys).encode("ascii"))
+            f.truncate()
+
+        for offset, key in enumerate(keys):
+            self._rows[key] = start + offset
+        self._count = start + len(keys)
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def embed(self, texts: Sequence[str], embed_fn: Callable[[List[str]], List[List[float]]]) -> Tuple[List[List[float]], int]:
+        """
+        Embeddings for `texts` (in order) and how many came from the cache.
+        Only distinct uncached texts are passed to `embed_fn`.
+        """
+        keys = [chunk_key(t, self.model) for t in texts]
+
+        with self._lock:
+            cached = {k: self._rows[k] for k in set(keys) if k in self._rows}
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        fresh: Dict[str, np.ndarray] = {}
+        if missing:
+            vectors = np.asarray(embed_fn(list(missing.values())), dtype=np.float32)
+            with self._lock:
+                new_keys = [k for k in missing if k not in self._rows]
+                if new_keys:
+                    positions = {k: i for i, k in enumerate(missing)}
+                    self._append(new_keys, vectors[[positions[k] for k in new_keys]])
+            fresh = dict(zip(missing, vectors))
+
+        stored: Dict[str, np.ndarray] = {}
+        if cached:
+            with self._lock:
+                rows = self._read(list(cached.values()))
+            stored = dict(zip(cached, rows))
+
+        result = [(fresh[k] if k in fresh else stored[k]).tolist() for k in keys]
+        hits = sum(1 for k in keys if k in cached)
+        return result, hits
@@ -0,0 +1,222 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# ==========================
+# Third-Party Libraries
+# ==========================
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+# ==========================
+# Persistent Thread Index Store
+# ==========================
+RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR", "rag_indexes")
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.json"
+MANIFEST_FILE = "manifest.json"
+
+
+def _atomic_write_json(path: str, data: Any) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class ThreadIndexStore:
+    """
+    Per-thread FAISS indexes on disk.
+
+    - save() writes the FAISS index, the chunks (JSON, no pickle) and the
+      thread's entry in manifest.json.
+    - load() memory-maps the index file back read-only on first use and
+      keeps it, so the vectors stay in the page cache rather than the heap
+      and a restart costs no embedding calls. A loaded index is never added
+      to (FAISS aborts on it); a new document is a new build.
+    - has_document() / metadata() answer from the manifest alone.
+    - begin() / extend() / finish() build an index incrementally in memory;
+      similarity_search() already answers from the partial index (which
+      takes precedence over the thread's previous document) while it grows.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or RAG_INDEX_DIR
+        self._lock = threading.Lock()
+        self._loaded: Dict[str, FAISS] = {}
+        self._building: Dict[str, dict] = {}
+
+        os.makedirs(self.root, exist_ok=True)
+        self._manifest_path = os.path.join(self.root, MANIFEST_FILE)
+        self._manifest: Dict[str, dict] = self._read_manifest()
+
+    def _read_manifest(self) -> Dict[str, dict]:
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _thread_dir(self, thread_id: str) -> str:
+        # Thread ids are UUIDs / ints; keep only safe characters in the directory name
+        safe = "".join(c for c in str(thread_id) if c.isalnum() or c in "-_")
+        return os.path.join(self.root, safe or "default")
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def save(self, thread_id: str, vector_store: FAISS, metadata: dict) -> dict:
+        """Persist a thread's index (replacing any previous one) and return its manifest entry."""
+        thread_id = str(thread_id)
+        directory = self._thread_dir(thread_id)
+        staging = f"{directory}.staging"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        ids = [vector_store.index_to_docstore_id[i] for i in range(vector_store.index.ntotal)]
+        docs = [vector_store.docstore.search(doc_id) for doc_id in ids]
+
+        faiss.write_index(vector_store.index, os.path.join(staging, INDEX_FILE))
+        _atomic_write_json(
+            os.path.join(staging, DOCSTORE_FILE),
+            [{"id": i, "page_content": d.page_content, "metadata": d.metadata} for i, d in zip(ids, docs)],
+        )
+
+        entry = {**metadata, "thread_id": thread_id, "saved_at": time.time(), "vectors": len(ids)}
+
+        with self._lock:
+            shutil.rmtree(directory, ignore_errors=True)
+            os.replace(staging, directory)
+            self._manifest[thread_id] = entry
+            _atomic_write_json(self._manifest_path, self._manifest)
+            self._loaded[thread_id] = vector_store
+
+        return entry
+
+    def load(self, thread_id: str, embeddings) -> Optional[FAISS]:
+        """The thread's vector store, memory-mapped from disk on first use (None if never indexed)."""
+        thread_id = str(thread_id)
+        with self._lock:
+            if thread_id in self._loaded:
+                return self._loaded[thread_id]
+            if thread_id not in self._manifest:
+                return None
+
+            directory = self._thread_dir(thread_id)
+            try:
+                # IO_FLAG_MMAP is ignored by flat indexes; MMAP_IFC maps their vectors
+                index = faiss.read_index(
+                    os.path.join(directory, INDEX_FILE), faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+                )
+                with open(os.path.join(directory, DOCSTORE_FILE), "r", encoding="utf-8") as f:
+                    rows = json.load(f)
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f"❌ RAG index for thread {thread_id} unreadable: {e}")
+                return None
+
+            vector_store = FAISS(
+                embedding_function=embeddings,
+                index=index,
+                docstore=InMemoryDocstore(
+                    {r["id"]: Document(page_content=r["page_content"], metadata=r["metadata"]) for r in rows}
+                ),
+                index_to_docstore_id={i: r["id"] for i, r in enumerate(rows)},
+            )
+            self._loaded[thread_id] = vector_store
+            return vector_store
+
+    def similarity_search(self, thread_id: str, query: str, embeddings, k: int = 4) -> Optional[List[Document]]:
+        """Top-k chunks from the thread's index, partial or saved (None if it has none)."""
+        thread_id = str(thread_id)
+        build = self._building.get(thread_id)
+        if build is not None and build["store"] is not None:
+            vector = embeddings.embed_query(query)
+            with build["lock"]:  # FAISS adds and searches must not overlap
+                return build["store"].similarity_search_by_vector(vector, k=k)
+
+        vector_store = self.load(thread_id, embeddings)
+        if vector_store is None:
+            return None
+        return vector_store.similarity_search(query, k=k)
+
+    def has_document(self, thread_id: str) -> bool:
+        thread_id = str(thread_id)
+        build = self._building.get(thread_id)
+        return thread_id in self._manifest or (build is not None and build["store"] is not None)
+
+    def metadata(self, thread_id: str) -> dict:
+        thread_id = str(thread_id)
+        build = self._building.get(thread_id)
+        if build is not None:
+            with build["lock"]:
+                return dict(build["metadata"])
+        return dict(self._manifest.get(thread_id, {}))
+
+    # ------------------------------
+    # Incremental Builds
+    # ------------------------------
+    def begin(self, thread_id: str, metadata: dict) -> None:
+        """Start (or restart) an in-memory build for the thread."""
+        with self._lock:
+            self._building[str(thread_id)] = {
+                "store": None,
+                "lock": threading.Lock(),
+                "metadata": {**metadata, "thread_id": str(thread_id), "status": "indexing", "vectors": 0},
+            }
+
+    def extend(
+        self,
+        thread_id: str,
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        metadatas: Sequence[dict],
+        embeddings,
+        progress: Optional[dict] = None,
+    ) -> None:
+        """Add pre-embedded chunks to the thread's build; they are searchable on return."""
+        build = self._building[str(thread_id)]
+        pairs = list(zip(texts, vectors))
+        with build["lock"]:
+            if pairs:
+                if build["store"] is None:
+                    build["store"] = FAISS.from_embeddings(pairs, embeddings, metadatas=list(metadatas))
+                else:
+                    build["store"].add_embeddings(pairs, metadatas=list(metadatas))
+                build["metadata"]["vectors"] = build["store"].index.ntotal
+            build["metadata"].update(progress or {})
+
+    def finish(self, thread_id: str, metadata: dict) -> dict:
+        """Persist the completed build (see save()) and return its manifest entry."""
+        thread_id = str(thread_id)
+        build = self._building[thread_id]
+        if build["store"] is None:
+            self.abort(thread_id)
+            raise ValueError("Nothing was indexed")
+        try:
+            return self.save(thread_id, build["store"], metadata)
+        finally:
+            with self._lock:
+                if self._building.get(thread_id) is build:
+                    del self._building[thread_id]
+
+    def abort(self, thread_id: str) -> None:
+        """Drop an unfinished build; the thread's previous index (if any) is used again."""
+        with self._lock:
+            self._building.pop(str(thread_id), None)
+
+    def delete(self, thread_id: str) -> None:
+        thread_id = str(thread_id)
+        with self._lock:
+            self._loaded.pop(thread_id, None)
+            if self._manifest.pop(thread_id, None) is not None:
+                _atomic_write_json(self._manifest_path, self._manifest)
+            shutil.rmtree(self._thread_dir(thread_id), ignore_errors=True)
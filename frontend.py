@@ -18,10 +18,14 @@ from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 # Local Application Imports
 # ==========================
 from backend import (
+    cancel_ingestion,
     chatbot,
-    ingest_pdf,
+    ingestion_job,
     retrieve_all_threads,
+    stream_chat,
+    submit_pdf_ingestion,
     thread_document_metadata,
+    thread_ingestion_job,
 )
 
 # ==========================
@@ -89,26 +93,64 @@ if st.sidebar.button("New Chat", use_container_width=True):
     reset_chat()
     st.rerun()
 
-if thread_docs:
-    last_doc = list(thread_docs.values())[-1]
-    st.sidebar.success(
-        f"Using `{last_doc['filename']}` "
-        f"({last_doc['chunks']} chunks | {last_doc['documents']} pages)"
-    )
-else:
-    st.sidebar.info("No PDF uploaded yet.")
+def should_ingest(docs: dict, upload) -> bool:
+    """
+    New file name, or a fresh upload of a file whose last job failed / was
+    cancelled (the same upload is not resubmitted on every rerun).
+    """
+    jobs = [(job_id, entry) for job_id, entry in docs.items() if entry["filename"] == upload.name]
+    if not jobs:
+        return True
+    last_job, last = jobs[-1]
+    if last["file_id"] == upload.file_id:
+        return False
+    return (ingestion_job(last_job) or {}).get("status") in ("failed", "cancelled")
+
 
 uploaded_pdf = st.sidebar.file_uploader("Upload PDF", type=["pdf"])
-if uploaded_pdf:
-    if uploaded_pdf.name not in thread_docs:
-        with st.sidebar.status("Indexing PDF…", expanded=True) as status_box:
-            summary = ingest_pdf(
-                uploaded_pdf.getvalue(),
-                thread_id=thread_key,
-                filename=uploaded_pdf.name,
-            )
-            thread_docs[uploaded_pdf.name] = summary
-            status_box.update(label="✅ PDF indexed", state="complete")
+if uploaded_pdf and should_ingest(thread_docs, uploaded_pdf):
+    # ✅ Returns at once; indexing runs on the background ingestion queue
+    job_id = submit_pdf_ingestion(uploaded_pdf.getvalue(), thread_id=thread_key, filename=uploaded_pdf.name)
+    thread_docs[job_id] = {"filename": uploaded_pdf.name, "file_id": uploaded_pdf.file_id}
+
+
+@st.fragment(run_every=1.0)
+def document_panel(thread_id: str):
+    """Indexing progress / cancel while a job runs, then the indexed PDF (polled, chat stays usable)."""
+    job = thread_ingestion_job(thread_id)
+
+    if job and job["status"] in ("queued", "running"):
+        pages = job["progress"].get("pages", {})
+        embedded = job["progress"].get("embed")
+        if job["status"] == "queued":
+            text = f"`{job['filename']}` queued for indexing…"
+        else:
+            text = f"Indexing `{job['filename']}`: {pages.get('done', 0)}/{pages.get('total', '?')} pages"
+            if embedded:
+                text += f" · embedding {embedded['done']}/{embedded['total']}"
+        st.progress(pages["done"] / pages["total"] if pages.get("total") else 0.0, text=text)
+        if st.button("Cancel indexing", key=f"cancel-{job['job_id']}", use_container_width=True):
+            cancel_ingestion(job["job_id"])
+        return
+
+    if job and job["status"] == "failed":
+        st.error(f"Indexing `{job['filename']}` failed: {job['error']} Upload it again to retry.")
+    elif job and job["status"] == "cancelled":
+        st.warning(f"Indexing `{job['filename']}` cancelled. Upload it again to re-index.")
+
+    meta = thread_document_metadata(thread_id)
+    if meta:
+        st.success(
+            f"Using `{meta['filename']}` "
+            f"({meta.get('chunks')} chunks | {meta.get('documents')} pages | "
+            f"{meta.get('embedding_cache_hit_ratio', 0):.0%} from cache)"
+        )
+    else:
+        st.info("No PDF uploaded yet.")
+
+
+with st.sidebar:
+    document_panel(thread_key)
 
 # ---- Show list of past conversations using titles ----
 st.sidebar.subheader("Past Conversations")
@@ -156,7 +198,7 @@ if user_input:
         status_holder = {"box": None}
 
         def ai_stream():
-            for chunk, _ in chatbot.stream(
+            for chunk, _ in stream_chat(
                 {"messages": [HumanMessage(content=user_input)]},
                 config=CONFIG,
                 stream_mode="messages",
@@ -191,7 +233,12 @@ if user_input:
 
     # PDF metadata under chat window
     meta = thread_document_metadata(thread_key)
-    if meta:
+    if meta.get("status") == "indexing":
+        st.caption(
+            f"Indexing PDF: {meta.get('filename')} "
+            f"(Pages: {meta.get('pages_indexed', 0)}/{meta.get('documents')} searchable so far)"
+        )
+    elif meta:
         st.caption(
             f"Indexed PDF: {meta.get('filename')} "
             f"(Chunks: {meta.get('chunks')} | Pages: {meta.get('documents')})"
@@ -25,6 +25,9 @@ class ChatState(TypedDict):
 
     # Optional inputs
     vessel_name: Optional[str]
+    freight_is_lumpsum: Optional[bool]
+    weather_factor_pct: Optional[float]
+    address_commission_pct: Optional[float]
 
     # Step 2 — Derived
     dwt: Optional[float]
@@ -47,9 +50,14 @@ class ChatState(TypedDict):
     selected_vessel_subtype: str | None
     selected_vessel_port_id: str | None
 
+    matched_vessels: dict | None
+
     # Step 4 — Registry Vessel Data
     vessel_details: dict | None
 
+    # Step 6 — Validated Speed & Consumption
+    speed_consumption: dict | None
+
     # ✅ Step 6A — Route Distance (CRITICAL)
     route_distance: dict | None
 
@@ -59,8 +67,20 @@ class ChatState(TypedDict):
     # Step 5 — Misc Costs
     misc_costs: list[dict] | None
 
+    # Step 9A — Bunker Spot Prices
+    bunker_prices: dict | None
+
     # Step 6B — Final PNL Output
     pnl: dict | None
 
     # Step 7 — Report Flag
     pdf_report_requested: bool | None
+
+    # Deterministic pipeline — inputs each step last ran with / stop reason
+    pipeline_inputs: dict | None
+    dead_reason: str | None
+
+    # Compaction — id of the first message still sent to the model, and of the
+    # last message when the history was last compacted
+    history_cutoff: str | None
+    history_compacted_through: str | None
@@ -0,0 +1,222 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from models.chat_state import ChatState
+from tools.token_estimate import estimate_tokens
+
+# ==========================
+# Compaction Configuration
+# ==========================
+# Only the view sent to the model is compacted: the checkpoint keeps every
+# original message. The cutoff (first message still sent) is kept in state so
+# the sent prefix stays stable between compactions and provider prompt
+# caching keeps hitting it.
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "12000"))
+# After a compaction the kept history is cut down to this share of the budget
+HISTORY_KEEP_RATIO = float(os.getenv("CHAT_HISTORY_KEEP_RATIO", "0.5"))
+# Superseded tool results (see STATE_TOOLS) are cut to this many characters
+OLD_TOOL_RESULT_CHARS = int(os.getenv("CHAT_OLD_TOOL_RESULT_CHARS", "1500"))
+
+MAX_LIST_ITEMS = 50      # longer lists of numbers / coordinate pairs are dropped
+OLD_LIST_ITEMS = 5       # list entries kept in superseded tool results
+
+# Tools whose result is held in ChatState (tool → field). Only their older
+# results (a later call of the same tool exists) are shortened, and only from
+# a compaction on (history_compacted_through), so messages already sent stay
+# byte-identical between compactions; the latest result of every tool, and
+# every result of any other tool, is sent whole.
+STATE_TOOLS = {
+    "calculate_dwt": "dwt",
+    "get_vessels_by_name": "vessel_details",
+    "get_vessel_particulars": "vessel_details",
+    "parse_speed_and_consumption_ai": "speed_consumption",
+    "get_port_distance": "route_distance",
+    "compute_voyage_itinerary": "voyage_days",
+    "get_bunker_spotprices_for_ports": "bunker_prices",
+}
+
+# ChatState fields repeated to the model once the turns holding them are compacted
+FACT_FIELDS = (
+    "cargo_quantity", "freight_rate", "freight_is_lumpsum", "load_port", "discharge_port", "hire_rate",
+    "weather_factor_pct", "address_commission_pct", "dwt", "vessel_type",
+    "selected_vessel_name", "selected_vessel_open_port", "selected_vessel_speed_consumption",
+    "matched_vessels", "misc_costs", "bunker_prices", "pnl",
+)
+
+
+def _message_tokens(message: BaseMessage) -> int:
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+    tokens = estimate_tokens(content)
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += estimate_tokens(json.dumps(call.get("args"), default=str))
+    return tokens + 4
+
+
+# ==========================
+# Tool Result Pruning
+# ==========================
+def _is_bulk_list(value: list) -> bool:
+    """Route geometry and similar: long lists of numbers / coordinate pairs."""
+    return len(value) > MAX_LIST_ITEMS and all(
+        isinstance(v, (int, float)) or (isinstance(v, list) and all(isinstance(x, (int, float)) for x in v))
+        for v in value[:MAX_LIST_ITEMS]
+    )
+
+
+def prune_payload(value: Any, list_items: Optional[int] = None) -> Any:
+    """Drop bulk numeric lists; with `list_items`, also shorten every other list."""
+    if isinstance(value, dict):
+        return {k: prune_payload(v, list_items) for k, v in value.items()}
+    if isinstance(value, list):
+        if _is_bulk_list(value):
+            return f"<{len(value)} points omitted>"
+        if list_items is not None and len(value) > list_items:
+            kept = [prune_payload(v, list_items) for v in value[:list_items]]
+            return kept + [f"<{len(value) - list_items} more omitted>"]
+        return [prune_payload(v, list_items) for v in value]
+    return value
+
+
+def compact_tool_message(message: ToolMessage, latest: bool) -> ToolMessage:
+    """Pruned copy of a tool result; superseded (not `latest`) results are also shortened and truncated."""
+    content = message.content
+    if not isinstance(content, str):
+        return message
+
+    try:
+        payload = json.loads(content)
+    except ValueError:
+        payload = None
+
+    if payload is not None:
+        compacted = json.dumps(
+            prune_payload(payload, None if latest else OLD_LIST_ITEMS), ensure_ascii=False, default=str
+        )
+    else:
+        compacted = content
+
+    if not latest and len(compacted) > OLD_TOOL_RESULT_CHARS:
+        compacted = compacted[:OLD_TOOL_RESULT_CHARS] + " …[truncated]"
+
+    if compacted == content:
+        return message
+    return message.model_copy(update={"content": compacted})
+
+
+# ==========================
+# History Window
+# ==========================
+def _turn_starts(messages: List[BaseMessage]) -> List[int]:
+    """Indices where a user turn starts (cutting there never splits a tool call from its result)."""
+    return [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+
+
+def _superseded(messages: List[BaseMessage], state: ChatState, through: int) -> set:
+    """
+    Indices of state-backed tool results that a later call of the same tool,
+    at or before index `through`, replaced.
+    """
+    seen: set = set()
+    superseded = set()
+    for i in range(len(messages) - 1, -1, -1):
+        message = messages[i]
+        if not isinstance(message, ToolMessage):
+            continue
+        field = STATE_TOOLS.get(message.name)
+        if message.name in seen and field and state.get(field) not in (None, "", [], {}):
+            superseded.add(i)
+        if i <= through:
+            seen.add(message.name)
+    return superseded
+
+
+def _compacted_view(messages: List[BaseMessage], state: ChatState, through: int) -> List[BaseMessage]:
+    superseded = _superseded(messages, state, through)
+    return [
+        compact_tool_message(m, latest=i not in superseded) if isinstance(m, ToolMessage) else m
+        for i, m in enumerate(messages)
+    ]
+
+
+def voyage_facts(state: ChatState) -> Optional[str]:
+    """Structured values already collected, for the turns no longer sent."""
+    facts: Dict[str, Any] = {k: state.get(k) for k in FACT_FIELDS if state.get(k) not in (None, "", [])}
+
+    speeds = state.get("speed_consumption") or {}
+    if speeds:
+        facts["speed_consumption"] = {
+            k: speeds.get(k) for k in ("ballast_speed", "laden_speed", "ballast_consumption", "laden_consumption", "fuel_type")
+        }
+    route = state.get("route_distance") or {}
+    if route.get("distance"):
+        facts["route_distance_nm"] = route["distance"]
+    vessel = state.get("vessel_details") or {}
+    if vessel.get("identifiers") or vessel.get("particulars"):
+        facts["vessel_details"] = prune_payload(
+            {k: vessel.get(k) for k in ("identifiers", "particulars")}, OLD_LIST_ITEMS
+        )
+    itinerary = state.get("voyage_days") or {}
+    if itinerary.get("status") == "success":
+        facts["itinerary"] = {
+            k: itinerary.get(k) for k in ("ballast_days", "laden_days", "port_days", "total_days", "total_bunker_mt", "bunkers_by_fuel")
+        }
+
+    if not facts:
+        return None
+    return json.dumps(facts, ensure_ascii=False, default=str)
+
+
+def compact_history(state: ChatState, budget: int = HISTORY_TOKEN_BUDGET) -> Tuple[List[BaseMessage], Dict[str, Optional[str]], Optional[SystemMessage]]:
+    """
+    (history to send, {history_cutoff, history_compacted_through} to store,
+    facts note to append).
+
+    Tool results are pruned of bulk coordinate lists. When the sent history
+    exceeds `budget` tokens, results that a later call of the same tool
+    superseded, and whose data is in ChatState, are shortened, whole old
+    turns are dropped down to HISTORY_KEEP_RATIO × budget, and the new
+    cutoff and compaction point are returned; the values the dropped turns
+    held are appended as a note built from the ChatState fields. Between
+    compactions the sent messages do not change.
+    """
+    messages = list(state.get("messages") or [])
+    cutoff = state.get("history_cutoff")
+    through = state.get("history_compacted_through")
+
+    ids = [m.id for m in messages]
+    start = ids.index(cutoff) if cutoff in ids else 0
+
+    view = _compacted_view(messages, state, ids.index(through) if through in ids else -1)
+    sizes = [_message_tokens(m) for m in view]
+
+    if sum(sizes[start:]) > budget:
+        through = ids[-1]
+        view = _compacted_view(messages, state, len(messages) - 1)
+        sizes = [_message_tokens(m) for m in view]
+
+        target = budget * HISTORY_KEEP_RATIO
+        remaining = sum(sizes[start:])
+        # Never drop the current user turn
+        candidates = [i for i in _turn_starts(messages) if i > start]
+        for i in candidates[:-1] if candidates else []:
+            remaining -= sum(sizes[start:i])
+            start = i
+            if remaining <= target:
+                break
+        cutoff = messages[start].id if start > 0 else None
+
+    facts = voyage_facts(state) if start > 0 else None
+    note = None
+    if facts:
+        note = SystemMessage(
+            content=(
+                f"EARLIER CONVERSATION COMPACTED ({start} messages not shown). "
+                f"Values already collected / computed — do NOT ask for or recompute them "
+                f"(matched_vessels is a summary: call match_open_vessels again only if the list itself is needed):\n{facts}"
+            )
+        )
+
+    return view[start:], {"history_cutoff": cutoff, "history_compacted_through": through}, note
@@ -1,8 +1,23 @@
-from langchain_core.messages import AIMessage
-from typing import Any, Dict
+import asyncio
+import json
+import uuid
+from langchain_core.messages import AIMessage, ToolMessage
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from models.chat_state import ChatState
-from tools.voyage_estimate import calculate_dwt, get_vessel_particulars, get_vessels_by_name
+from tools.fleet_ranking import SPEED_TEXT_FIELDS
+from tools.particulars_cache import DWT_FIELDS
+from tools.vessel_index import _field, extract_vessels, vessel_record
+from tools.voyage_estimate import (
+    calculate_dwt,
+    compute_voyage_itinerary,
+    get_bunker_spotprices_for_ports,
+    get_port_distance,
+    get_vessels_by_name,
+    match_open_vessels,
+    parse_speed_and_consumption_ai,
+    vessel_particulars_cache,
+)
 
 def cargo_block(state: ChatState, config=None) -> Dict[str, Any]:
     """
@@ -64,28 +79,33 @@ def cargo_block(state: ChatState, config=None) -> Dict[str, Any]:
 
     # ✅ CASE 3 — Vessel Name Present → D → E → F
     if state.get("vessel_name"):
-        vessel_match = get_vessels_by_name.invoke({
-            "vessel_name": state["vessel_name"]
+        vessel_search = get_vessels_by_name.invoke({
+            "query": state["vessel_name"]
         })
 
-        if vessel_match.get("status") != "success":
+        if isinstance(vessel_search, dict) and vessel_search.get("status") == "error":
             return {
-                "dead_reason": vessel_match.get("message", "Unable to resolve vessel."),
+                "dead_reason": vessel_search.get("message", "Unable to resolve vessel."),
                 "messages": messages
             }
 
-        if not vessel_match.get("mmsi"):
+        candidates = [vessel_record(v) for v in extract_vessels(vessel_search)]
+        vessel_match = next((c for c in candidates if c), None)
+
+        if not vessel_match or not vessel_match.get("mmsi"):
             return {
                 "dead_reason": "Resolved vessel has no valid MMSI.",
                 "messages": messages
             }
 
-        vp = get_vessel_particulars.invoke({
-            "mmsi": vessel_match.get("mmsi"),
-            "imo": vessel_match.get("imo"),
-            "ship_id": vessel_match.get("ship_id"),
-            "vessel_name": state["vessel_name"]
-        })
+        # ✅ IMO-keyed cache: only the DWT / type fields are needed here
+        vp = vessel_particulars_cache.get(
+            vessel_match.get("mmsi"),
+            vessel_match.get("imo") or "",
+            vessel_match.get("ship_id") or "",
+            state["vessel_name"],
+            fields=DWT_FIELDS,
+        )
 
         if not vp:
             return {
@@ -153,3 +173,308 @@ def cargo_block(state: ChatState, config=None) -> Dict[str, Any]:
     )
 
     return {"messages": messages + [ask_msg]}
+
+
+# ==========================
+# Deterministic Pipeline
+# ==========================
+# Pure calculation / lookup steps run here as soon as their inputs are in
+# state, instead of costing a model round trip each. Results are appended as
+# tool-call / tool-result message pairs, so the model sees them exactly as if
+# it had called the tools itself.
+
+MANDATORY_INPUTS = ("cargo_quantity", "freight_rate", "load_port", "discharge_port", "hire_rate")
+SPEED_KEYS = ("ballast_speed", "laden_speed", "ballast_consumption", "laden_consumption")
+
+# Steps whose results belong to the selected vessel
+VESSEL_DERIVED_STEPS = ("speed_consumption", "itinerary", "bunker_prices")
+
+# State fields record_voyage_inputs may set
+RECORDED_FIELDS = MANDATORY_INPUTS + (
+    "freight_is_lumpsum",
+    "weather_factor_pct",
+    "address_commission_pct",
+    "selected_vessel_name",
+    "selected_vessel_open_port",
+    "selected_vessel_speed_consumption",
+)
+
+
+def _tool_exchange(name: str, args: dict, result) -> list:
+    """AIMessage with one tool call plus its ToolMessage, as ToolNode would produce."""
+    call_id = f"pipeline_{uuid.uuid4().hex[:16]}"
+    return [
+        AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id, "type": "tool_call"}]),
+        ToolMessage(content=json.dumps(result, ensure_ascii=False, default=str), name=name, tool_call_id=call_id),
+    ]
+
+
+def _is_error(result) -> bool:
+    return not isinstance(result, dict) or result.get("status") == "error" or "error" in result
+
+
+def _latest_tool_results(state: ChatState) -> List[ToolMessage]:
+    """Tool results of the latest tools round (the trailing ToolMessages)."""
+    trailing = []
+    for message in reversed(state.get("messages") or []):
+        if not isinstance(message, ToolMessage):
+            break
+        trailing.append(message)
+    return trailing[::-1]
+
+
+def harvest_recorded_inputs(state: ChatState) -> Dict[str, Any]:
+    """State updates from the latest record_voyage_inputs results."""
+    update: Dict[str, Any] = {}
+    for message in _latest_tool_results(state):
+        if message.name != "record_voyage_inputs":
+            continue
+        try:
+            result = json.loads(message.content)
+        except (TypeError, ValueError):
+            continue
+        if result.get("status") != "success":
+            continue
+
+        recorded = result.get("recorded") or {}
+        update.update({k: v for k, v in recorded.items() if k in RECORDED_FIELDS})
+
+        # A new vessel selection drops the previous vessel's speeds and what
+        # was derived from them, so those steps run again for the new vessel
+        if recorded.get("selected_vessel_name") and recorded["selected_vessel_name"] != state.get("selected_vessel_name"):
+            update.update(speed_consumption=None, voyage_days=None, bunker_prices=None)
+            if not recorded.get("selected_vessel_speed_consumption"):
+                update["selected_vessel_speed_consumption"] = None
+            ran = update.get("pipeline_inputs", state.get("pipeline_inputs")) or {}
+            update["pipeline_inputs"] = {k: v for k, v in ran.items() if k not in VESSEL_DERIVED_STEPS}
+
+        if all(recorded.get(k) for k in SPEED_KEYS):
+            update["speed_consumption"] = {
+                "status": "manual_extracted",
+                **{k: recorded[k] for k in SPEED_KEYS},
+                "fuel_type": recorded.get("fuel_type") or "VLSFO",
+                "mode": "manual",
+            }
+
+    return update
+
+
+# --------- STEP INPUTS (None → not ready) ---------
+def _mandatory_ready(state: ChatState) -> bool:
+    return all(state.get(k) not in (None, "") for k in MANDATORY_INPUTS)
+
+
+def _dwt_inputs(state: ChatState):
+    if state.get("cargo_quantity") is None and not state.get("vessel_name"):
+        return None
+    return [state.get("cargo_quantity"), state.get("vessel_name")]
+
+
+def _match_inputs(state: ChatState):
+    # Step 3 follows the Step 1B optional inputs (recorded as 0 when skipped)
+    if not _mandatory_ready(state) or state.get("dwt") is None or state.get("weather_factor_pct") is None:
+        return None
+    return [str(int(round(float(state["dwt"])))), state["load_port"]]
+
+
+def _vessel_inputs(state: ChatState):
+    return [state["selected_vessel_name"]] if state.get("selected_vessel_name") else None
+
+
+def _speed_text(state: ChatState) -> Optional[str]:
+    if state.get("selected_vessel_speed_consumption"):
+        return state["selected_vessel_speed_consumption"]
+    particulars = (state.get("vessel_details") or {}).get("particulars")
+    records = extract_vessels(particulars) if isinstance(particulars, dict) else []
+    return _field(records[0], SPEED_TEXT_FIELDS) if records else None
+
+
+def _speed_inputs(state: ChatState):
+    speeds = state.get("speed_consumption") or {}
+    if speeds.get("mode") == "manual":
+        return None
+    text = _speed_text(state)
+    return [text] if text else None
+
+
+def _route_inputs(state: ChatState):
+    # Step 5 follows the vessel selection
+    if not _mandatory_ready(state) or not state.get("selected_vessel_name"):
+        return None
+    return [state["load_port"], state["discharge_port"]]
+
+
+def _itinerary_inputs(state: ChatState):
+    route = state.get("route_distance") or {}
+    speeds = state.get("speed_consumption") or {}
+    if not route.get("distance") or not all(speeds.get(k) for k in SPEED_KEYS):
+        return None
+    return [
+        state["load_port"],
+        state["discharge_port"],
+        state.get("selected_vessel_open_port"),
+        float(route["distance"]),
+        *[float(speeds[k]) for k in SPEED_KEYS],
+        speeds.get("fuel_type"),
+    ]
+
+
+def _bunker_price_inputs(state: ChatState):
+    if (state.get("voyage_days") or {}).get("status") != "success":
+        return None
+    return [state["load_port"], state["discharge_port"]]
+
+
+# --------- STEP RUNNERS ---------
+def _run_dwt(state: ChatState) -> Dict[str, Any]:
+    result = cargo_block({**state, "dwt": None})
+    if result.get("dead_reason"):
+        return {"dead_reason": result["dead_reason"]}
+
+    update = {k: v for k, v in result.items() if k != "messages"}
+    if state.get("cargo_quantity") is not None:
+        update["messages"] = _tool_exchange(
+            "calculate_dwt", {"cargo_quantity": result["cargo_quantity"]}, {"dwt": result["dwt"]}
+        )
+    return update
+
+
+def _run_match(state: ChatState) -> Dict[str, Any]:
+    dwt, open_port = _match_inputs(state)
+    args = {"dwt": dwt, "open_port": open_port}
+    result = match_open_vessels.func(**args)
+    summary = {**args, "count": len(extract_vessels(result))}
+    if _is_error(result):
+        summary["status"] = "error"
+    return {"matched_vessels": summary, "messages": _tool_exchange("match_open_vessels", args, result)}
+
+
+def _run_vessel(state: ChatState) -> Dict[str, Any]:
+    name = state["selected_vessel_name"]
+    search = get_vessels_by_name.func(query=name)
+    messages = _tool_exchange("get_vessels_by_name", {"query": name}, search)
+
+    record = next((r for r in (vessel_record(v) for v in extract_vessels(search)) if r), None)
+    if record is None or not record.get("mmsi"):
+        return {"vessel_details": {"status": "error", "query": name}, "messages": messages}
+
+    args = {
+        "mmsi": record["mmsi"],
+        "imo": record["imo"] or "",
+        "ship_id": record["ship_id"] or "",
+        "vessel_name": record["name"],
+    }
+    particulars = vessel_particulars_cache.get(**args)
+    messages += _tool_exchange("get_vessel_particulars", args, particulars)
+
+    identifiers = {k: v for k, v in record.items() if k != "raw"}
+    return {"vessel_details": {"identifiers": identifiers, "particulars": particulars}, "messages": messages}
+
+
+def _run_speeds(state: ChatState) -> Dict[str, Any]:
+    text = _speed_text(state)
+    result = parse_speed_and_consumption_ai.func(speed_and_consumption=text)
+    messages = _tool_exchange("parse_speed_and_consumption_ai", {"speed_and_consumption": text}, result)
+
+    valid = result.get("status") in ("auto_extracted", "manual_extracted") and all(
+        isinstance(result.get(k), (int, float)) and result[k] > 0 for k in SPEED_KEYS
+    )
+    return {"speed_consumption": result if valid else None, "messages": messages}
+
+
+def _run_route(state: ChatState) -> Dict[str, Any]:
+    args = {"from_port": state["load_port"], "to_port": state["discharge_port"]}
+    result = get_port_distance.func(**args)
+    return {"route_distance": result, "messages": _tool_exchange("get_port_distance", args, result)}
+
+
+def _run_itinerary(state: ChatState) -> Dict[str, Any]:
+    load_port, discharge_port, open_port, distance = _itinerary_inputs(state)[:4]
+    legs = []
+    if open_port and open_port.strip().upper() != load_port.strip().upper():
+        legs.append({"type": "ballast", "from": open_port, "to": load_port})
+    legs.append({"type": "laden", "from": load_port, "to": discharge_port, "distance_nm": distance})
+
+    speeds = {k: v for k, v in state["speed_consumption"].items() if k in SPEED_KEYS + ("fuel_type",)}
+    args = {"legs": legs, "speeds": speeds}
+    result = compute_voyage_itinerary.func(**args)
+    return {"voyage_days": result, "messages": _tool_exchange("compute_voyage_itinerary", args, result)}
+
+
+def _run_bunker_prices(state: ChatState) -> Dict[str, Any]:
+    args = {"port_names": [state["load_port"], state["discharge_port"]]}
+    result = get_bunker_spotprices_for_ports.func(**args)
+    return {"bunker_prices": result, "messages": _tool_exchange("get_bunker_spotprices_for_ports", args, result)}
+
+
+# Tools whose calls the pipeline makes on the model's behalf
+PIPELINE_TOOLS = (
+    "calculate_dwt",
+    "match_open_vessels",
+    "get_vessels_by_name",
+    "get_vessel_particulars",
+    "parse_speed_and_consumption_ai",
+    "get_port_distance",
+    "compute_voyage_itinerary",
+    "get_bunker_spotprices_for_ports",
+)
+
+# step name → (inputs, runner); a step re-runs whenever its inputs change
+PIPELINE_STEPS: Tuple[Tuple[str, Callable, Callable], ...] = (
+    ("dwt", _dwt_inputs, _run_dwt),
+    ("match_open_vessels", _match_inputs, _run_match),
+    ("vessel_particulars", _vessel_inputs, _run_vessel),
+    ("speed_consumption", _speed_inputs, _run_speeds),
+    ("route_distance", _route_inputs, _run_route),
+    ("itinerary", _itinerary_inputs, _run_itinerary),
+    ("bunker_prices", _bunker_price_inputs, _run_bunker_prices),
+)
+
+
+def pipeline_node(state: ChatState, config=None) -> Dict[str, Any]:
+    """
+    Harvest the latest record_voyage_inputs results into state, then run
+    every deterministic step whose inputs are ready and changed since its
+    last run. Stops at the first dead end (dead_reason); the failed inputs
+    are recorded too, so the next turn reaches the model, which can ask for
+    and record a correction (a changed input re-runs the step).
+    """
+    update: Dict[str, Any] = harvest_recorded_inputs(state)
+    working: Dict[str, Any] = {**state, **update}
+    ran = dict(working.get("pipeline_inputs") or {})
+    messages: list = []
+
+    for name, inputs, run in PIPELINE_STEPS:
+        key = inputs(working)
+        if key is None or ran.get(name) == key:
+            continue
+
+        step = run(working)
+        ran[name] = key
+        if step.get("dead_reason"):
+            return {**update, "dead_reason": step["dead_reason"], "pipeline_inputs": ran, "messages": messages}
+
+        messages.extend(step.pop("messages", []))
+        update.update(step)
+        working.update(step)
+
+    update["pipeline_inputs"] = ran
+    update["messages"] = messages
+    return update
+
+
+async def apipeline_node(state: ChatState, config=None) -> Dict[str, Any]:
+    """Async twin: the steps do blocking I/O, so run them off the event loop."""
+    return await asyncio.to_thread(pipeline_node, state, config)
+
+
+def route_after_pipeline(state: ChatState) -> str:
+    return "dead_end" if state.get("dead_reason") else "chat_node"
+
+
+def dead_end_node(state: ChatState, config=None) -> Dict[str, Any]:
+    """Explain why the estimate cannot continue, then wait for the user."""
+    return {
+        "messages": [AIMessage(content=f"⚠️ {state['dead_reason']}")],
+        "dead_reason": None,
+    }
@@ -0,0 +1,82 @@
+import sys
+import os
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from db import cache_store
+from db.cache_store import SqliteCache
+from tools.bunker_prices import BunkerPriceStore
+
+
+class FakeFetcher:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, port_name):
+        self.calls.append(port_name)
+        return {"port": port_name, "VLSFO": 600 + len(self.calls)}
+
+
+def _store(tmp_path, fetcher):
+    cache = SqliteCache("bunker", path=str(tmp_path / "c.db"), compress=True)
+    return BunkerPriceStore(fetcher, cache, fresh_seconds=60, max_stale_seconds=3600)
+
+
+def test_fresh_snapshot_skips_api(tmp_path):
+    fetcher = FakeFetcher()
+    store = _store(tmp_path, fetcher)
+
+    first = store.get("Singapore")
+    second = store.get("  singapore ")
+
+    assert first == second
+    assert fetcher.calls == ["Singapore"]
+    assert store.stats()["fresh_hits"] == 1
+
+
+def test_stale_snapshot_served_then_refreshed(tmp_path, monkeypatch):
+    fetcher = FakeFetcher()
+    store = _store(tmp_path, fetcher)
+    now = 1_000_000.0
+    monkeypatch.setattr(cache_store.time, "time", lambda: now)
+    store.get("Rotterdam")
+
+    now += 600
+    assert store.get("Rotterdam")["VLSFO"] == 601
+    store._executor.shutdown(wait=True)
+
+    assert fetcher.calls == ["Rotterdam", "Rotterdam"]
+    assert store.cache.lookup("ROTTERDAM")[0]["VLSFO"] == 602
+    assert store.stats()["stale_hits"] == 1
+
+
+def test_get_many_fetches_only_misses(tmp_path):
+    fetcher = FakeFetcher()
+    store = _store(tmp_path, fetcher)
+    store.get("Qingdao")
+
+    prices = store.get_many(["Qingdao", "Tubarao", "Tubarao"])
+
+    assert set(prices) == {"Qingdao", "Tubarao"}
+    assert fetcher.calls == ["Qingdao", "Tubarao"]
+
+
+def test_get_many_does_not_queue_behind_background_refreshes(tmp_path):
+    release = threading.Event()
+    fetcher = FakeFetcher()
+
+    def fetch(port_name):
+        if port_name.startswith("Hub"):
+            release.wait(timeout=5)
+        return fetcher(port_name)
+
+    store = _store(tmp_path, fetch)
+    store.prewarm([f"Hub {i}" for i in range(8)])  # every refresh worker is blocked
+
+    prices = store.get_many(["Santos", "Paranagua"])
+    assert set(prices) == {"Santos", "Paranagua"}
+    assert sorted(fetcher.calls) == ["Paranagua", "Santos"]  # no refresh had finished
+
+    release.set()
+    store._executor.shutdown(wait=True)
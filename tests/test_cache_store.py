@@ -0,0 +1,57 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from db import cache_store
+from db.cache_store import SqliteCache
+
+
+def test_set_and_get_roundtrip(tmp_path):
+    cache = SqliteCache("routes", path=str(tmp_path / "c.db"), compress=True)
+
+    cache.set("A|B", {"distance": 1234.5, "legs": [1, 2]})
+
+    assert cache.get("A|B") == {"distance": 1234.5, "legs": [1, 2]}
+    assert cache.get("B|A") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    cache = SqliteCache("routes", path=str(tmp_path / "c.db"), ttl_seconds=60)
+    now = 1_000_000.0
+    monkeypatch.setattr(cache_store.time, "time", lambda: now)
+    cache.set("k", 1)
+
+    now += 61
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1
+
+    # Stale entries remain available to callers that accept them
+    value, age = cache.lookup("k")
+    assert value == 1
+    assert age == 61
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path, monkeypatch):
+    cache = SqliteCache("routes", path=str(tmp_path / "c.db"), max_entries=2)
+    clock = iter(range(100))
+    monkeypatch.setattr(cache_store.time, "time", lambda: float(next(clock)))
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "c.db")
+    SqliteCache("routes", path=path).set("k", [1, 2, 3])
+
+    assert SqliteCache("routes", path=path).get("k") == [1, 2, 3]
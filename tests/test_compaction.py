@@ -0,0 +1,107 @@
+import sys
+import os
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nodes.compaction import compact_history, compact_tool_message
+
+ROUTE = {"distance": 4210.5, "secaLength": 120.0, "geometry": {"type": "LineString", "coordinates": [[i, i] for i in range(500)]}}
+
+
+def _turn(n: int, result: dict) -> list:
+    call_id = f"call_{n}"
+    return [
+        HumanMessage(content=f"question {n}", id=f"h{n}"),
+        AIMessage(content="", id=f"a{n}", tool_calls=[{"name": "get_port_distance", "args": {}, "id": call_id, "type": "tool_call"}]),
+        ToolMessage(content=json.dumps(result), name="get_port_distance", tool_call_id=call_id, id=f"t{n}"),
+        AIMessage(content=f"answer {n}", id=f"r{n}"),
+    ]
+
+
+def test_tool_results_are_pruned_not_rewritten_in_state():
+    message = ToolMessage(content=json.dumps(ROUTE), tool_call_id="c", id="t")
+
+    latest = json.loads(compact_tool_message(message, latest=True).content)
+    assert latest["distance"] == 4210.5
+    assert latest["geometry"]["coordinates"] == "<500 points omitted>"
+
+    # The original message object is untouched
+    assert len(json.loads(message.content)["geometry"]["coordinates"]) == 500
+
+
+def test_history_stays_within_budget_and_cutoff_is_stable():
+    messages = [m for n in range(40) for m in _turn(n, {**ROUTE, "note": "x" * 2000})]
+    state = {"messages": messages, "load_port": "Kandla", "dwt": 44000.0}
+
+    history, marks, facts = compact_history(state, budget=4000)
+    cutoff = marks["history_cutoff"]
+
+    assert cutoff is not None and isinstance(history[0], HumanMessage)
+    assert history[-1].id == "r39"
+    assert sum(len(str(m.content)) for m in history) // 4 <= 4000
+    assert '"load_port": "Kandla"' in facts.content
+
+    # Next call with the stored cutoff and one more turn keeps the same prefix
+    state = {**state, **marks, "messages": messages + _turn(40, ROUTE)}
+    again, next_marks, _ = compact_history(state, budget=4000)
+    assert next_marks == marks
+    assert [m.content for m in again[:len(history)]] == [m.content for m in history]
+
+
+def test_short_history_is_sent_whole():
+    state = {"messages": _turn(0, {"distance": 10})}
+    history, marks, facts = compact_history(state)
+    assert [m.id for m in history] == ["h0", "a0", "t0", "r0"]
+    assert marks == {"history_cutoff": None, "history_compacted_through": None} and facts is None
+
+
+def test_only_superseded_state_backed_results_are_shortened():
+    vessels = [{"SHIPNAME": f"VESSEL {i}", "OPEN_PORT": "KANDLA", "SPEED_AND_CONSUMPTION": "13/24, 12/26"} for i in range(20)]
+    match = [
+        HumanMessage(content="find vessels", id="h0"),
+        AIMessage(content="", id="a0", tool_calls=[{"name": "match_open_vessels", "args": {}, "id": "m", "type": "tool_call"}]),
+        ToolMessage(content=json.dumps(vessels), name="match_open_vessels", tool_call_id="m", id="t0"),
+    ]
+    messages = match + _turn(1, {**ROUTE, "note": "x" * 2000}) + _turn(2, ROUTE)
+    state = {"messages": messages, "route_distance": {"distance": 4210.5}}
+
+    # Until a compaction, a replaced result is sent unchanged (the cached prefix holds)
+    history, _, _ = compact_history(state)
+    assert "truncated" not in next(m for m in history if m.id == "t1").content
+
+    history, _, _ = compact_history({**state, "history_compacted_through": "r2"})
+    by_id = {m.id: m for m in history}
+
+    # The vessel list the user picks from is sent whole in later turns
+    assert len(json.loads(by_id["t0"].content)) == 20
+    # A route result replaced by a later call (and held in state) is shortened
+    assert by_id["t1"].content.endswith("…[truncated]")
+    assert json.loads(by_id["t2"].content)["distance"] == 4210.5
+
+    # A replacement after the compaction point leaves t2 alone until the next compaction
+    history, _, _ = compact_history({**state, "messages": messages + _turn(3, ROUTE), "history_compacted_through": "r2"})
+    assert json.loads(next(m for m in history if m.id == "t2").content)["distance"] == 4210.5
+
+    # Without the value in state nothing is shortened
+    history, _, _ = compact_history({"messages": messages, "history_compacted_through": "r2"})
+    assert "truncated" not in next(m for m in history if m.id == "t1").content
+
+
+def test_facts_note_carries_vessel_and_bunker_data():
+    messages = [m for n in range(40) for m in _turn(n, {**ROUTE, "note": "x" * 2000})]
+    state = {
+        "messages": messages,
+        "matched_vessels": {"dwt": "44000", "open_port": "Kandla", "count": 12},
+        "vessel_details": {"identifiers": {"name": "SARA", "imo": "9837119"}, "particulars": {"SHIPNAME": "SARA"}},
+        "bunker_prices": {"KANDLA": {"VLSFO": 610}},
+    }
+
+    _, _, facts = compact_history(state, budget=4000)
+
+    facts = json.loads(facts.content.split("\n", 1)[1])
+    assert facts["matched_vessels"]["count"] == 12
+    assert facts["vessel_details"]["identifiers"]["imo"] == "9837119"
+    assert facts["bunker_prices"] == {"KANDLA": {"VLSFO": 610}}
@@ -0,0 +1,61 @@
+import sys
+import os
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.embedding_batcher import EmbeddingBatcher, RateLimiter, make_batches
+
+
+class Throttled(Exception):
+    status_code = 429
+
+    class response:
+        headers = {"retry-after-ms": "5"}
+
+
+def test_batches_respect_count_and_token_limits():
+    texts = ["a" * 40] * 5 + ["b" * 400]
+    batches = make_batches(texts, batch_size=2, max_tokens=50)
+
+    assert [len(b) for _, b in batches] == [2, 2, 1, 1]
+    assert [start for start, _ in batches] == [0, 2, 4, 5]
+
+
+def test_order_progress_and_retry_on_throttling():
+    calls = []
+    lock = threading.Lock()
+
+    def endpoint(texts):
+        with lock:
+            calls.append(list(texts))
+            if len(calls) == 2:
+                raise Throttled()
+        return [[float(t)] for t in texts]
+
+    progress = []
+    batcher = EmbeddingBatcher(endpoint, batch_size=3, max_concurrency=4, requests_per_minute=0, tokens_per_minute=0)
+    texts = [str(i) for i in range(10)]
+
+    vectors = batcher.embed(texts, progress=lambda done, total: progress.append((done, total, threading.current_thread())))
+
+    assert vectors == [[float(i)] for i in range(10)]
+    assert batcher.retries == 1 and batcher.throttled == 1
+    assert batcher.concurrency.limit <= 4
+    assert progress[-1][:2] == (10, 10)
+    assert all(t is threading.current_thread() for _, _, t in progress)
+
+
+def test_rate_limiter_waits_for_token_refill():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=600, clock=lambda: now[0], sleep=sleep)
+    limiter.acquire(600)
+    limiter.acquire(300)
+
+    assert sum(slept) == 30.0
@@ -0,0 +1,69 @@
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from db.embedding_cache import EmbeddingCache, chunk_key
+
+
+class FakeEndpoint:
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(t)), float(i), 0.5] for i, t in enumerate(texts)]
+
+
+def test_only_new_chunks_hit_the_endpoint(tmp_path):
+    endpoint = FakeEndpoint()
+    cache = EmbeddingCache("text-embedding-3-small", root=str(tmp_path))
+
+    first, hits = cache.embed(["Clause 1  laytime", "Clause 2 demurrage", "Clause 1 laytime"], endpoint)
+    assert hits == 0
+    assert endpoint.texts == ["Clause 1  laytime", "Clause 2 demurrage"]
+    assert first[0] == first[2]
+
+    # Reopened (another process / restart): whitespace-normalized repeats are served from disk
+    cache = EmbeddingCache("text-embedding-3-small", root=str(tmp_path))
+    second, hits = cache.embed(["Clause 2\ndemurrage", "Clause 3 despatch", "Clause 1 laytime"], endpoint)
+
+    assert hits == 2
+    assert endpoint.texts[2:] == ["Clause 3 despatch"]
+    assert second[0] == pytest.approx(first[1])
+    assert second[2] == pytest.approx(first[0])
+    assert len(cache) == 3
+
+
+def test_appends_write_only_the_new_keys_and_skip_a_torn_tail(tmp_path):
+    endpoint = FakeEndpoint()
+    cache = EmbeddingCache("text-embedding-3-small", root=str(tmp_path))
+    keys_path = os.path.join(cache.directory, "keys.txt")
+
+    cache.embed([f"Clause {i}" for i in range(10)], endpoint)
+    size = os.path.getsize(keys_path)
+    cache.embed(["Clause 3", "Clause 10"], endpoint)
+    assert os.path.getsize(keys_path) - size == 65
+
+    # an append interrupted after its vectors, halfway through its key
+    with open(keys_path, "ab") as f:
+        f.write(b"0123abcd")
+    with open(os.path.join(cache.directory, "vectors.f32"), "ab") as f:
+        f.write(b"\0" * 12)
+
+    cache = EmbeddingCache("text-embedding-3-small", root=str(tmp_path))
+    assert len(cache) == 11
+    _, hits = cache.embed(["Clause 11", "Clause 0"], endpoint)
+    assert hits == 1
+
+    cache = EmbeddingCache("text-embedding-3-small", root=str(tmp_path))
+    vectors, hits = cache.embed(["Clause 11", "Clause 10"], endpoint)
+    assert hits == 2 and len(cache) == 12
+    assert vectors[0] == [9.0, 0.0, 0.5]
+
+
+def test_key_depends_on_model():
+    assert chunk_key("Clause 1", "model-a") != chunk_key("Clause 1", "model-b")
+    assert chunk_key(" Clause\t1 ", "model-a") == chunk_key("Clause 1", "model-a")
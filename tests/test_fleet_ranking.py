@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.fleet_ranking import fleet_candidates, rank_fleet, vessel_speeds
+from tools.pnl_engine import quick_voyage_pnl_arrays
+
+CARGO = {
+    "cargo_quantity_mt": 50000,
+    "freight_rate": 24.0,
+    "freight_is_lumpsum": False,
+    "hire_rate_per_day": 12000,
+    "bunker_price_per_mt": 600,
+    "port_cost_usd": 90000,
+    "broker_commission_pct": 0.0125,
+}
+
+SPEEDS = {"ballast_speed": 12.0, "laden_speed": 11.0, "ballast_consumption": 22.0, "laden_consumption": 26.0}
+
+PAYLOAD = {"data": [
+    {"SHIPNAME": "MV FAR AWAY", "IMO": "1", "OPEN_PORT": "Singapore", "DWT": "58,000"},
+    {"SHIPNAME": "NEARBY", "IMO": "2", "OPEN_PORT": "Kandla", "HIRE_RATE": "14000",
+     "SPEED_CONSUMPTION": "Ballast 13 kn on 24 mt VLSFO, Laden 12 kn on 28 mt VLSFO"},
+    {"SHIPNAME": "NOWHERE", "IMO": "3"},
+]}
+
+
+def test_candidates_and_speed_sources():
+    candidates = fleet_candidates(PAYLOAD)
+
+    assert [c["name"] for c in candidates] == ["FAR AWAY", "NEARBY", "NOWHERE"]
+    assert candidates[0]["dwt"] == 58000.0
+    assert candidates[1]["hire_rate"] == 14000.0
+
+    own = vessel_speeds(candidates[1], None, SPEEDS)
+    assert own["source"] == "vessel_text" and own["laden_speed"] == 12.0
+
+    from_particulars = vessel_speeds(candidates[0], {"SERVICE_SPEED": "13.5", "FUEL_CONSUMPTION": "30"}, SPEEDS)
+    assert from_particulars["source"] == "particulars" and from_particulars["ballast_speed"] == 13.5
+
+    assert vessel_speeds(candidates[0], {"error": "x"}, SPEEDS)["source"] == "defaults"
+    assert vessel_speeds(candidates[0], None, None)["source"] is None
+
+
+def test_rank_matches_quick_pnl_and_orders_by_tce():
+    candidates = fleet_candidates(PAYLOAD)
+    figures = [vessel_speeds(c, None, SPEEDS) for c in candidates]
+
+    rows = rank_fleet(candidates, figures, [2400.0, 0.0, None], 4200.0, CARGO, port_days=4, port_consumption=3)
+
+    assert [r["vessel_name"] for r in rows] == ["NEARBY", "FAR AWAY", "NOWHERE"]
+    assert [r["rank"] for r in rows] == [1, 2, None]
+    assert rows[2]["excluded_reason"] == "ballast distance unavailable"
+
+    far = rows[1]
+    ballast_days = 2400 / (12 * 24)
+    laden_days = 4200 / (11 * 24)
+    expected = quick_voyage_pnl_arrays(
+        **CARGO,
+        voyage_days=ballast_days + laden_days + 4,
+        total_bunker_mt=ballast_days * 22 + laden_days * 26 + 4 * 3,
+    )
+    assert far["voyage_days"] == pytest.approx(ballast_days + laden_days + 4)
+    assert far["tce"] == pytest.approx(float(expected["tce"]))
+    assert far["pnl"] == pytest.approx(float(expected["pnl"]))
+    assert rows[0]["hire_rate_per_day"] == 14000.0
+
+
+def test_rejects_derived_inputs():
+    with pytest.raises(ValueError):
+        rank_fleet(fleet_candidates(PAYLOAD), [SPEEDS] * 3, [0, 0, 0], 4200.0, {**CARGO, "voyage_days": 20})
@@ -0,0 +1,110 @@
+import sys
+import os
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.ingestion_queue import IngestionQueue
+
+
+class FakeIngest:
+    """Stands in for ingest_pdf: reports progress, then waits to be released or cancelled."""
+
+    def __init__(self):
+        self.started = threading.Semaphore(0)
+        self.release = threading.Event()
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, file_bytes, thread_id, filename, progress=None, cancelled=None):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            progress("pages", 1, 4)
+            self.started.release()
+            while not self.release.wait(0.01):
+                if cancelled.is_set():
+                    raise RuntimeError("Ingestion cancelled")
+            if file_bytes == b"broken":
+                raise ValueError("No extractable text found in the PDF.")
+            return {"filename": filename, "chunks": 3}
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def _wait_done(queue, job_id):
+    for _ in range(500):
+        status = queue.status(job_id)
+        if status["status"] not in ("queued", "running"):
+            return status
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_submit_returns_at_once_and_jobs_run_in_parallel_up_to_the_limit():
+    ingest = FakeIngest()
+    queue = IngestionQueue(ingest, max_workers=2)
+
+    ids = [queue.submit(b"%PDF", f"thread-{i}", f"cp{i}.pdf") for i in range(3)]
+    assert ingest.started.acquire(timeout=2) and ingest.started.acquire(timeout=2)
+
+    running = queue.status(ids[0])
+    assert running["status"] == "running"
+    assert running["progress"] == {"pages": {"done": 1, "total": 4}}
+    assert queue.status(ids[2])["status"] == "queued"
+    assert queue.active_job("thread-2")["job_id"] == ids[2]
+
+    ingest.release.set()
+    results = [_wait_done(queue, i) for i in ids]
+    assert [r["status"] for r in results] == ["done"] * 3
+    assert results[0]["result"] == {"filename": "cp0.pdf", "chunks": 3}
+    assert ingest.peak == 2
+    assert queue.active_job("thread-0") is None
+    queue.shutdown()
+
+
+def test_cancel_failure_and_newer_upload_supersedes_older():
+    ingest = FakeIngest()
+    queue = IngestionQueue(ingest, max_workers=4)
+
+    first = queue.submit(b"%PDF", "thread-1", "old.pdf")
+    assert ingest.started.acquire(timeout=2)
+    # same thread: the running job is cancelled and the new one waits for it
+    second = queue.submit(b"broken", "thread-1", "new.pdf")
+    assert _wait_done(queue, first)["status"] == "cancelled"
+
+    assert ingest.started.acquire(timeout=2)
+    third = queue.submit(b"%PDF", "thread-2", "other.pdf")
+    assert ingest.started.acquire(timeout=2)
+    assert queue.cancel(third)
+    assert _wait_done(queue, third)["status"] == "cancelled"
+    assert not queue.cancel(third)
+
+    ingest.release.set()
+    failed = _wait_done(queue, second)
+    assert failed["status"] == "failed" and "No extractable text" in failed["error"]
+    assert ingest.peak == 2
+    queue.shutdown()
+
+
+def test_embedding_failure_is_reported_as_failed_with_its_message():
+    from tools.embedding_batcher import EmbeddingBatcher
+
+    def endpoint(texts):
+        raise ValueError("400 bad request")
+
+    batcher = EmbeddingBatcher(endpoint, batch_size=2, max_concurrency=2)
+
+    def ingest(file_bytes, thread_id, filename, progress=None, cancelled=None):
+        return batcher.embed(["a", "b", "c", "d", "e"], cancelled=cancelled)
+
+    queue = IngestionQueue(ingest, max_workers=1)
+    job_id = queue.submit(b"%PDF", "thread-1", "cp.pdf")
+
+    status = _wait_done(queue, job_id)
+    assert status["status"] == "failed"
+    assert status["error"] == "400 bad request"
+    queue.shutdown()
@@ -0,0 +1,55 @@
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.itinerary import compute_itinerary
+from tools.voyage_estimate import compute_voyage_itinerary
+
+SPEEDS = {
+    "ballast_speed": 13.0,
+    "laden_speed": 12.0,
+    "ballast_consumption": 24.0,
+    "laden_consumption": 28.0,
+    "port_consumption": 3.0,
+    "fuel_type": "VLSFO",
+}
+
+LEGS = [
+    {"type": "ballast", "from": "SINGAPORE", "to": "PORT HEDLAND", "distance_nm": 1872},
+    {"type": "port", "port": "PORT HEDLAND", "days": 2.5, "fuel_type": "LSMGO"},
+    {"type": "laden", "from": "PORT HEDLAND", "to": "ROTTERDAM", "distance_nm": 11520, "eca_fraction": 0.1, "weather_factor_pct": 5},
+    {"type": "port", "port": "ROTTERDAM", "days": 3},
+]
+
+
+def test_leg_days_and_fuel_split():
+    result = compute_itinerary(LEGS, SPEEDS)
+
+    ballast_days = 1872 / (13.0 * 24)
+    laden_days = 11520 / (12.0 * 24) * 1.05
+    assert result["ballast_days"] == pytest.approx(ballast_days)
+    assert result["laden_days"] == pytest.approx(laden_days)
+    assert result["port_days"] == 5.5
+    assert result["total_days"] == pytest.approx(ballast_days + laden_days + 5.5)
+
+    assert result["bunkers_by_fuel"]["LSMGO"] == pytest.approx(2.5 * 3.0 + laden_days * 0.1 * 28.0)
+    assert result["bunkers_by_fuel"]["VLSFO"] == pytest.approx(
+        ballast_days * 24.0 + laden_days * 0.9 * 28.0 + 3 * 3.0
+    )
+    assert result["total_bunker_mt"] == pytest.approx(sum(result["bunkers_by_fuel"].values()))
+
+
+def test_invalid_legs_are_reported_together():
+    with pytest.raises(ValueError) as err:
+        compute_itinerary([{"type": "laden", "distance_nm": 5000}, {"type": "canal"}])
+    assert "leg 0" in str(err.value) and "leg 1" in str(err.value)
+
+
+def test_tool_rounds_like_single_leg_tools():
+    result = compute_voyage_itinerary.invoke({"legs": LEGS, "speeds": SPEEDS})
+    assert result["status"] == "success"
+    assert [leg["type"] for leg in result["legs"]] == ["ballast", "port", "laden", "port"]
+    assert result["legs"][0]["days"] == round(1872 / (13.0 * 24), 2)
@@ -0,0 +1,83 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from db import cache_store
+from db.cache_store import SqliteCache
+from tools.particulars_cache import DWT_FIELDS, ParticularsCache, particulars_key
+
+HOUR = 3600
+
+
+class FakeFetcher:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, mmsi, imo, ship_id, vessel_name):
+        self.calls.append(imo)
+        if self.fail:
+            return {"error": "Request timeout", "message": "timed out"}
+        return {"data": [{"IMO": imo, "SUMMER_DWT": 58000, "REGISTERED_OWNER": "X"}]}
+
+
+def _cache(tmp_path, fetcher):
+    store = SqliteCache("particulars", path=str(tmp_path / "c.db"), compress=True)
+    return ParticularsCache(fetcher, store, static_ttl=90 * 24 * HOUR, volatile_ttl=24 * HOUR)
+
+
+def test_key_prefers_imo():
+    assert particulars_key("403591001", "9837119", "12836167") == "imo:9837119"
+    assert particulars_key("403591001", "0", "12836167") == "mmsi:403591001"
+
+
+def test_per_field_staleness(tmp_path, monkeypatch):
+    fetcher = FakeFetcher()
+    particulars = _cache(tmp_path, fetcher)
+    now = 1_000_000.0
+    monkeypatch.setattr(cache_store.time, "time", lambda: now)
+
+    particulars.get("1", "9837119", "2", "SARA")
+    particulars.get("1", "9837119", "2", "SARA")
+    assert fetcher.calls == ["9837119"]
+
+    # Two days later: DWT is still good, the full record (ownership) is not
+    now += 48 * HOUR
+    particulars.get("1", "9837119", "2", "SARA", fields=DWT_FIELDS)
+    assert fetcher.calls == ["9837119"]
+
+    particulars.get("1", "9837119", "2", "SARA")
+    assert fetcher.calls == ["9837119", "9837119"]
+
+
+def test_stale_snapshot_served_when_refetch_fails(tmp_path, monkeypatch):
+    fetcher = FakeFetcher()
+    particulars = _cache(tmp_path, fetcher)
+    now = 1_000_000.0
+    monkeypatch.setattr(cache_store.time, "time", lambda: now)
+    particulars.get("1", "9837119", "2", "SARA")
+
+    now += 48 * HOUR
+    fetcher.fail = True
+    result = particulars.get("1", "9837119", "2", "SARA")
+
+    assert result["data"][0]["SUMMER_DWT"] == 58000
+    assert particulars.stats()["stale_served"] == 1
+
+
+def test_prefetch_fetches_only_missing_vessels(tmp_path):
+    fetcher = FakeFetcher()
+    particulars = _cache(tmp_path, fetcher)
+    particulars.get("1", "9000001", "", "A")
+
+    fleet = [
+        {"mmsi": "1", "imo": "9000001", "vessel_name": "A"},
+        {"mmsi": "2", "imo": "9000002", "vessel_name": "B"},
+        {"mmsi": "3", "imo": "9000003", "vessel_name": "C"},
+        {"mmsi": "3", "imo": "9000003", "vessel_name": "C"},
+    ]
+    result = particulars.prefetch(fleet)
+
+    assert result == {"status": "success", "cached": 1, "fetched": 2, "failed": []}
+    assert sorted(fetcher.calls) == ["9000001", "9000002", "9000003"]
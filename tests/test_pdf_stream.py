@@ -0,0 +1,42 @@
+import sys
+import os
+
+import pymupdf
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.pdf_stream import iter_chunk_windows, iter_pdf_pages, make_splitter, pdf_page_count
+
+
+def _pdf(pages):
+    doc = pymupdf.open()
+    for text in pages:
+        doc.new_page().insert_textbox(pymupdf.Rect(40, 40, 560, 800), text, fontsize=8)
+    return doc.tobytes()
+
+
+def test_pages_stream_from_bytes_with_loader_metadata():
+    data = _pdf(["Laytime 72 hours SHINC", "", "Demurrage USD 15,000 per day"])
+
+    pages = list(iter_pdf_pages(data, source="cp.pdf"))
+
+    assert pdf_page_count(data) == 3
+    assert [p.metadata for p in pages] == [
+        {"source": "cp.pdf", "page": i, "total_pages": 3} for i in range(3)
+    ]
+    assert "Laytime" in pages[0].page_content
+    assert pages[1].page_content.strip() == ""
+
+
+def test_windows_are_bounded_and_cover_every_chunk():
+    clause = " ".join(f"Clause {i}: the charterers shall pay demurrage as agreed." for i in range(60))
+    data = _pdf([f"Page {p}. {clause}" for p in range(6)])
+
+    all_chunks = make_splitter().split_documents(iter_pdf_pages(data, source="cp.pdf"))
+    windows = list(iter_chunk_windows(iter_pdf_pages(data, source="cp.pdf"), make_splitter(), window=5))
+
+    assert all(len(chunks) <= 5 for chunks, _ in windows)
+    assert [c.page_content for chunks, _ in windows for c in chunks] == [c.page_content for c in all_chunks]
+    # pages read never goes backwards and ends on the last page
+    read = [pages for _, pages in windows]
+    assert read == sorted(read) and read[-1] == 6
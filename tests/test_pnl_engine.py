@@ -0,0 +1,168 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.pnl_engine import (
+    amount_column,
+    axis_values,
+    cargo_columns,
+    grid_rows,
+    scenario_grid,
+    voyage_pnl_columns,
+)
+from tools.voyage_estimate import calculate_quick_voyage_pnl, calculate_quick_voyage_pnl_grid, calculate_voyage_pnl
+
+BASE = {
+    "cargo_quantity_mt": 39855,
+    "freight_rate": 25.5,
+    "freight_is_lumpsum": False,
+    "voyage_days": 57.31,
+    "hire_rate_per_day": 14000,
+    "total_bunker_mt": 1865.5,
+    "bunker_price_per_mt": 610,
+    "port_cost_usd": 85000,
+    "misc_cost_usd": 12000,
+    "broker_commission_pct": 0.0125,
+    "address_commission_pct": 0.0375,
+    "weather_factor_pct": 5,
+}
+
+
+def test_axis_specs():
+    assert axis_values([1, 2]).tolist() == [1.0, 2.0]
+    assert axis_values({"start": 500, "stop": 700, "step": 50}).tolist() == [500, 550, 600, 650, 700]
+    assert axis_values({"start": 0, "stop": 1, "num": 3}).tolist() == [0.0, 0.5, 1.0]
+
+
+def test_grid_matches_scalar_tool_exactly():
+    grid = scenario_grid(BASE, {
+        "freight_rate": {"start": 18, "stop": 32, "num": 7},
+        "bunker_price_per_mt": [450, 610, 780],
+        "voyage_days": [0, 40.2, 57.31],
+        "address_commission_pct": [0.0375, 1.0],
+    })
+
+    assert grid["shape"] == (7, 3, 3, 2)
+    for row in grid_rows(grid):
+        inputs = {**BASE, **{k: row[k] for k in grid["axes"]}}
+        expected = calculate_quick_voyage_pnl.invoke(inputs)
+        assert {k: row[k] for k in expected} == expected
+
+
+def test_large_grid_summary_only():
+    result = calculate_quick_voyage_pnl_grid.invoke({
+        "base_inputs": BASE,
+        "sensitivities": {
+            "freight_rate": {"start": 15, "stop": 35, "num": 100},
+            "bunker_price_per_mt": {"start": 450, "stop": 750, "num": 100},
+            "weather_factor_pct": {"start": 0, "stop": 9, "step": 1},
+        },
+    })
+
+    assert result["scenario_count"] == 100_000
+    assert "scenarios" not in result
+    assert result["summary"]["pnl"]["best"]["freight_rate"] == 35.0
+    assert np.isclose(result["summary"]["pnl"]["worst"]["bunker_price_per_mt"], 750.0)
+
+
+
+def _row_loop_voyage_pnl(cargo_rows, demurrage_rows, despatch_rows, mis_revenue, broker_commission,
+                         voyage_days, hire_rate, tci_add_com, tci_broker_com, port_expenses, misc_expenses,
+                         address_commission=0.0, option_percentage=0.0, freight_tax_pct=0.0,
+                         demurrage_commission_pct=None, despatch_commission_pct=0.0, canal_cost=0.0,
+                         ballast_bonus=0.0, suez_bonus=0.0, cp_qty=None, option_qty=None, **_):
+    """The row-by-row calculate_voyage_pnl body as it was before the columnar rewrite (reference)."""
+    if demurrage_commission_pct is None:
+        demurrage_commission_pct = broker_commission
+
+    total_freight = total_freight_commission = total_freight_tax = 0.0
+    for row in cargo_rows:
+        row_cp_qty = float(row.get("cp_qty", 0.0))
+        if option_qty is not None:
+            effective_qty = row_cp_qty + float(option_qty)
+        else:
+            pct = row.get("option_pct") if row.get("option_pct") is not None else option_percentage
+            effective_qty = row_cp_qty * (1.0 + float(pct))
+        lumpsum = float(row.get("lumpsum", 0.0))
+        freight = lumpsum if lumpsum > 0 else effective_qty * float(row.get("frt_rate", 0.0))
+        total_freight += freight
+        total_freight_commission += freight * float(broker_commission)
+        total_freight_tax += freight * float(freight_tax_pct)
+
+    total_demurrage = sum(float(x.get("amount", 0.0)) for x in demurrage_rows)
+    total_despatch = sum(float(x.get("amount", 0.0)) for x in despatch_rows)
+
+    gross_revenue = total_freight + mis_revenue + total_demurrage - total_despatch
+    net_revenue = gross_revenue - (
+        total_freight_commission + total_demurrage * float(demurrage_commission_pct)
+        + total_despatch * float(despatch_commission_pct) + total_freight_tax
+    )
+
+    hire = float(hire_rate) * float(voyage_days)
+    gross_expense = hire + port_expenses + misc_expenses + canal_cost + ballast_bonus + suez_bonus
+    net_expense = gross_expense - (hire * float(tci_add_com) + hire * float(tci_broker_com))
+
+    pnl = net_revenue - net_expense
+    tce = (net_revenue - (gross_expense - (hire + ballast_bonus + suez_bonus - hire * float(address_commission)))) / voyage_days
+    if cp_qty is not None:
+        total_qty = float(cp_qty) + float(option_qty or 0.0)
+    else:
+        total_qty = sum(float(r.get("cp_qty", 0.0)) * (1.0 + float(r.get("option_pct", option_percentage))) for r in cargo_rows)
+
+    return {
+        "pnl": pnl,
+        "daily_profit": pnl / voyage_days,
+        "tce": tce,
+        "gross_tce": tce / (1.0 - float(address_commission)),
+        "break_even_freight_usd_per_mt": net_expense / (total_qty * (1.0 - float(broker_commission))),
+        "total_cargo_qty_mt": total_qty,
+    }
+
+
+VOYAGE = {
+    "cargo_rows": [
+        {"cp_qty": 50000, "frt_rate": 22.5, "option_pct": 0.05},
+        {"cp_qty": 30000, "frt_rate": 0, "lumpsum": 650000},
+        {"cp_qty": 12500.5, "frt_rate": 31.25},
+    ],
+    "demurrage_rows": [{"amount": 42000}, {"amount": 18500.5}],
+    "despatch_rows": [{"amount": 9000}],
+    "mis_revenue": 5000, "broker_commission": 0.0125, "voyage_days": 41.7,
+    "hire_rate": 14500, "tci_add_com": 0.0375, "tci_broker_com": 0.0125,
+    "port_expenses": 120000, "misc_expenses": 8000, "bunkers": {},
+    "freight_tax_pct": 0.025, "address_commission": 0.0375, "option_percentage": 0.1,
+    "despatch_commission_pct": 0.0125, "canal_cost": 65000, "ballast_bonus": 90000,
+}
+
+
+@pytest.mark.parametrize("overrides", [{}, {"option_qty": 1500}, {"cp_qty": 92500, "option_qty": 0}])
+def test_voyage_pnl_tool_matches_row_loop_with_demurrage_and_despatch(overrides):
+    inputs = {**VOYAGE, **overrides}
+
+    result = calculate_voyage_pnl.invoke(inputs)
+    expected = _row_loop_voyage_pnl(**inputs)
+
+    assert result["status"] == "success"
+    assert result["results"].keys() == expected.keys()
+    for key, value in expected.items():
+        assert np.isclose(result["results"][key], value, rtol=1e-12, atol=1e-9), key
+
+
+def test_cargo_columns_match_rows_and_reject_ragged_columns():
+    rows = VOYAGE["cargo_rows"]
+    columns = {k: [r.get(k) for r in rows] for k in ("cp_qty", "frt_rate", "option_pct")}
+    columns["lumpsum"] = [r.get("lumpsum", 0.0) for r in rows]
+
+    kwargs = {k: v for k, v in VOYAGE.items() if k not in ("cargo_rows", "demurrage_rows", "despatch_rows", "bunkers")}
+    demurrage, despatch = amount_column(VOYAGE["demurrage_rows"]), amount_column(VOYAGE["despatch_rows"])
+    assert (
+        voyage_pnl_columns(cargo_columns(columns), demurrage, despatch, **kwargs)
+        == voyage_pnl_columns(cargo_columns(rows), demurrage, despatch, **kwargs)
+    )
+
+    with pytest.raises(ValueError, match="differ in length"):
+        cargo_columns({"cp_qty": [1, 2], "frt_rate": [3]})
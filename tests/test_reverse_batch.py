@@ -0,0 +1,77 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.voyage_estimate import (
+    calculate_required_freight_rate,
+    calculate_reverse_daily_hire,
+    calculate_reverse_freight_rate,
+    calculate_reverse_solutions_batch,
+    calculate_reverse_tce,
+)
+
+CASES = [
+    (
+        "required_freight_rate",
+        calculate_required_freight_rate,
+        {"target_tce": 15000, "voyage_days": [42, 38, 40], "voyage_cost": [812000, 790500, 845250], "cargo_qty": [55000, 0, 60000]},
+        ("gross_freight", "freight_rate"),
+    ),
+    (
+        "reverse_freight_rate",
+        calculate_reverse_freight_rate,
+        {"cargo_qty": 55000, "voyage_cost": [812000, 790500, 845250], "expected_profit": 100000, "commission_pct": [0.025, 1.0, 0.0375]},
+        ("freight_rate",),
+    ),
+    (
+        "reverse_daily_hire",
+        calculate_reverse_daily_hire,
+        {"cargo_qty": [55000, 55000, -1], "freight_rate": 24.5, "hire_days": [41, 0, 39], "voyage_cost_excl_hire": 640000},
+        ("total_revenue", "hire_rate", "profit_status"),
+    ),
+    (
+        "reverse_tce",
+        calculate_reverse_tce,
+        {"total_revenue": [1350000, 900000, 1200000], "total_voyage_cost": 1000000, "voyage_days": [40, 35, 0]},
+        ("tce", "profit_value", "profit_status"),
+    ),
+]
+
+
+def test_batch_rows_match_scalar_tools():
+    for solver, scalar_tool, inputs, outputs in CASES:
+        batch = calculate_reverse_solutions_batch.invoke({"solver": solver, "inputs": inputs})
+        assert batch["status"] == "success" and batch["count"] == 3
+
+        for i in range(3):
+            row = {k: v[i] if isinstance(v, list) else v for k, v in inputs.items()}
+            expected = scalar_tool.invoke(row)
+
+            if expected["status"] == "success":
+                assert batch["valid"][i] and batch["errors"][i] is None
+                for name in outputs:
+                    assert batch["results"][name][i] == expected[name]
+            else:
+                assert not batch["valid"][i]
+                assert batch["errors"][i] == expected["message"]
+                assert all(batch["results"][name][i] is None for name in outputs)
+
+
+def test_bad_values_are_masked_not_raised():
+    batch = calculate_reverse_solutions_batch.invoke({
+        "solver": "reverse_tce",
+        "inputs": {"total_revenue": [1000000, "n/a", None], "total_voyage_cost": 800000, "voyage_days": 40},
+        "labels": ["AAA", "BBB", "CCC"],
+    })
+    assert batch["valid"] == [True, False, False]
+    assert batch["errors"][1] == "total_revenue is missing or not a number."
+    assert batch["results"]["tce"] == [5000.0, None, None]
+
+
+def test_mismatched_lengths_are_rejected():
+    batch = calculate_reverse_solutions_batch.invoke({
+        "solver": "reverse_tce",
+        "inputs": {"total_revenue": [1, 2, 3], "total_voyage_cost": [1, 2], "voyage_days": 40},
+    })
+    assert batch["status"] == "error"
@@ -0,0 +1,87 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.sea_routes import SeaRouteGraph, great_circle_nm, offline_port_distance
+
+
+def _tiny_graph() -> SeaRouteGraph:
+    return SeaRouteGraph({
+        "nodes": {
+            "A": {"lat": 0.0, "lon": 0.0, "type": "port", "aliases": ["ALPHA"]},
+            "B": {"lat": 0.0, "lon": 10.0, "type": "port"},
+            "C": {"lat": 0.0, "lon": 5.0, "type": "waypoint"},
+            "D": {"lat": 5.0, "lon": 5.0, "type": "waypoint"},
+        },
+        "edges": [
+            {"from": "A", "to": "C", "canal": "suez"},
+            {"from": "C", "to": "B", "seca": True},
+            {"from": "A", "to": "D"},
+            {"from": "D", "to": "B", "piracy": "hra"},
+        ],
+    })
+
+
+def test_shortest_route_and_response_shape():
+    graph = _tiny_graph()
+    result = graph.route("alpha", "b")
+
+    assert result["from"] == "A" and result["to"] == "B"
+    assert result["canals"] == ["suez"]
+    assert result["distance"] == round(great_circle_nm(0, 0, 0, 10), 2)
+    assert result["secaLength"] == round(great_circle_nm(0, 5, 0, 10), 2)
+    assert [leg["to"] for leg in result["legs"]] == ["C", "B"]
+    assert result["lineString"]["coordinates"] == [[0.0, 0.0], [5.0, 0.0], [10.0, 0.0]]
+
+
+def test_blocked_canal_takes_alternative():
+    result = _tiny_graph().route("A", "B", canalOptions="011", piracyArea="111")
+
+    assert [leg["to"] for leg in result["legs"]] == ["D", "B"]
+    assert result["canals"] == []
+    assert result["hraLength"] > 0
+
+
+def test_memo_keeps_echoed_options_and_hra_excludes_other_zones():
+    graph = SeaRouteGraph({
+        "nodes": {
+            "A": {"lat": 0.0, "lon": 0.0, "type": "port"},
+            "B": {"lat": 0.0, "lon": 10.0, "type": "port"},
+            "W": {"lat": 0.0, "lon": 5.0, "type": "waypoint"},
+        },
+        "edges": [
+            {"from": "A", "to": "W", "piracy": "west_africa"},
+            {"from": "W", "to": "B", "piracy": "hra"},
+        ],
+    })
+
+    first = graph.route("A", "B", localEca=1, seca=3)
+    second = graph.route("A", "B", localEca=0, seca=2)
+
+    assert first["options"]["localEca"] == 1 and first["options"]["seca"] == 3
+    assert second["options"]["localEca"] == 0 and second["options"]["seca"] == 2
+    assert first["hraLength"] == round(great_circle_nm(0, 5, 0, 10), 2)
+
+
+def test_unknown_port_returns_none():
+    assert _tiny_graph().route("A", "NOWHERE") is None
+
+
+def test_precomputed_tree_matches_astar():
+    graph = _tiny_graph()
+    expected = graph.route("A", "B")
+
+    graph = _tiny_graph()
+    graph.precompute(["A"])
+    assert graph.route("A", "B") == expected
+
+
+def test_bundled_graph_routes_europe_to_asia():
+    via_suez = offline_port_distance("Rotterdam", "Singapore")
+    via_cape = offline_port_distance("Rotterdam", "Singapore", canalOptions="011")
+
+    assert via_suez["canals"] == ["suez"]
+    assert via_suez["secaLength"] > 0
+    assert via_cape["distance"] > via_suez["distance"]
+    assert offline_port_distance("Singapore", "Rotterdam")["distance"] == via_suez["distance"]
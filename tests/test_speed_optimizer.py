@@ -0,0 +1,66 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.speed_optimizer import consumption_at, consumption_points, fit_consumption_curve
+from tools.voyage_estimate import calculate_quick_voyage_pnl, optimise_voyage_speed
+
+PARSED = {
+    "ballast_speed": 13.5,
+    "laden_speed": 12.5,
+    "ballast_consumption": 26,
+    "laden_consumption": 29,
+    "modes": {
+        "eco": {"ballast_speed": 12, "laden_speed": 11, "ballast_consumption": 19, "laden_consumption": 21},
+        "full": {"ballast_speed": 13.5, "laden_speed": 12.5, "ballast_consumption": 26, "laden_consumption": 29},
+    },
+}
+
+BASE = {
+    "cargo_quantity_mt": 60000,
+    "freight_rate": 24,
+    "freight_is_lumpsum": False,
+    "hire_rate_per_day": 15000,
+    "bunker_price_per_mt": 620,
+    "port_cost_usd": 150000,
+    "broker_commission_pct": 0.0125,
+}
+
+
+def test_curve_passes_through_eco_and_full_points():
+    points = consumption_points(PARSED, "laden")
+    assert points == [(11.0, 21.0), (12.5, 29.0)]
+
+    curve = fit_consumption_curve(points)
+    assert consumption_at(curve, [11.0, 12.5]) == pytest.approx([21.0, 29.0])
+
+    single = fit_consumption_curve([(12.0, 24.0)])
+    assert single["base_mt_per_day"] == 0.0
+    assert consumption_at(single, 12.0) == pytest.approx(24.0)
+
+
+def test_optimum_beats_every_swept_speed_on_scalar_tool():
+    result = optimise_voyage_speed.invoke({
+        "base_inputs": BASE,
+        "laden_distance_nm": 11000,
+        "speed_and_consumption": PARSED,
+        "port_days": 6,
+        "port_consumption_mt_per_day": 3,
+    })
+    assert result["status"] == "success"
+
+    curve = result["consumption_curves"]["laden"]
+
+    def tce(speed):
+        days = 11000 / (speed * 24)
+        bunkers = days * float(consumption_at(curve, speed)) + 6 * 3
+        return calculate_quick_voyage_pnl.invoke({**BASE, "voyage_days": days + 6, "total_bunker_mt": bunkers})["tce"]
+
+    best = result["optimal"]
+    assert best["tce"] == pytest.approx(tce(best["laden_speed"]))
+    assert all(best["tce"] >= tce(s) - 1e-6 for s in np.arange(7.7, 14.4, 0.1))
+    assert result["improvement"]["tce"] >= 0
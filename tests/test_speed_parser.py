@@ -0,0 +1,108 @@
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.speed_parser import normalize_speed_text, parse_speed_consumption
+
+
+def _figures(result):
+    return (
+        result["ballast_speed"],
+        result["laden_speed"],
+        result["ballast_consumption"],
+        result["laden_consumption"],
+        result["fuel_type"],
+    )
+
+
+@pytest.mark.parametrize("text, expected", [
+    (
+        "14.0kts (b) / 13.5kts (l) on 24.0 mt (b) / 26.0 mt (l) vlsfo",
+        (14.0, 13.5, 24.0, 26.0, "VLSFO"),
+    ),
+    (
+        "ballast 14 kn on 24 mts, laden 13.5 kn on 26 mts ifo 380 + 0.1 mgo",
+        (14.0, 13.5, 24.0, 26.0, "IFO380"),
+    ),
+    (
+        "b/l 14/13.5 kts on 24/26 mt vlsfo, port idle 2.5 mt mgo",
+        (14.0, 13.5, 24.0, 26.0, "VLSFO"),
+    ),
+    (
+        "Speed 14 kts ballast / 13 kts laden on 23.5 / 25 mt/day VLSFO wog",
+        (14.0, 13.0, 23.5, 25.0, "VLSFO"),
+    ),
+    ("abt 13 kts on abt 25 mt vlsfo", (13.0, 13.0, 25.0, 25.0, "VLSFO")),
+    ("11,80 kts on 22 mt", (11.8, 11.8, 22.0, 22.0, "VLSFO")),
+])
+def test_common_formats_are_confident(text, expected):
+    result = parse_speed_consumption(text)
+
+    assert result["confident"]
+    assert _figures(result) == expected
+
+
+def test_broken_decimals_eco_mode_and_wog():
+    text = (
+        "14. 0kts ( b ) / 13. 5kts ( l ) on 24. 0 mt ( b ) / 26. 0 mt ( l ) vlsfo "
+        "eco ( wog ) : 12. 5kts ( b ) / 12. 0kts ( l ) on 18. 5 mt ( b ) / 20. 0 mt ( l ) vlsfo"
+    )
+    result = parse_speed_consumption(text)
+
+    assert normalize_speed_text("14. 0kts") == "14.0kts"
+    assert result["confident"] and result["wog"]
+    assert result["operating_mode"] == "full"
+    assert _figures(result) == (14.0, 13.5, 24.0, 26.0, "VLSFO")
+    assert result["modes"]["eco"]["ballast_speed"] == 12.5
+    assert result["modes"]["eco"]["laden_consumption"] == 20.0
+
+
+def test_comma_lists_are_not_read_as_decimals():
+    text = "b/l 14/13 kts on 24, 26 mt vlsfo"
+    result = parse_speed_consumption(text)
+
+    assert normalize_speed_text(text) == text
+    assert normalize_speed_text("11,80 kts") == "11.80 kts"
+    assert 24.26 not in _figures(result)
+    assert not result["confident"]
+
+
+def test_additional_and_port_fuels_do_not_replace_main_consumption():
+    result = parse_speed_consumption("b/l 14/13.5 kts on 24/26 mt vlsfo + 0.1 mgo, port idle 2.5 mt mgo")
+
+    assert _figures(result)[2:4] == (24.0, 26.0)
+    assert result["additional_fuels"][0]["fuel"] == "MGO"
+    assert result["port_consumption"] == [{"fuel": "MGO", "mt_per_day": 2.5}]
+
+
+@pytest.mark.parametrize("text", [
+    "14/13.5 kts on 24/26 mt vlsfo",  # unmarked pair: order is a guess
+    "about 14 knots laden in good weather up to bf 4 and ds 3",  # no consumption
+    "140 kts (b) / 13.5 kts (l) on 24 mt (b) / 26 mt (l)",  # implausible speed
+    "see attached description",
+    "",
+])
+def test_uncertain_strings_escalate(text):
+    assert not parse_speed_consumption(text)["confident"]
+
+
+def test_parse_memo_is_content_addressed_and_versioned(tmp_path):
+    from db.cache_store import SqliteCache
+    from tools.speed_parser import ParseMemo, memo_version
+
+    cache = SqliteCache("speed_memo", path=str(tmp_path / "c.db"))
+    memo = ParseMemo(cache, memo_version("prompt v1 {speed_and_consumption}", "gpt"))
+    memo.set("14. 0 kts  on 24 MT", {"ballast_speed": 14.0})
+
+    assert memo.get("14.0 kts on 24 mt") == {"ballast_speed": 14.0}
+    assert memo.get("13.0 kts on 24 mt") is None
+    assert (memo.hits, memo.misses) == (1, 1)
+
+    # A prompt change stops matching old entries; invalidate() drops them
+    edited = ParseMemo(cache, memo_version("prompt v2 {speed_and_consumption}", "gpt"))
+    assert edited.get("14.0 kts on 24 mt") is None
+    assert edited.invalidate() == 1
+    assert len(cache) == 0
@@ -0,0 +1,55 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nodes.voyage_estimate import PIPELINE_TOOLS
+from prompt.system_prompt import (
+    COMPACT_SYSTEM_PROMPT,
+    STAGE_STEPS,
+    STEP_INSTRUCTIONS,
+    STEP_PLACEHOLDER,
+    SYSTEM_PROMPT,
+    prompt_stage,
+    step_instructions,
+)
+
+
+def test_compact_prompt_keeps_every_step_somewhere():
+    assert list(STEP_INSTRUCTIONS)[:3] == ["1", "1B", "2"]
+    assert set(STEP_INSTRUCTIONS) == {s for steps in STAGE_STEPS.values() for s in steps}
+
+    for section in STEP_INSTRUCTIONS.values():
+        assert section in SYSTEM_PROMPT
+        assert section not in COMPACT_SYSTEM_PROMPT
+
+    assert STEP_PLACEHOLDER in COMPACT_SYSTEM_PROMPT
+    assert "GLOBAL OUTPUT & FORMAT RULES" in COMPACT_SYSTEM_PROMPT
+    assert COMPACT_SYSTEM_PROMPT.rstrip().endswith("- Hire rate")
+    assert len(COMPACT_SYSTEM_PROMPT) < len(SYSTEM_PROMPT) / 2
+
+
+def test_stage_follows_pipeline_state():
+    state = {"cargo_quantity": 40000, "freight_rate": 25, "load_port": "Kandla", "discharge_port": "Qingdao"}
+    assert prompt_stage(state) == "inputs"
+
+    state.update(hire_rate=12000, weather_factor_pct=0)
+    assert prompt_stage(state) == "selection"
+    assert "3. BEST MATCH VESSEL" in step_instructions("selection")
+
+    state["selected_vessel_name"] = "SARA"
+    assert prompt_stage(state) == "voyage"
+
+    state.update(voyage_days={"status": "success"}, bunker_prices={"status": "success"})
+    assert prompt_stage(state) == "costs"
+
+
+def test_auto_run_steps_never_ask_the_model_to_call_pipeline_tools():
+    for step in ("2", "3", "4", "5", "6", "7", "8", "9"):
+        section = STEP_INSTRUCTIONS[step]
+        assert "AUTOMATIC TOOL CALL" not in section
+        lines = section.splitlines()
+        for i, line in enumerate(lines):
+            if line.strip().startswith("CALL"):
+                following = " ".join(lines[i: i + 3])
+                assert not any(t in following for t in PIPELINE_TOOLS), (step, line)
@@ -0,0 +1,105 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.target_solver import solve_target
+from tools.voyage_estimate import calculate_quick_voyage_pnl, solve_voyage_target
+
+BASE = {
+    "cargo_quantity_mt": 39855,
+    "freight_rate": 38.5,
+    "freight_is_lumpsum": False,
+    "voyage_days": 57.31,
+    "hire_rate_per_day": 14000,
+    "total_bunker_mt": 1865.5,
+    "bunker_price_per_mt": 610,
+    "port_cost_usd": 85000,
+    "misc_cost_usd": 12000,
+    "broker_commission_pct": 0.0125,
+    "address_commission_pct": 0.0375,
+    "weather_factor_pct": 5,
+}
+
+PHYSICS = {k: v for k, v in BASE.items() if k not in ("voyage_days", "total_bunker_mt")}
+PHYSICS.update(
+    distance_nm=11000,
+    speed_knots=12.5,
+    port_days=6,
+    sea_consumption_mt_per_day=28,
+    reference_speed_knots=12.5,
+    port_consumption_mt_per_day=3,
+)
+
+
+def test_closed_form_breakevens_hit_target_on_scalar_tool():
+    for variable, metric, target in (
+        ("bunker_price_per_mt", "pnl", 0.0),
+        ("hire_rate_per_day", "pnl", 150000.0),
+        ("freight_rate", "tce", 12000.0),
+        ("voyage_days", "tce", 9000.0),
+        ("address_commission_pct", "gross_tce", 12500.0),
+    ):
+        result = solve_target(BASE, variable, metric, target)
+        assert result["method"] == "closed_form"
+
+        pnl = calculate_quick_voyage_pnl.invoke({**BASE, variable: result["value"]})
+        assert abs(pnl[metric] - target) <= 1e-6 * max(1.0, abs(target))
+
+
+def test_speed_uses_bracketed_search_and_finds_every_root():
+    result = solve_target(PHYSICS, "speed_knots", "tce", 6000)
+    assert result["method"] == "bracketed"
+    assert all(4 <= s <= 25 for s in result["solutions"])
+    assert abs(result["achieved"] - 6000) < 1e-6
+    # closest root to the base speed
+    assert result["value"] == min(result["solutions"], key=lambda s: abs(s - 12.5))
+
+
+def test_port_days_closed_form_with_physics_inputs():
+    result = solve_target(PHYSICS, "port_days", "pnl", 0.0)
+    assert result["method"] == "closed_form"
+    assert result["within_bounds"]
+    assert abs(result["achieved"]) < 1e-6
+
+
+def test_tool_reports_unreachable_target():
+    # bracketed: no speed within 4 … 25 kn earns this TCE
+    result = solve_voyage_target.invoke({
+        "base_inputs": PHYSICS,
+        "solve_for": "speed_knots",
+        "metric": "tce",
+        "target": 1_000_000,
+    })
+    assert result["status"] == "error" and result["type"] == "no_solution"
+    assert result["method"] == "bracketed" and result["value"] is None
+
+    # closed form: the root is a negative bunker price, outside the bounds
+    result = solve_voyage_target.invoke({
+        "base_inputs": BASE,
+        "solve_for": "bunker_price_per_mt",
+        "target": 10_000_000,
+    })
+    assert result["status"] == "error" and result["type"] == "no_solution"
+    assert result["method"] == "closed_form" and result["value"] is None
+    assert result["out_of_bounds_value"] < 0
+
+    pnl = calculate_quick_voyage_pnl.invoke({**BASE, "bunker_price_per_mt": result["out_of_bounds_value"]})
+    assert abs(pnl["pnl"] - 10_000_000) <= 1e-6 * 10_000_000
+
+
+def test_tool_rejects_invalid_inputs():
+    result = solve_voyage_target.invoke({
+        "base_inputs": BASE,
+        "solve_for": "speed_knots",
+    })
+    assert result["status"] == "error" and result["type"] == "invalid_input"
+    assert "given together" in result["message"]
+
+    result = solve_voyage_target.invoke({
+        "base_inputs": BASE,
+        "solve_for": "hire_rate_per_day",
+        "metric": "tce",
+        "target": 5000,
+    })
+    assert result["status"] == "error" and "does not depend" in result["message"]
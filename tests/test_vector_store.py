@@ -0,0 +1,75 @@
+import sys
+import os
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from db.vector_store import ThreadIndexStore
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    document_calls: int = 0
+
+    def embed_documents(self, texts):
+        self.document_calls += 1
+        return super().embed_documents(texts)
+
+
+def test_index_survives_restart_without_embedding_calls(tmp_path):
+    embeddings = CountingEmbedding(size=16)
+    chunks = [
+        Document(page_content="Laytime 72 hours SHINC", metadata={"page": 3}),
+        Document(page_content="Demurrage USD 15,000 per day pro rata", metadata={"page": 4}),
+    ]
+    vector_store = FAISS.from_documents(chunks, embeddings)
+
+    ThreadIndexStore(str(tmp_path)).save("thread-1", vector_store, {"filename": "cp.pdf", "documents": 5, "chunks": 2})
+    embedded = embeddings.document_calls
+
+    # "Restart": a fresh store answers from the manifest and memory-maps the index
+    store = ThreadIndexStore(str(tmp_path))
+    assert store.has_document("thread-1")
+    assert store.metadata("thread-1")["filename"] == "cp.pdf"
+    assert not store.has_document("thread-2")
+    assert store.load("thread-2", embeddings) is None
+
+    loaded = store.load("thread-1", embeddings)
+    if os.path.exists("/proc/self/maps"):
+        index_file = os.path.realpath(os.path.join(str(tmp_path), "thread-1", "index.faiss"))
+        with open("/proc/self/maps") as f:
+            mapped = [line for line in f if line.rstrip().endswith(index_file)]
+        assert mapped and all(line.split()[1].startswith("r--s") for line in mapped)
+
+    hit = loaded.similarity_search("Demurrage USD 15,000 per day pro rata", k=1)[0]
+    assert hit.metadata == {"page": 4}
+    assert embeddings.document_calls == embedded
+
+    store.delete("thread-1")
+    assert not ThreadIndexStore(str(tmp_path)).has_document("thread-1")
+
+
+def test_partial_build_is_searchable_before_it_is_saved(tmp_path):
+    embeddings = CountingEmbedding(size=16)
+    store = ThreadIndexStore(str(tmp_path))
+    texts = ["Laytime 72 hours SHINC", "Demurrage USD 15,000 per day pro rata"]
+    vectors = embeddings.embed_documents(texts)
+
+    store.begin("thread-1", {"filename": "cp.pdf", "documents": 2})
+    assert not store.has_document("thread-1")
+
+    store.extend("thread-1", texts[:1], vectors[:1], [{"page": 0}], embeddings, progress={"pages_indexed": 1})
+    assert store.has_document("thread-1")
+    assert store.metadata("thread-1")["status"] == "indexing"
+    assert store.similarity_search("thread-1", texts[1], embeddings, k=4)[0].metadata == {"page": 0}
+    # nothing on disk until the build completes
+    assert not ThreadIndexStore(str(tmp_path)).has_document("thread-1")
+
+    store.extend("thread-1", texts[1:], vectors[1:], [{"page": 1}], embeddings)
+    entry = store.finish("thread-1", {"filename": "cp.pdf", "documents": 2, "chunks": 2})
+
+    assert entry["vectors"] == 2 and "status" not in store.metadata("thread-1")
+    hit = ThreadIndexStore(str(tmp_path)).similarity_search("thread-1", texts[1], embeddings, k=1)[0]
+    assert hit.metadata == {"page": 1}
@@ -0,0 +1,70 @@
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from db.cache_store import SqliteCache
+from tools.vessel_index import VesselIndex, edit_distance, normalize_name
+
+API_RESPONSE = [
+    {"SHIPNAME": "SARA", "MMSI": "403591001", "IMO": "9837119", "SHIP_ID": "12836167"},
+    {"SHIPNAME": "SARA EXPRESS", "MMSI": "636019825", "IMO": "9723588", "SHIP_ID": "5544332"},
+]
+
+
+def _index(tmp_path, **kwargs):
+    path = str(tmp_path / "c.db")
+    return VesselIndex(
+        cache=SqliteCache("vessels", path=path),
+        query_cache=SqliteCache("vessel_queries", path=path),
+        **kwargs,
+    )
+
+
+def test_normalize_and_edit_distance():
+    assert normalize_name("m/v  Sara-Express ") == "SARA EXPRESS"
+    assert edit_distance("SRAA", "SARA", 2) == 1
+    assert edit_distance("SARA", "STAR SARA", 1) == 2
+
+
+def test_learned_index_replays_queries_but_never_guesses(tmp_path):
+    index = _index(tmp_path)
+    assert index.search("sara") is None
+
+    index.learn("sara", API_RESPONSE)
+
+    replay = index.search("M/V Sara")
+    assert replay["match"] == "learned_query"
+    assert replay["data"][0]["MMSI"] == "403591001"
+
+    # Names are not unique and the index is partial: exact, fuzzy and
+    # partial-name queries go to the API...
+    index.learn("kara", [{"SHIPNAME": "KARA", "IMO": "1"}])
+    assert index.search("SARA EXPRESS") is None
+    assert index.search("KIRA") is None
+    assert index.search("SAR") is None
+    # ...and known names only come back as "did you mean" hints
+    assert index.suggestions("KIRA") == ["KARA"]
+
+    reloaded = _index(tmp_path)
+    assert reloaded.search("sara")["match"] == "learned_query"
+
+
+def test_bulk_dump_enables_prefix_search(tmp_path):
+    dump = tmp_path / "vessels.json"
+    dump.write_text(json.dumps({"data": API_RESPONSE + [
+        {"SHIPNAME": "STAR SARA", "MMSI": "1", "IMO": "2", "SHIP_ID": "3"},
+        {"SHIPNAME": "OCEAN STAR", "MMSI": "4", "IMO": "5", "SHIP_ID": "6"},
+    ]}))
+    index = _index(tmp_path, dump_path=str(dump))
+
+    result = index.search("sar")
+
+    assert result["match"] == "prefix"
+    assert {v["SHIPNAME"] for v in result["data"]} == {"SARA", "SARA EXPRESS", "STAR SARA"}
+
+    assert index.search("SARA")["match"] == "exact"
+    typo = index.search("Sara Exprss")
+    assert typo["match"] == "fuzzy"
+    assert typo["data"][0]["IMO"] == "9723588"
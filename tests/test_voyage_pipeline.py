@@ -0,0 +1,157 @@
+import sys
+import os
+import json
+
+from types import SimpleNamespace
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import nodes.voyage_estimate as pipeline
+from nodes.voyage_estimate import dead_end_node, pipeline_node, route_after_pipeline
+from tools.voyage_estimate import record_voyage_inputs
+
+
+def _recorded(**values):
+    call_id = "call_1"
+    return [
+        HumanMessage(content="40000 mt, 25 $/mt, Kandla to Qingdao"),
+        AIMessage(content="", tool_calls=[{"name": "record_voyage_inputs", "args": values, "id": call_id, "type": "tool_call"}]),
+        ToolMessage(
+            content=json.dumps(record_voyage_inputs.invoke(values)),
+            name="record_voyage_inputs",
+            tool_call_id=call_id,
+        ),
+    ]
+
+
+def test_recorded_cargo_runs_dwt_without_model_call():
+    state = {"messages": _recorded(cargo_quantity=40000, freight_rate=25)}
+
+    update = pipeline_node(state)
+
+    assert update["cargo_quantity"] == 40000.0
+    assert update["dwt"] == 44000.0
+    assert update["pipeline_inputs"] == {"dwt": [40000.0, None]}
+
+    call, result = update["messages"]
+    assert call.tool_calls[0]["name"] == "calculate_dwt"
+    assert result.tool_call_id == call.tool_calls[0]["id"]
+    assert json.loads(result.content) == {"dwt": 44000.0}
+
+    # Same inputs again → nothing re-runs
+    rerun = pipeline_node({**state, **update, "messages": [HumanMessage(content="ok")]})
+    assert rerun["messages"] == []
+
+
+def test_record_tool_rejects_invalid_values():
+    result = record_voyage_inputs.invoke({"cargo_quantity": 0})
+    assert result["status"] == "error"
+    assert result["type"] == "invalid_input"
+
+
+def test_dead_end_is_not_repeated_and_a_correction_reruns_the_step():
+    state = {"messages": [], "cargo_quantity": "lots", "pipeline_inputs": {}}
+
+    update = pipeline_node(state)
+
+    assert update["dead_reason"] == "Cargo quantity must be a numeric value in MT."
+    assert route_after_pipeline({**state, **update}) == "dead_end"
+
+    reply = dead_end_node({**state, **update})
+    assert reply["dead_reason"] is None
+    assert "numeric" in reply["messages"][0].content
+
+    # Next user turn: the failed step is not retried, the model gets the turn
+    state = {**state, **update, **reply, "messages": [HumanMessage(content="sorry, 40k mt")]}
+    retry = pipeline_node(state)
+    assert not retry.get("dead_reason")
+    assert route_after_pipeline({**state, **retry}) == "chat_node"
+
+    # ...and once it records the correction, DWT runs again
+    corrected = pipeline_node({**state, **retry, "messages": _recorded(cargo_quantity=40000)})
+    assert corrected["dwt"] == 44000.0
+
+
+def _stub_tools(monkeypatch, calls):
+    def stub(name, result):
+        def run(**kwargs):
+            calls.append(name)
+            return result(**kwargs) if callable(result) else result
+        return SimpleNamespace(func=run)
+
+    vessels = {
+        "SARA": {"SHIPNAME": "SARA", "MMSI": "403591001", "IMO": "9837119", "SHIP_ID": "1"},
+        "KARA": {"SHIPNAME": "KARA", "MMSI": "636019825", "IMO": "9723588", "SHIP_ID": "2"},
+    }
+    monkeypatch.setattr(pipeline, "match_open_vessels", stub("match_open_vessels", [vessels["SARA"], vessels["KARA"]]))
+    monkeypatch.setattr(pipeline, "get_vessels_by_name", stub("get_vessels_by_name", lambda query: [vessels[query]]))
+    monkeypatch.setattr(pipeline, "vessel_particulars_cache", SimpleNamespace(
+        get=stub("get_vessel_particulars", lambda **kw: {"SHIPNAME": kw["vessel_name"]}).func
+    ))
+    monkeypatch.setattr(pipeline, "parse_speed_and_consumption_ai", stub(
+        "parse_speed_and_consumption_ai",
+        lambda speed_and_consumption: {
+            "status": "auto_extracted", "ballast_speed": 13.0, "laden_speed": 12.0,
+            "ballast_consumption": 24.0, "laden_consumption": 26.0, "fuel_type": "VLSFO",
+        },
+    ))
+    monkeypatch.setattr(pipeline, "get_port_distance", stub("get_port_distance", {"distance": 4500}))
+    monkeypatch.setattr(pipeline, "compute_voyage_itinerary", stub(
+        "compute_voyage_itinerary", lambda legs, speeds: {"status": "success", "legs": legs}
+    ))
+    monkeypatch.setattr(pipeline, "get_bunker_spotprices_for_ports", stub(
+        "get_bunker_spotprices_for_ports", {"KANDLA": {"VLSFO": 610}}
+    ))
+
+
+def _turn(state, **recorded):
+    update = pipeline_node({**state, "messages": _recorded(**recorded)})
+    return {**state, **{k: v for k, v in update.items() if k != "messages"}}
+
+
+def test_vessel_selection_runs_the_chain_and_a_new_vessel_reruns_it(monkeypatch):
+    calls = []
+    _stub_tools(monkeypatch, calls)
+
+    state = _turn(
+        {}, cargo_quantity=40000, freight_rate=25, load_port="Kandla", discharge_port="Qingdao",
+        hire_rate=15000, weather_factor_pct=0, address_commission_pct=0,
+    )
+    assert calls == ["match_open_vessels"]
+    assert state["matched_vessels"]["count"] == 2
+
+    calls.clear()
+    state = _turn(
+        state, selected_vessel_name="SARA", selected_vessel_open_port="Fujairah",
+        selected_vessel_speed_consumption="13/24 ballast, 12/26 laden",
+    )
+    assert calls == [
+        "get_vessels_by_name", "get_vessel_particulars", "parse_speed_and_consumption_ai",
+        "get_port_distance", "compute_voyage_itinerary", "get_bunker_spotprices_for_ports",
+    ]
+    assert state["voyage_days"]["legs"][0] == {"type": "ballast", "from": "Fujairah", "to": "Kandla"}
+    assert state["bunker_prices"] == {"KANDLA": {"VLSFO": 610}}
+
+    # Another vessel (same speed text): speeds, itinerary and prices run again
+    calls.clear()
+    state = _turn(
+        state, selected_vessel_name="KARA", selected_vessel_open_port="Kandla",
+        selected_vessel_speed_consumption="13/24 ballast, 12/26 laden",
+    )
+    assert calls == [
+        "get_vessels_by_name", "get_vessel_particulars", "parse_speed_and_consumption_ai",
+        "compute_voyage_itinerary", "get_bunker_spotprices_for_ports",
+    ]
+    assert state["speed_consumption"]["laden_speed"] == 12.0
+    assert state["voyage_days"]["legs"] == [
+        {"type": "laden", "from": "Kandla", "to": "Qingdao", "distance_nm": 4500.0}
+    ]
+
+    # Another vessel without speed text: the previous vessel's text is dropped
+    calls.clear()
+    state = _turn(state, selected_vessel_name="SARA")
+    assert state["selected_vessel_speed_consumption"] is None
+    assert state["speed_consumption"] is None and state["voyage_days"] is None
+    assert "parse_speed_and_consumption_ai" not in calls
@@ -0,0 +1,109 @@
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tools.voyage_risk as voyage_risk
+from tools.voyage_estimate import calculate_quick_voyage_pnl, calculate_voyage_pnl, simulate_voyage_pnl_risk
+from tools.voyage_risk import simulate
+
+BASE = {
+    "cargo_quantity_mt": 39855,
+    "freight_rate": 25.5,
+    "freight_is_lumpsum": False,
+    "voyage_days": 57.31,
+    "hire_rate_per_day": 14000,
+    "total_bunker_mt": 1865.5,
+    "bunker_price_per_mt": 610,
+    "port_cost_usd": 85000,
+    "misc_cost_usd": 12000,
+    "broker_commission_pct": 0.0125,
+}
+
+DISTRIBUTIONS = {
+    "bunker_price_per_mt": {"dist": "normal", "mean": 610, "std": 60},
+    "port_days": {"dist": "triangular", "low": 0, "mode": 1, "high": 5},
+}
+
+
+def test_seeded_runs_are_reproducible_across_batches():
+    a = simulate(BASE, DISTRIBUTIONS, n_samples=50000, seed=7)
+    b = simulate(BASE, DISTRIBUTIONS, n_samples=50000, seed=7)
+    assert a["metrics"] == b["metrics"]
+    assert a["risk"] == b["risk"]
+
+    p = a["metrics"]["pnl"]["percentiles"]
+    assert p["p1"] <= p["p50"] <= p["p99"]
+    assert 0.0 <= a["risk"]["probability_of_loss"] <= 1.0
+    assert a["risk"]["cvar_95"] >= a["risk"]["var_95"]
+
+
+def test_fixed_inputs_collapse_to_scalar_pnl():
+    fixed = {k: v for k, v in BASE.items() if k != "bunker_price_per_mt"}
+    result = simulate(fixed, {"bunker_price_per_mt": {"dist": "choice", "values": [610]}}, n_samples=1000)
+    pnl = calculate_quick_voyage_pnl.invoke(BASE)["pnl"]
+
+    stats = result["metrics"]["pnl"]
+    assert stats["min"] == stats["max"] == pnl
+    assert result["risk"]["probability_of_loss"] == (1.0 if pnl < 0 else 0.0)
+
+
+def test_tool_rejects_unknown_inputs():
+    result = simulate_voyage_pnl_risk.invoke({
+        "base_inputs": BASE,
+        "distributions": {"bunker_prce": {"dist": "normal", "mean": 600, "std": 50}},
+    })
+    assert result["status"] == "error"
+    assert "bunker_prce" in result["message"]
+
+
+FULL_BASE = {
+    "cargo_rows": [
+        {"cp_qty": 50000, "frt_rate": 22.5, "option_pct": 0.05},
+        {"cp_qty": 30000, "frt_rate": 0, "lumpsum": 650000},
+    ],
+    "demurrage_rows": [{"amount": 42000}],
+    "despatch_rows": [{"amount": 9000}],
+    "mis_revenue": 5000, "broker_commission": 0.0125, "voyage_days": 41.7,
+    "hire_rate": 14500, "tci_add_com": 0.0375, "tci_broker_com": 0.0125,
+    "port_expenses": 120000, "misc_expenses": 8000,
+    "address_commission": 0.0375, "option_percentage": 0.1, "canal_cost": 65000,
+}
+
+
+def test_full_model_samples_match_calculate_voyage_pnl():
+    result = simulate_voyage_pnl_risk.invoke({
+        "base_inputs": {k: v for k, v in FULL_BASE.items() if k != "hire_rate"},
+        "distributions": {"hire_rate": {"dist": "choice", "values": [12000, 14500, 17000]}},
+        "n_samples": 3000,
+        "seed": 3,
+        "model": "full",
+    })
+    assert result["status"] == "success" and result["model"] == "full"
+
+    for hire, stat in ((12000, "max"), (17000, "min")):
+        expected = calculate_voyage_pnl.invoke({**FULL_BASE, "hire_rate": hire, "bunkers": {}})["results"]
+        assert np.isclose(result["metrics"]["pnl"][stat], expected["pnl"], rtol=1e-12)
+        assert np.isclose(result["metrics"]["tce"][stat], expected["tce"], rtol=1e-12)
+
+    # Quick-model inputs are rejected by the full model
+    wrong = simulate_voyage_pnl_risk.invoke({
+        "base_inputs": FULL_BASE,
+        "distributions": {"bunker_price_per_mt": {"dist": "normal", "mean": 600, "std": 50}},
+        "model": "full",
+    })
+    assert wrong["status"] == "error" and "bunker_price_per_mt" in wrong["message"]
+
+
+def test_process_pool_gives_the_in_process_result(monkeypatch):
+    monkeypatch.setattr(voyage_risk, "BATCH_SIZE", 5000)
+    monkeypatch.setattr(voyage_risk, "PROCESS_POOL_THRESHOLD", 10000)
+
+    pooled = simulate(BASE, DISTRIBUTIONS, n_samples=20000, seed=11, workers=2)
+    local = simulate(BASE, DISTRIBUTIONS, n_samples=20000, seed=11, workers=1)
+
+    assert pooled["parallel"] and not local["parallel"]
+    assert pooled["metrics"] == local["metrics"]
+    assert pooled["risk"] == local["risk"]
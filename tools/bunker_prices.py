@@ -0,0 +1,184 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+# =========================
+# Custom
+# =========================
+from db.cache_store import SqliteCache, is_cacheable
+
+
+def normalize_port(port_name: str) -> str:
+    return " ".join(str(port_name).upper().split())
+
+
+# ==========================
+# Bunker Price Snapshot Store
+# ==========================
+class BunkerPriceStore:
+    """
+    Per-port snapshots of the full Bunker Prices API response (spot + futures).
+
+    - age <= fresh_seconds      → served from the snapshot
+    - age <= max_stale_seconds  → served from the snapshot, refreshed in the
+                                  background (stale-while-revalidate)
+    - otherwise / missing       → fetched from the API and stored
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[[str], dict],
+        cache: SqliteCache,
+        fresh_seconds: float,
+        max_stale_seconds: float,
+        afetcher: Optional[Callable[[str], Awaitable[dict]]] = None,
+        max_workers: int = 4,
+    ):
+        self.fetcher = fetcher
+        self.afetcher = afetcher
+        self.cache = cache
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max(max_stale_seconds, fresh_seconds)
+
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+        # Background refreshes / prewarm only: a user's snapshot misses never queue behind them
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bunker-prices")
+        self._inflight: set = set()
+        self._lock = threading.Lock()
+
+    # ------------------------------
+    # Snapshot lookup
+    # ------------------------------
+    def _from_snapshot(self, port_name: str) -> Optional[dict]:
+        """Return a usable snapshot (scheduling a refresh if stale), or None on a miss."""
+        entry = self.cache.lookup(normalize_port(port_name))
+
+        if entry is not None:
+            value, age = entry
+
+            if age <= self.fresh_seconds:
+                self.fresh_hits += 1
+                return value
+
+            if age <= self.max_stale_seconds:
+                self.stale_hits += 1
+                self._schedule_refresh(port_name)
+                return value
+
+        self.misses += 1
+        return None
+
+    def _store(self, port_name: str, data: dict) -> dict:
+        if is_cacheable(data):
+            self.cache.set(normalize_port(port_name), data)
+        return data
+
+    # ------------------------------
+    # Background refresh
+    # ------------------------------
+    def _schedule_refresh(self, port_name: str):
+        key = normalize_port(port_name)
+
+        with self._lock:
+            if key in self._inflight:
+                return None
+            self._inflight.add(key)
+
+        return self._executor.submit(self._refresh, port_name, key)
+
+    def _refresh(self, port_name: str, key: str) -> None:
+        try:
+            data = self.fetcher(port_name)
+            if is_cacheable(data):
+                self.cache.set(key, data)
+                self.refreshes += 1
+            else:
+                self.refresh_errors += 1
+        except Exception:
+            self.refresh_errors += 1
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+    def prewarm(self, port_names: Iterable[str]) -> List:
+        """Refresh snapshots for the given hubs in the background; returns the futures."""
+        futures = []
+        for port_name in port_names:
+            if not str(port_name).strip():
+                continue
+            entry = self.cache.lookup(normalize_port(port_name))
+            if entry is None or entry[1] > self.fresh_seconds:
+                future = self._schedule_refresh(port_name)
+                if future is not None:
+                    futures.append(future)
+        return futures
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def get(self, port_name: str) -> dict:
+        snapshot = self._from_snapshot(port_name)
+        if snapshot is not None:
+            return snapshot
+        return self._store(port_name, self.fetcher(port_name))
+
+    def get_many(self, port_names: Iterable[str]) -> Dict[str, dict]:
+        """Prices for several ports; snapshot misses are fetched concurrently."""
+        results: Dict[str, dict] = {}
+        missing: List[str] = []
+
+        for port_name in dict.fromkeys(port_names):
+            snapshot = self._from_snapshot(port_name)
+            if snapshot is not None:
+                results[port_name] = snapshot
+            else:
+                missing.append(port_name)
+
+        def fetch(port_name: str) -> dict:
+            return self._store(port_name, self.fetcher(port_name))
+
+        if len(missing) > 1:
+            workers = min(self.max_workers, len(missing))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bunker-prices-fetch") as pool:
+                results.update(zip(missing, pool.map(fetch, missing)))
+        elif missing:
+            results[missing[0]] = fetch(missing[0])
+        return results
+
+    async def aget(self, port_name: str) -> dict:
+        snapshot = self._from_snapshot(port_name)
+        if snapshot is not None:
+            return snapshot
+
+        if self.afetcher is None:
+            data = await asyncio.to_thread(self.fetcher, port_name)
+        else:
+            data = await self.afetcher(port_name)
+        return self._store(port_name, data)
+
+    async def aget_many(self, port_names: Iterable[str]) -> Dict[str, dict]:
+        ports = list(dict.fromkeys(port_names))
+        prices = await asyncio.gather(*(self.aget(p) for p in ports))
+        return dict(zip(ports, prices))
+
+    def stats(self) -> dict:
+        lookups = self.fresh_hits + self.stale_hits + self.misses
+        return {
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "hit_ratio": round((self.fresh_hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "snapshots": len(self.cache),
+        }
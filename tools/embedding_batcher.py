@@ -0,0 +1,274 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# =========================
+# Custom
+# =========================
+from tools.token_estimate import estimate_tokens
+
+# ==========================
+# Embedding Scheduler Configuration
+# ==========================
+BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "60000"))
+MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "8"))
+# Deployment quota (0 = no client-side limit)
+REQUESTS_PER_MINUTE = int(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "2100"))
+TOKENS_PER_MINUTE = int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "350000"))
+MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "6"))
+
+BACKOFF_BASE = 1.0       # seconds, doubled per retry (with jitter)
+BACKOFF_MAX = 60.0
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "Timeout", "ConnectionError", "ReadTimeout"}
+
+
+def _status(exc: Exception) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    return _status(exc) == 429
+
+
+def is_retryable(exc: Exception) -> bool:
+    return _status(exc) in RETRYABLE_STATUS or type(exc).__name__ in RETRYABLE_ERRORS
+
+
+def retry_after(exc: Exception) -> Optional[float]:
+    """Server-requested wait (Retry-After / retry-after-ms headers), if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+# ==========================
+# Rate Limiting
+# ==========================
+class RateLimiter:
+    """
+    Request and token buckets refilled continuously from per-minute quotas.
+    A batch larger than the whole token bucket is let through once the
+    bucket is full, so oversized batches cannot deadlock.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens: int) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+
+                waits = [self._paused_until - now]
+                if self.rpm and self._requests < 1:
+                    waits.append((1 - self._requests) * 60 / self.rpm)
+                if self.tpm and self._tokens < min(tokens, self.tpm):
+                    waits.append((min(tokens, self.tpm) - self._tokens) * 60 / self.tpm)
+
+                delay = max(waits)
+                if delay <= 0:
+                    if self.rpm:
+                        self._requests -= 1
+                    if self.tpm:
+                        self._tokens -= tokens
+                    return
+            self._sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back (server asked us to slow down)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class AdaptiveConcurrency:
+    """In-flight request limit: halved on every rate-limit response, +1 per success (AIMD)."""
+
+    def __init__(self, maximum: int):
+        self.maximum = max(1, maximum)
+        self.limit = self.maximum
+        self._active = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+
+    def release(self, rate_limited: bool = False) -> None:
+        with self._cond:
+            self._active -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+            else:
+                self.limit = min(self.maximum, self.limit + 1)
+            self._cond.notify_all()
+
+
+# ==========================
+# Batched Embedding
+# ==========================
+def make_batches(texts: Sequence[str], batch_size: int, max_tokens: int) -> List[Tuple[int, List[str]]]:
+    """(start index, texts) batches bounded by count and estimated tokens."""
+    batches: List[Tuple[int, List[str]]] = []
+    start, current, current_tokens = 0, [], 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (len(current) >= batch_size or current_tokens + tokens > max_tokens):
+            batches.append((start, current))
+            start, current, current_tokens = i, [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        batches.append((start, current))
+    return batches
+
+
+class EmbeddingBatcher:
+    """
+    Embed many texts through a sync `embed_fn` (e.g. embeddings.embed_documents)
+    in bounded batches, with up to `max_concurrency` requests in flight, the
+    deployment's request / token quotas, and exponential backoff (honouring
+    Retry-After) on throttling and transient errors.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        batch_size: int = BATCH_SIZE,
+        batch_max_tokens: int = BATCH_MAX_TOKENS,
+        max_concurrency: int = MAX_CONCURRENCY,
+        requests_per_minute: int = REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = TOKENS_PER_MINUTE,
+        max_retries: int = MAX_RETRIES,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.embed_fn = embed_fn
+        self.batch_size = max(1, batch_size)
+        self.batch_max_tokens = batch_max_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute, sleep=sleep)
+        self.concurrency = AdaptiveConcurrency(self.max_concurrency)
+        self._sleep = sleep
+
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+
+    def _embed_batch(self, texts: List[str], stop: threading.Event, cancelled: threading.Event) -> List[List[float]]:
+        tokens = sum(estimate_tokens(t) for t in texts)
+        for attempt in range(self.max_retries + 1):
+            if stop.is_set() or cancelled.is_set():
+                raise RuntimeError("Embedding cancelled")
+
+            self.concurrency.acquire()
+            self.limiter.acquire(tokens)
+            try:
+                self.requests += 1
+                vectors = self.embed_fn(texts)
+            except Exception as e:
+                limited = is_rate_limited(e)
+                self.concurrency.release(rate_limited=limited)
+                if not is_retryable(e) or attempt == self.max_retries:
+                    raise
+
+                self.retries += 1
+                delay = retry_after(e)
+                if delay is None:
+                    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * (0.5 + random.random() / 2)
+                if limited:
+                    self.throttled += 1
+                    self.limiter.pause(delay)
+                else:
+                    self._sleep(delay)
+                continue
+
+            self.concurrency.release()
+            return vectors
+
+        raise RuntimeError("unreachable")
+
+    def embed(
+        self,
+        texts: Sequence[str],
+        progress: Optional[Callable[[int, int], None]] = None,
+        cancelled: Optional[threading.Event] = None,
+    ) -> List[List[float]]:
+        """
+        Embeddings in input order. `progress(done, total)` is called from the
+        calling thread (safe for Streamlit). Setting `cancelled` stops the
+        remaining batches; the first failed batch stops the rest and its
+        error is re-raised (the caller's `cancelled` is never set).
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        cancelled = cancelled or threading.Event()
+        stop = threading.Event()  # internal: a failed batch stops its siblings
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        done = 0
+
+        pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="embed")
+        try:
+            pending = {
+                pool.submit(self._embed_batch, batch, stop, cancelled): (start, len(batch))
+                for start, batch in make_batches(texts, self.batch_size, self.batch_max_tokens)
+            }
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    start, size = pending.pop(future)
+                    results[start:start + size] = future.result()
+                    done += size
+                    if progress is not None:
+                        progress(done, len(texts))
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        return results
@@ -0,0 +1,229 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import os
+import re
+from typing import Dict, List, Mapping, Optional, Sequence
+
+# ==========================
+# Third-Party Libraries
+# ==========================
+import numpy as np
+
+# =========================
+# Custom
+# =========================
+from tools.http_client import POOL_MAXSIZE
+from tools.pnl_engine import QUICK_PNL_INPUTS, quick_voyage_pnl_arrays
+from tools.speed_parser import parse_speed_consumption
+from tools.vessel_index import _field, extract_vessels, vessel_record
+
+# ==========================
+# Ranking Configuration
+# ==========================
+MAX_CANDIDATES = int(os.getenv("FLEET_RANKING_MAX_CANDIDATES", "500"))
+# Concurrent distance / particulars lookups per ranking; capped at the shared
+# HTTP session's pool size so no connection is opened and thrown away
+MAX_WORKERS = min(POOL_MAXSIZE, int(os.getenv("FLEET_RANKING_MAX_WORKERS", "32")))
+
+# Best-match-vessel / particulars field names (matched case- and underscore-insensitively)
+OPEN_PORT_FIELDS = ("OPEN_PORT", "OPENPORT", "CURRENT_PORT", "PORT")
+OPEN_DATE_FIELDS = ("OPEN_DATE", "OPENDATE", "ETA")
+DWT_FIELDS = ("DWT", "SUMMER_DWT", "FORMULA_DWT")
+HIRE_FIELDS = ("HIRE_RATE", "HIRE", "DAILY_HIRE", "TC_RATE")
+SPEED_TEXT_FIELDS = ("SPEED_AND_CONSUMPTION", "SPEED_CONSUMPTION", "SPEED_CONS", "DESCRIPTION")
+SERVICE_SPEED_FIELDS = ("SERVICE_SPEED", "SPEED_SERVICE", "SPEED")
+CONSUMPTION_FIELDS = ("FUEL_CONSUMPTION", "CONSUMPTION_PER_DAY", "BUNKER_CONSUMPTION", "CONSUMPTION")
+
+# Particulars fields the ranking reads (all static → long cache TTL)
+PARTICULARS_FIELDS = SERVICE_SPEED_FIELDS + CONSUMPTION_FIELDS
+
+OBJECTIVES = ("tce", "daily_profit", "pnl")
+
+# Inputs the ranking derives per vessel
+DERIVED = ("voyage_days", "total_bunker_mt")
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _number(value) -> Optional[float]:
+    if value is None:
+        return None
+    match = _NUMBER.search(str(value).replace(",", ""))
+    return float(match.group()) if match else None
+
+
+# ==========================
+# Candidates
+# ==========================
+def fleet_candidates(payload, limit: Optional[int] = None) -> List[dict]:
+    """Normalized candidate rows from a match_open_vessels response."""
+    candidates = []
+    for raw in extract_vessels(payload):
+        record = vessel_record(raw)
+        if record is None:
+            continue
+
+        text = _field(raw, SPEED_TEXT_FIELDS)
+        parsed = parse_speed_consumption(text) if text else {}
+
+        candidates.append({
+            "name": record["name"],
+            "mmsi": record["mmsi"],
+            "imo": record["imo"],
+            "ship_id": record["ship_id"],
+            "open_port": _field(raw, OPEN_PORT_FIELDS),
+            "open_date": _field(raw, OPEN_DATE_FIELDS),
+            "dwt": _number(_field(raw, DWT_FIELDS)),
+            "hire_rate": _number(_field(raw, HIRE_FIELDS)),
+            "parsed_speeds": parsed if parsed.get("confident") else None,
+        })
+        if limit is not None and len(candidates) >= limit:
+            break
+
+    return candidates
+
+
+def vessel_speeds(candidate: Mapping, particulars: Optional[Mapping], defaults: Optional[Mapping]) -> dict:
+    """
+    Ballast / laden speed and consumption for one candidate: the vessel's own
+    speed text first, then service speed / consumption from its particulars,
+    then the caller's defaults.
+    """
+    keys = ("ballast_speed", "laden_speed", "ballast_consumption", "laden_consumption")
+    parsed = candidate.get("parsed_speeds") or {}
+    if all(parsed.get(k) for k in keys):
+        return {**{k: float(parsed[k]) for k in keys}, "source": "vessel_text"}
+
+    if isinstance(particulars, Mapping) and "error" not in particulars:
+        records = extract_vessels(particulars) or [particulars]
+        speed = _number(_field(records[0], SERVICE_SPEED_FIELDS))
+        consumption = _number(_field(records[0], CONSUMPTION_FIELDS))
+        if speed and consumption:
+            return {
+                "ballast_speed": speed,
+                "laden_speed": speed,
+                "ballast_consumption": consumption,
+                "laden_consumption": consumption,
+                "source": "particulars",
+            }
+
+    defaults = defaults or {}
+    if all(defaults.get(k) for k in keys):
+        return {**{k: float(defaults[k]) for k in keys}, "source": "defaults"}
+
+    return {**{k: None for k in keys}, "source": None}
+
+
+# ==========================
+# Vectorized Ranking
+# ==========================
+def rank_fleet(
+    candidates: Sequence[Mapping],
+    speeds: Sequence[Mapping],
+    ballast_distances: Sequence[Optional[float]],
+    laden_distance_nm: float,
+    cargo: Mapping,
+    port_days: float = 0.0,
+    port_consumption: float = 0.0,
+    objective: str = "tce",
+) -> List[dict]:
+    """
+    Voyage days, bunkers and quick P&L for every candidate in one vectorized
+    pass (compute_voyage_days / compute_bunker_consumption per leg), ranked by
+    `objective`. Candidates missing a distance or speed figure go last with
+    "rank": None and the reason.
+
+    `cargo` holds the quick P&L inputs except voyage_days / total_bunker_mt;
+    its hire_rate_per_day is used for vessels without their own hire rate.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}. Available: {', '.join(OBJECTIVES)}")
+    clash = set(cargo) & set(DERIVED)
+    if clash:
+        raise ValueError(f"Derived per vessel, do not pass: {', '.join(sorted(clash))}")
+    unknown = set(cargo) - set(QUICK_PNL_INPUTS)
+    if unknown:
+        raise ValueError(f"Unknown inputs: {', '.join(sorted(unknown))}")
+
+    n = len(candidates)
+    if n == 0:
+        return []
+
+    def column(values) -> np.ndarray:
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+    ballast_nm = column(ballast_distances)
+    ballast_speed = column(s["ballast_speed"] for s in speeds)
+    laden_speed = column(s["laden_speed"] for s in speeds)
+    ballast_cons = column(s["ballast_consumption"] for s in speeds)
+    laden_cons = column(s["laden_consumption"] for s in speeds)
+
+    default_hire = cargo.get("hire_rate_per_day")
+    hire = column(c.get("hire_rate") or default_hire for c in candidates)
+
+    # --------- DAYS & BUNKERS ---------
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ballast_days = np.where(ballast_nm > 0, ballast_nm / (ballast_speed * 24), np.where(ballast_nm == 0, 0.0, np.nan))
+        laden_days = laden_distance_nm / (laden_speed * 24)
+        voyage_days = ballast_days + laden_days + port_days
+        bunkers = ballast_days * ballast_cons + laden_days * laden_cons + port_days * port_consumption
+
+        base = {k: v for k, v in cargo.items() if k != "hire_rate_per_day"}
+        outputs = quick_voyage_pnl_arrays(
+            **base,
+            voyage_days=np.nan_to_num(voyage_days, nan=0.0),
+            total_bunker_mt=np.nan_to_num(bunkers, nan=0.0),
+            hire_rate_per_day=np.nan_to_num(hire, nan=0.0),
+        )
+
+    # --------- VALIDITY & ORDER ---------
+    reasons = np.full(n, None, dtype=object)
+    reasons[np.isnan(hire)] = "missing hire rate"
+    reasons[np.isnan(laden_speed) | np.isnan(laden_cons) | (laden_speed <= 0)] = "missing speed / consumption"
+    reasons[np.isnan(ballast_nm)] = "ballast distance unavailable"
+    valid = reasons == None  # noqa: E711 — elementwise on an object array
+
+    score = np.where(valid, outputs[objective], -np.inf)
+    order = np.argsort(-score, kind="stable")
+
+    rows = []
+    rank = 0
+    for i in order:
+        row = {
+            "rank": None,
+            "vessel_name": candidates[i]["name"],
+            "imo": candidates[i].get("imo"),
+            "mmsi": candidates[i].get("mmsi"),
+            "ship_id": candidates[i].get("ship_id"),
+            "open_port": candidates[i].get("open_port"),
+            "open_date": candidates[i].get("open_date"),
+            "dwt": candidates[i].get("dwt"),
+            "speed_source": speeds[i].get("source"),
+        }
+        if valid[i]:
+            rank += 1
+            row.update({
+                "rank": rank,
+                "ballast_distance_nm": float(ballast_nm[i]),
+                "ballast_speed": float(ballast_speed[i]),
+                "laden_speed": float(laden_speed[i]),
+                "ballast_days": float(ballast_days[i]),
+                "laden_days": float(laden_days[i]),
+                "voyage_days": float(voyage_days[i]),
+                "total_bunker_mt": float(bunkers[i]),
+                "hire_rate_per_day": float(hire[i]),
+                "pnl": float(outputs["pnl"][i]),
+                "daily_profit": float(outputs["daily_profit"][i]),
+                "tce": float(outputs["tce"][i]),
+            })
+        else:
+            row["excluded_reason"] = reasons[i]
+        rows.append(row)
+
+    return rows
+
+
+def unique_open_ports(candidates: Sequence[Mapping]) -> Dict[str, None]:
+    """Open ports in first-seen order (one distance lookup per port, not per vessel)."""
+    return dict.fromkeys(c["open_port"].upper() for c in candidates if c.get("open_port"))
@@ -0,0 +1,96 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import asyncio
+import os
+import weakref
+
+# ==========================
+# Third-Party Libraries
+# ==========================
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# ==========================
+# Pool Configuration
+# ==========================
+# Number of per-host pools kept alive, and connections kept per host.
+POOL_CONNECTIONS = int(os.getenv("OCEANN_POOL_CONNECTIONS", "10"))
+POOL_MAXSIZE = int(os.getenv("OCEANN_POOL_MAXSIZE", "20"))
+
+# Per-endpoint read/connect timeouts (seconds).
+# Override any entry with OCEANN_TIMEOUT_<ENDPOINT>, e.g. OCEANN_TIMEOUT_GET_PORT_DISTANCE=10
+DEFAULT_TIMEOUT = 15.0
+ENDPOINT_TIMEOUTS = {
+    "get_vessels_by_name": 15.0,
+    "get_vessel_particulars": 30.0,
+    "categorize_single_port_call": 15.0,
+    "expected_port_arrivals": 15.0,
+    "get_port_distance": 20.0,
+    "get_bunker_spotprice_by_port": 15.0,
+    "get_weather_speed": 20.0,
+    "best_match_cargo": 20.0,
+    "match_open_vessels": 20.0,
+}
+
+
+def endpoint_timeout(endpoint: str) -> float:
+    """Return the configured timeout (seconds) for a TheOceann endpoint."""
+    override = os.getenv(f"OCEANN_TIMEOUT_{endpoint.upper()}")
+    if override:
+        try:
+            return float(override)
+        except ValueError:
+            pass
+    return ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+
+
+# ==========================
+# Shared Session
+# ==========================
+def _build_session() -> requests.Session:
+    """
+    Build a keep-alive session so repeated tool calls reuse TCP/TLS
+    connections instead of paying a fresh handshake per request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=False,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+http_session = _build_session()
+
+
+# ==========================
+# Shared Async Client
+# ==========================
+# httpx.AsyncClient pools are bound to the event loop that created them,
+# so one client is kept per running loop.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the pooled AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=POOL_CONNECTIONS * POOL_MAXSIZE,
+                max_keepalive_connections=POOL_MAXSIZE,
+            ),
+            timeout=DEFAULT_TIMEOUT,
+        )
+        _ASYNC_CLIENTS[loop] = client
+
+    return client
@@ -0,0 +1,150 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# ==========================
+# Ingestion Queue Configuration
+# ==========================
+# PDFs indexed at the same time (embedding quota is shared through the batcher)
+INGEST_MAX_PARALLEL = int(os.getenv("INGEST_MAX_PARALLEL", "2"))
+# Finished jobs kept for status lookups
+JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "200"))
+
+ACTIVE = ("queued", "running")
+
+
+class IngestionQueue:
+    """
+    Background PDF ingestion. submit() returns a job id at once; jobs run on
+    a pool of `max_workers` threads and move through
+    queued → running → done | failed | cancelled.
+
+    `ingest_fn(file_bytes, thread_id, filename, progress=..., cancelled=...)`
+    is backend.ingest_pdf: it reports progress(stage, done, total) and stops
+    at the next checkpoint once the `cancelled` Event is set.
+
+    A thread holds one document, so a new upload cancels that thread's
+    earlier jobs, and jobs for the same thread never run concurrently.
+    """
+
+    def __init__(self, ingest_fn: Callable[..., dict], max_workers: int = INGEST_MAX_PARALLEL):
+        self.ingest_fn = ingest_fn
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ingest")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, dict] = {}
+        self._thread_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def _public(job: dict) -> dict:
+        return {k: (dict(v) if isinstance(v, dict) else v) for k, v in job.items() if not k.startswith("_")}
+
+    def _trim(self) -> None:
+        finished = [j for j in self._jobs.values() if j["status"] not in ACTIVE]
+        for job in sorted(finished, key=lambda j: j["finished_at"])[:max(0, len(finished) - JOB_HISTORY)]:
+            del self._jobs[job["job_id"]]
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def submit(self, file_bytes: bytes, thread_id: str, filename: Optional[str] = None) -> str:
+        if not file_bytes:
+            raise ValueError("No bytes received for ingestion.")
+
+        thread_id = str(thread_id)
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "thread_id": thread_id,
+            "filename": filename,
+            "status": "queued",
+            "progress": {},
+            "error": None,
+            "result": None,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "_bytes": file_bytes,
+            "_cancelled": threading.Event(),
+        }
+
+        with self._lock:
+            for other in self._jobs.values():
+                if other["thread_id"] == thread_id and other["status"] in ACTIVE:
+                    other["_cancelled"].set()
+            self._jobs[job["job_id"]] = job
+            self._thread_locks.setdefault(thread_id, threading.Lock())
+            self._trim()
+
+        self._executor.submit(self._run, job)
+        return job["job_id"]
+
+    def status(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def jobs(self, thread_id: Optional[str] = None) -> List[dict]:
+        """Jobs (newest first), optionally for one thread."""
+        with self._lock:
+            selected = [j for j in self._jobs.values() if thread_id is None or j["thread_id"] == str(thread_id)]
+            return [self._public(j) for j in sorted(selected, key=lambda j: j["submitted_at"], reverse=True)]
+
+    def active_job(self, thread_id: str) -> Optional[dict]:
+        """The thread's queued / running job, if any."""
+        return next((j for j in self.jobs(thread_id) if j["status"] in ACTIVE), None)
+
+    def cancel(self, job_id: str) -> bool:
+        """Ask a queued / running job to stop; False if it already finished."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] not in ACTIVE:
+                return False
+            job["_cancelled"].set()
+            return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            for job in self._jobs.values():
+                job["_cancelled"].set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    # ------------------------------
+    # Worker
+    # ------------------------------
+    def _finish(self, job: dict, status: str, **fields) -> None:
+        with self._lock:
+            job.update(status=status, finished_at=time.time(), _bytes=None, **fields)
+
+    def _run(self, job: dict) -> None:
+        cancelled = job["_cancelled"]
+        with self._thread_locks[job["thread_id"]]:
+            if cancelled.is_set():
+                self._finish(job, "cancelled")
+                return
+
+            with self._lock:
+                job.update(status="running", started_at=time.time())
+
+            def progress(stage: str, done: int, total: int) -> None:
+                with self._lock:
+                    job["progress"][stage] = {"done": done, "total": total}
+
+            try:
+                result = self.ingest_fn(
+                    job["_bytes"], job["thread_id"], job["filename"], progress=progress, cancelled=cancelled
+                )
+            except Exception as e:
+                if cancelled.is_set():
+                    self._finish(job, "cancelled")
+                    print(f"⏹️ Ingestion of {job['filename']} cancelled")
+                else:
+                    self._finish(job, "failed", error=str(e))
+                    print(f"❌ Ingestion of {job['filename']} failed: {e}")
+                return
+
+            self._finish(job, "done", result=result)
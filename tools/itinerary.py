@@ -0,0 +1,166 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+from typing import Dict, List, Mapping, Optional, Sequence
+
+# ==========================
+# Third-Party Libraries
+# ==========================
+import numpy as np
+
+# ==========================
+# Itinerary Configuration
+# ==========================
+LEG_TYPES = ("ballast", "laden", "port")
+
+DEFAULT_FUEL = "VLSFO"
+DEFAULT_ECA_FUEL = "LSMGO"
+
+# Per-type fallbacks, named as in parse_speed_and_consumption_ai results
+SPEED_DEFAULTS = {"ballast": "ballast_speed", "laden": "laden_speed"}
+CONSUMPTION_DEFAULTS = {"ballast": "ballast_consumption", "laden": "laden_consumption", "port": "port_consumption"}
+
+
+def _leg_value(leg: Mapping, defaults: Mapping, key: str, default_key: Optional[str] = None, fallback=None):
+    value = leg.get(key)
+    if value is None and default_key is not None:
+        value = defaults.get(default_key)
+    return fallback if value is None else value
+
+
+def itinerary_columns(legs: Sequence[Mapping], defaults: Optional[Mapping] = None) -> dict:
+    """
+    Validate an ordered leg list and lay it out as columns.
+
+    Sea legs ("ballast" / "laden"): distance_nm, speed_knots, consumption_mt_per_day,
+    fuel_type, eca_fraction (share of the distance inside an ECA, burnt as
+    eca_fuel_type) and weather_factor_pct. Port stays ("port"): days,
+    consumption_mt_per_day, fuel_type. Missing speeds / consumptions / fuels
+    come from `defaults` (ballast_speed, laden_consumption, port_consumption,
+    fuel_type, eca_fuel_type, weather_factor_pct, ...).
+    """
+    defaults = defaults or {}
+    if not legs:
+        raise ValueError("Itinerary has no legs")
+
+    rows: Dict[str, list] = {k: [] for k in (
+        "distance_nm", "speed_knots", "days", "consumption", "eca_fraction", "weather_factor_pct",
+    )}
+    types: List[str] = []
+    fuels: List[str] = []
+    eca_fuels: List[str] = []
+    errors: List[str] = []
+
+    for i, leg in enumerate(legs):
+        leg_type = str(leg.get("type", "")).lower()
+        if leg_type not in LEG_TYPES:
+            errors.append(f"leg {i}: type must be one of {', '.join(LEG_TYPES)}")
+            continue
+
+        sea = leg_type != "port"
+        distance = _leg_value(leg, defaults, "distance_nm", fallback=0.0)
+        speed = _leg_value(leg, defaults, "speed_knots", SPEED_DEFAULTS.get(leg_type), 0.0)
+        days = _leg_value(leg, defaults, "days", fallback=0.0)
+        consumption = _leg_value(leg, defaults, "consumption_mt_per_day", CONSUMPTION_DEFAULTS[leg_type], 0.0)
+        eca_fraction = _leg_value(leg, defaults, "eca_fraction", fallback=0.0) if sea else 0.0
+        weather = _leg_value(leg, defaults, "weather_factor_pct", "weather_factor_pct", 0.0) if sea else 0.0
+
+        try:
+            distance, speed, days, consumption, eca_fraction, weather = (
+                float(v) for v in (distance, speed, days, consumption, eca_fraction, weather)
+            )
+        except (TypeError, ValueError):
+            errors.append(f"leg {i}: non-numeric value")
+            continue
+
+        if sea and (distance <= 0 or speed <= 0):
+            errors.append(f"leg {i}: {leg_type} leg needs distance_nm > 0 and speed_knots > 0")
+        if not sea and days < 0:
+            errors.append(f"leg {i}: port days must not be negative")
+        if consumption < 0 or not 0.0 <= eca_fraction <= 1.0:
+            errors.append(f"leg {i}: consumption must be >= 0 and eca_fraction within 0..1")
+
+        types.append(leg_type)
+        fuels.append(str(_leg_value(leg, defaults, "fuel_type", "fuel_type", DEFAULT_FUEL)).upper())
+        eca_fuels.append(str(_leg_value(leg, defaults, "eca_fuel_type", "eca_fuel_type", DEFAULT_ECA_FUEL)).upper())
+        for key, value in zip(rows, (distance, speed, days, consumption, eca_fraction, weather)):
+            rows[key].append(value)
+
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    columns = {k: np.array(v, dtype=np.float64) for k, v in rows.items()}
+    columns["type"] = np.array(types)
+    columns["fuel_type"] = fuels
+    columns["eca_fuel_type"] = eca_fuels
+    return columns
+
+
+def compute_itinerary(legs: Sequence[Mapping], defaults: Optional[Mapping] = None) -> dict:
+    """
+    Days and per-fuel bunkers for every leg, computed in one vectorized pass.
+
+    Sea days = distance / (speed × 24) × (1 + weather %), as compute_voyage_days
+    plus weather; the ECA share of the sea days burns the ECA fuel, the rest the
+    leg's main fuel. Port stays burn their own consumption for the given days.
+    """
+    c = itinerary_columns(legs, defaults)
+    sea = c["type"] != "port"
+
+    # --------- DAYS ---------
+    sea_days = np.zeros(sea.shape)
+    np.divide(c["distance_nm"], c["speed_knots"] * 24, out=sea_days, where=sea)
+    sea_days *= 1 + c["weather_factor_pct"] / 100
+
+    port_days = np.where(sea, 0.0, c["days"])
+    days = sea_days + port_days
+    eca_days = sea_days * c["eca_fraction"]
+
+    # --------- BUNKERS PER FUEL ---------
+    main_mt = (days - eca_days) * c["consumption"]
+    eca_mt = eca_days * c["consumption"]
+
+    fuel_names = list(dict.fromkeys(c["fuel_type"] + c["eca_fuel_type"]))
+    code = {name: i for i, name in enumerate(fuel_names)}
+    main_code = np.array([code[f] for f in c["fuel_type"]])
+    eca_code = np.array([code[f] for f in c["eca_fuel_type"]])
+
+    by_fuel = (
+        np.bincount(main_code, weights=main_mt, minlength=len(fuel_names)) +
+        np.bincount(eca_code, weights=eca_mt, minlength=len(fuel_names))
+    )
+
+    # --------- LEG DETAIL ---------
+    leg_rows = []
+    for i, leg in enumerate(legs):
+        bunkers = {c["fuel_type"][i]: float(main_mt[i])}
+        if eca_mt[i] > 0:
+            bunkers[c["eca_fuel_type"][i]] = bunkers.get(c["eca_fuel_type"][i], 0.0) + float(eca_mt[i])
+        leg_rows.append({
+            "type": str(c["type"][i]),
+            "label": leg.get("label") or " → ".join(p for p in (leg.get("from"), leg.get("to")) if p) or leg.get("port"),
+            "distance_nm": float(c["distance_nm"][i]) if sea[i] else 0.0,
+            "speed_knots": float(c["speed_knots"][i]) if sea[i] else None,
+            "sea_days": float(sea_days[i]),
+            "port_days": float(port_days[i]),
+            "eca_days": float(eca_days[i]),
+            "days": float(days[i]),
+            "bunkers_mt": bunkers,
+        })
+
+    ballast = c["type"] == "ballast"
+    laden = c["type"] == "laden"
+
+    return {
+        "legs": leg_rows,
+        "ballast_days": float(days[ballast].sum()),
+        "laden_days": float(days[laden].sum()),
+        "sea_days": float(sea_days.sum()),
+        "port_days": float(port_days.sum()),
+        "total_days": float(days.sum()),
+        "ballast_distance_nm": float(c["distance_nm"][ballast].sum()),
+        "laden_distance_nm": float(c["distance_nm"][laden].sum()),
+        "distance_nm": float(c["distance_nm"][sea].sum()),
+        "bunkers_by_fuel": {name: float(mt) for name, mt in zip(fuel_names, by_fuel) if mt > 0},
+        "total_bunker_mt": float(by_fuel.sum()),
+    }
@@ -0,0 +1,184 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+# =========================
+# Custom
+# =========================
+from db.cache_store import SqliteCache, is_cacheable
+
+# Lloyd's fields that change during a ship's life (sale, re-flag, re-class,
+# rename, lay-up). Matched as substrings of the upper-cased field name;
+# everything else (dimensions, tonnages, build year, machinery) is static.
+VOLATILE_FIELD_MARKERS = (
+    "OWNER", "MANAGER", "OPERATOR", "COMPANY", "FLAG", "NAME",
+    "STATUS", "CLASS", "PANDI", "P_I", "CALLSIGN",
+)
+
+# Fields cargo_block needs to size the vessel
+DWT_FIELDS = ("FORMULA_DWT", "SUMMER_DWT", "VESSEL_TYPE")
+
+
+def is_volatile_field(field: str) -> bool:
+    name = str(field).upper()
+    return any(marker in name for marker in VOLATILE_FIELD_MARKERS)
+
+
+def particulars_key(mmsi=None, imo=None, ship_id=None) -> Optional[str]:
+    """IMO is the stable hull identifier; MMSI / SHIP_ID only when IMO is unknown."""
+    for prefix, value in (("imo", imo), ("mmsi", mmsi), ("ship_id", ship_id)):
+        value = str(value or "").strip()
+        if value and value not in ("0", "None", "null"):
+            return f"{prefix}:{value}"
+    return None
+
+
+# ==========================
+# Vessel Particulars Cache
+# ==========================
+class ParticularsCache:
+    """
+    IMO-keyed store of raw get-vessel-particulars responses (zlib-compressed JSON).
+
+    Staleness is decided per request from the fields the caller needs:
+    static fields (dimensions, DWT, build year, ...) accept snapshots up to
+    `static_ttl`, anything touching ownership / flag / class / name up to
+    `volatile_ttl`. When a refetch fails, the last snapshot is served instead
+    of the error.
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[..., dict],
+        cache: SqliteCache,
+        static_ttl: float,
+        volatile_ttl: float,
+        afetcher: Optional[Callable[..., Awaitable[dict]]] = None,
+        max_workers: int = 8,
+    ):
+        self.fetcher = fetcher
+        self.afetcher = afetcher
+        self.cache = cache
+        self.static_ttl = static_ttl
+        self.volatile_ttl = min(volatile_ttl, static_ttl)
+        self.max_workers = max_workers
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+
+    def max_age(self, fields: Optional[Iterable[str]] = None) -> float:
+        """Full records (fields=None) are only as fresh as their most volatile field."""
+        if fields is None or any(is_volatile_field(f) for f in fields):
+            return self.volatile_ttl
+        return self.static_ttl
+
+    # ------------------------------
+    # Lookup helpers
+    # ------------------------------
+    def _cached(self, key: Optional[str], fields) -> tuple:
+        """(fresh_value_or_None, stale_value_or_None)"""
+        if key is None:
+            return None, None
+
+        entry = self.cache.lookup(key)
+        if entry is None:
+            return None, None
+
+        value, age = entry
+        if age <= self.max_age(fields):
+            return value, None
+        return None, value
+
+    def _settle(self, key: Optional[str], data: dict, stale) -> dict:
+        if is_cacheable(data):
+            if key is not None:
+                self.cache.set(key, data)
+            return data
+
+        if stale is not None:
+            self.stale_served += 1
+            return stale
+        return data
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def get(self, mmsi: str, imo: str, ship_id: str, vessel_name: str, fields: Optional[Iterable[str]] = None) -> dict:
+        key = particulars_key(mmsi, imo, ship_id)
+        fresh, stale = self._cached(key, fields)
+        if fresh is not None:
+            self.hits += 1
+            return fresh
+
+        self.misses += 1
+        return self._settle(key, self.fetcher(mmsi, imo, ship_id, vessel_name), stale)
+
+    async def aget(self, mmsi: str, imo: str, ship_id: str, vessel_name: str, fields: Optional[Iterable[str]] = None) -> dict:
+        key = particulars_key(mmsi, imo, ship_id)
+        fresh, stale = self._cached(key, fields)
+        if fresh is not None:
+            self.hits += 1
+            return fresh
+
+        self.misses += 1
+        if self.afetcher is None:
+            data = await asyncio.to_thread(self.fetcher, mmsi, imo, ship_id, vessel_name)
+        else:
+            data = await self.afetcher(mmsi, imo, ship_id, vessel_name)
+        return self._settle(key, data, stale)
+
+    def prefetch(self, fleet: List[dict], fields: Optional[Iterable[str]] = None) -> dict:
+        """
+        Warm the cache for a fleet list of {"mmsi", "imo", "ship_id", "vessel_name"}.
+        Only vessels without a fresh snapshot go over the wire (concurrently).
+        """
+        fields = list(fields) if fields is not None else None
+        pending: Dict[str, dict] = {}
+        cached = 0
+
+        for vessel in fleet:
+            key = particulars_key(vessel.get("mmsi"), vessel.get("imo"), vessel.get("ship_id"))
+            if key is None or key in pending:
+                continue
+            if self._cached(key, fields)[0] is not None:
+                cached += 1
+            else:
+                pending[key] = vessel
+
+        def fetch(vessel: dict) -> bool:
+            data = self.get(
+                str(vessel.get("mmsi") or ""),
+                str(vessel.get("imo") or ""),
+                str(vessel.get("ship_id") or ""),
+                str(vessel.get("vessel_name") or ""),
+                fields=fields,
+            )
+            return is_cacheable(data)
+
+        failed: List[str] = []
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="particulars") as pool:
+                for key, ok in zip(pending, pool.map(fetch, pending.values())):
+                    if not ok:
+                        failed.append(key)
+
+        return {
+            "status": "success",
+            "cached": cached,
+            "fetched": len(pending) - len(failed),
+            "failed": failed,
+        }
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_served": self.stale_served,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "vessels": len(self.cache),
+        }
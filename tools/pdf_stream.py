@@ -0,0 +1,74 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import os
+from typing import Iterable, Iterator, List, Tuple
+
+# ==========================
+# Third-Party Libraries
+# ==========================
+import pymupdf
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# ==========================
+# Streaming Ingestion Configuration
+# ==========================
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# Chunks embedded and added to the index per step (bounds peak memory)
+PDF_WINDOW_CHUNKS = int(os.getenv("PDF_WINDOW_CHUNKS", "512"))
+
+
+def make_splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP,
+        separators=["\n\n", "\n", " ", ""]
+    )
+
+
+# ==========================
+# Page Stream
+# ==========================
+def pdf_page_count(file_bytes: bytes) -> int:
+    with pymupdf.open(stream=file_bytes, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def iter_pdf_pages(file_bytes: bytes, source: str) -> Iterator[Document]:
+    """
+    One Document per page, opened straight from the uploaded bytes (no temp
+    file). Only the current page's text is held; metadata mirrors
+    PyPDFLoader's ("source", 0-based "page", "total_pages").
+    """
+    with pymupdf.open(stream=file_bytes, filetype="pdf") as doc:
+        total = doc.page_count
+        for number in range(total):
+            text = doc.load_page(number).get_text("text")
+            yield Document(
+                page_content=text,
+                metadata={"source": source, "page": number, "total_pages": total},
+            )
+
+
+def iter_chunk_windows(
+    pages: Iterable[Document],
+    splitter: RecursiveCharacterTextSplitter,
+    window: int = PDF_WINDOW_CHUNKS,
+) -> Iterator[Tuple[List[Document], int]]:
+    """
+    (chunks, pages read so far) in windows of about `window` chunks. Pages
+    are split as they arrive, so no more than one window of chunks (plus
+    one page) is in memory at a time.
+    """
+    window = max(1, window)
+    buffered: List[Document] = []
+    pages_read = 0
+    for page in pages:
+        pages_read += 1
+        buffered.extend(splitter.split_documents([page]))
+        while len(buffered) >= window:
+            yield buffered[:window], pages_read
+            buffered = buffered[window:]
+    if buffered:
+        yield buffered, pages_read
@@ -0,0 +1,682 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+from typing import Dict, Iterable, List, Mapping, Union
+
+# ==========================
+# Third-Party Libraries
+# ==========================
+import numpy as np
+
+# ==========================
+# Quick P&L — Vectorized
+# ==========================
+# Inputs of calculate_quick_voyage_pnl, in signature order, with defaults.
+QUICK_PNL_INPUTS = {
+    "cargo_quantity_mt": None,
+    "freight_rate": None,
+    "freight_is_lumpsum": None,
+    "voyage_days": None,
+    "hire_rate_per_day": None,
+    "total_bunker_mt": None,
+    "bunker_price_per_mt": None,
+    "port_cost_usd": 0.0,
+    "misc_cost_usd": 0.0,
+    "canal_cost_usd": 0.0,
+    "broker_commission_pct": 0.0,
+    "address_commission_pct": 0.0,
+    "weather_factor_pct": 0.0,
+}
+
+QUICK_PNL_OUTPUTS = (
+    "total_freight",
+    "gross_revenue",
+    "net_revenue",
+    "bunker_cost",
+    "hire_cost",
+    "other_misc_cost",
+    "total_voyage_cost",
+    "pnl",
+    "daily_profit",
+    "tce",
+    "gross_tce",
+    "break_even_freight_usd_per_mt",
+)
+
+AxisSpec = Union[float, Iterable[float], Mapping[str, float]]
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """numerator / denominator where valid, else 0.0 (no warnings for masked cells)."""
+    out = np.zeros(np.broadcast(numerator, denominator, valid).shape)
+    np.divide(numerator, denominator, out=out, where=valid)
+    return out
+
+
+def quick_voyage_pnl_arrays(**inputs) -> Dict[str, np.ndarray]:
+    """
+    Array version of calculate_quick_voyage_pnl.
+
+    Every input may be a scalar or any array broadcastable against the others;
+    each output has the broadcast shape. The arithmetic is performed in the
+    same order as the scalar tool, so every cell is bit-identical to a scalar call.
+    """
+    missing = [k for k, v in QUICK_PNL_INPUTS.items() if v is None and k not in inputs]
+    if missing:
+        raise ValueError(f"Missing required inputs: {', '.join(missing)}")
+
+    unknown = set(inputs) - set(QUICK_PNL_INPUTS)
+    if unknown:
+        raise ValueError(f"Unknown inputs: {', '.join(sorted(unknown))}")
+
+    values = {**{k: v for k, v in QUICK_PNL_INPUTS.items() if v is not None}, **inputs}
+
+    lumpsum = np.asarray(values.pop("freight_is_lumpsum"), dtype=bool)
+    f = {k: np.asarray(v, dtype=np.float64) for k, v in values.items()}
+
+    # --------- WEATHER ADJUSTED VOYAGE DAYS ---------
+    effective_voyage_days = f["voyage_days"] * (1 + f["weather_factor_pct"] / 100)
+
+    # --------- FREIGHT / REVENUE ---------
+    total_freight = np.where(lumpsum, f["freight_rate"], f["cargo_quantity_mt"] * f["freight_rate"])
+
+    gross_revenue = total_freight
+    freight_commission_value = gross_revenue * f["broker_commission_pct"]
+    net_revenue = gross_revenue - freight_commission_value
+
+    # --------- COSTS ---------
+    hire_cost = f["hire_rate_per_day"] * effective_voyage_days
+    bunker_cost = f["total_bunker_mt"] * f["bunker_price_per_mt"]
+
+    total_voyage_cost = (
+        hire_cost +
+        f["port_cost_usd"] +
+        f["misc_cost_usd"] +
+        f["canal_cost_usd"] +
+        bunker_cost
+    )
+
+    # --------- PNL & DAILY PROFIT ---------
+    pnl = net_revenue - total_voyage_cost
+    has_days = effective_voyage_days > 0
+    daily_profit = _safe_divide(pnl, effective_voyage_days, has_days)
+
+    # --------- TCE & GROSS TCE ---------
+    voyage_costs_excl_hire = (
+        bunker_cost + f["port_cost_usd"] + f["misc_cost_usd"] + f["canal_cost_usd"]
+    )
+    tce_numerator = net_revenue - voyage_costs_excl_hire
+    tce = _safe_divide(tce_numerator, effective_voyage_days, has_days)
+
+    address = f["address_commission_pct"]
+    address_ok = (address >= 0.0) & (address < 1.0)
+    gross_tce = np.where(address_ok, _safe_divide(tce, 1.0 - address, address_ok), tce)
+
+    # --------- BREAKEVEN FREIGHT ---------
+    net_share = 1.0 - f["broker_commission_pct"]
+    breakeven_ok = (f["cargo_quantity_mt"] > 0) & (net_share > 0)
+    break_even_freight = _safe_divide(total_voyage_cost, f["cargo_quantity_mt"] * net_share, breakeven_ok)
+
+    outputs = {
+        "total_freight": total_freight,
+        "gross_revenue": gross_revenue,
+        "net_revenue": net_revenue,
+        "bunker_cost": bunker_cost,
+        "hire_cost": hire_cost,
+        "other_misc_cost": f["misc_cost_usd"],
+        "total_voyage_cost": total_voyage_cost,
+        "pnl": pnl,
+        "daily_profit": daily_profit,
+        "tce": tce,
+        "gross_tce": gross_tce,
+        "break_even_freight_usd_per_mt": break_even_freight,
+    }
+    shape = np.broadcast_shapes(*(np.shape(v) for v in outputs.values()))
+    return {k: v if np.shape(v) == shape else np.broadcast_to(v, shape) for k, v in outputs.items()}
+
+
+# ==========================
+# Voyage Physics Inputs
+# ==========================
+# Optional inputs that derive voyage_days / total_bunker_mt for the quick model
+VOYAGE_PHYSICS_INPUTS = (
+    "distance_nm",
+    "speed_knots",
+    "port_days",
+    "sea_consumption_mt_per_day",
+    "reference_speed_knots",
+    "port_consumption_mt_per_day",
+)
+
+
+def expand_voyage_inputs(inputs: Mapping) -> dict:
+    """
+    Fold voyage physics into quick P&L inputs (scalars or arrays):
+
+    - distance_nm + speed_knots → voyage_days = distance / (speed × 24) + port_days
+      (as compute_voyage_days), and with sea_consumption_mt_per_day also
+      total_bunker_mt = sea days × consumption + port_days × port consumption.
+      With reference_speed_knots the sea consumption follows the cube law
+      consumption × (speed / reference speed)³.
+    - port_days alone extends a given voyage_days (and total_bunker_mt by the
+      port consumption, if given).
+    """
+    values = dict(inputs)
+    physics = {k: values.pop(k) for k in VOYAGE_PHYSICS_INPUTS if k in values}
+    if not physics:
+        return values
+
+    port_days = physics.get("port_days", 0.0)
+    port_bunker = np.multiply(port_days, physics.get("port_consumption_mt_per_day", 0.0))
+
+    if "distance_nm" in physics or "speed_knots" in physics:
+        if "distance_nm" not in physics or "speed_knots" not in physics:
+            raise ValueError("distance_nm and speed_knots must be given together")
+        if "voyage_days" in values:
+            raise ValueError("Give either voyage_days or distance_nm + speed_knots, not both")
+
+        speed = np.asarray(physics["speed_knots"], dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sea_days = physics["distance_nm"] / (speed * 24)
+        values["voyage_days"] = sea_days + port_days
+
+        if "sea_consumption_mt_per_day" in physics:
+            if "total_bunker_mt" in values:
+                raise ValueError("Give either total_bunker_mt or sea_consumption_mt_per_day, not both")
+            consumption = physics["sea_consumption_mt_per_day"]
+            if "reference_speed_knots" in physics:
+                consumption = consumption * (speed / physics["reference_speed_knots"]) ** 3
+            values["total_bunker_mt"] = sea_days * consumption + port_bunker
+        return values
+
+    if "sea_consumption_mt_per_day" in physics or "reference_speed_knots" in physics:
+        raise ValueError("sea_consumption_mt_per_day needs distance_nm and speed_knots")
+    if "voyage_days" not in values:
+        raise ValueError("port_days needs voyage_days or distance_nm + speed_knots")
+
+    values["voyage_days"] = values["voyage_days"] + port_days
+    if "port_consumption_mt_per_day" in physics and "total_bunker_mt" in values:
+        values["total_bunker_mt"] = values["total_bunker_mt"] + port_bunker
+    return values
+
+
+# ==========================
+# Scenario Grid
+# ==========================
+def axis_values(spec: AxisSpec) -> np.ndarray:
+    """
+    Sensitivity axis from a list of values, a scalar, or a range dict:
+    {"start", "stop", "step"} (stop inclusive) or {"start", "stop", "num"}.
+    """
+    if isinstance(spec, Mapping):
+        start, stop = float(spec["start"]), float(spec["stop"])
+        if spec.get("num") is not None:
+            return np.linspace(start, stop, int(spec["num"]))
+        step = float(spec.get("step") or 0.0)
+        if step == 0.0 or (stop - start) / step < 0:
+            raise ValueError(f"Invalid range: {dict(spec)}")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return start + step * np.arange(count)
+
+    return np.atleast_1d(np.asarray(spec, dtype=np.float64))
+
+
+def scenario_grid(base: Mapping[str, float], axes: Mapping[str, AxisSpec]) -> dict:
+    """
+    Full sensitivity grid: one array dimension per axis (in the given order),
+    all other inputs taken from `base`.
+
+    Returns {"axes": {name: values}, "shape": (...), "outputs": {name: ndarray}}.
+    """
+    unknown = set(axes) - set(QUICK_PNL_INPUTS)
+    if unknown:
+        raise ValueError(f"Unknown sensitivity inputs: {', '.join(sorted(unknown))}")
+
+    grid_axes = {name: axis_values(spec) for name, spec in axes.items()}
+    inputs = dict(base)
+
+    for dim, (name, values) in enumerate(grid_axes.items()):
+        shape = [1] * len(grid_axes)
+        shape[dim] = values.size
+        inputs[name] = values.reshape(shape)
+
+    outputs = quick_voyage_pnl_arrays(**inputs)
+    shape = tuple(v.size for v in grid_axes.values())
+
+    return {
+        "axes": grid_axes,
+        "shape": shape,
+        "outputs": {k: np.broadcast_to(v, shape) for k, v in outputs.items()},
+    }
+
+
+def grid_rows(grid: dict, metrics: Iterable[str] = QUICK_PNL_OUTPUTS) -> List[dict]:
+    """Flatten a scenario grid into one dict per scenario (axis values + metrics)."""
+    names = list(grid["axes"])
+    mesh = np.meshgrid(*grid["axes"].values(), indexing="ij")
+    columns = {name: m.ravel() for name, m in zip(names, mesh)}
+    columns.update({m: grid["outputs"][m].ravel() for m in metrics})
+
+    count = int(np.prod(grid["shape"])) if names else 1
+    return [{k: float(v[i]) for k, v in columns.items()} for i in range(count)]
+
+
+def grid_summary(grid: dict, metric: str = "pnl") -> dict:
+    """Range of a metric across the grid, with the best and worst scenarios."""
+    values = grid["outputs"][metric]
+    names = list(grid["axes"])
+
+    def scenario(flat_index: int) -> dict:
+        index = np.unravel_index(flat_index, grid["shape"])
+        point = {name: float(grid["axes"][name][i]) for name, i in zip(names, index)}
+        return {**point, metric: float(values[index])}
+
+    return {
+        "metric": metric,
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "mean": float(values.mean()),
+        "share_negative": float((values < 0).mean()),
+        "best": scenario(int(values.argmax())),
+        "worst": scenario(int(values.argmin())),
+    }
+
+
+# ==========================
+# Voyage P&L — Columnar Cargo Rows
+# ==========================
+Rows = Union[List[Mapping], Mapping[str, Iterable]]
+
+
+def _float_column(values: list, allow_none: bool = False) -> np.ndarray:
+    """float64 column; None becomes NaN only where allowed (float(None) fails in the row tool)."""
+    column = np.array(values, dtype=np.float64).reshape(len(values))
+    if not allow_none and np.isnan(column).any() and None in values:
+        raise TypeError("float() argument must be a string or a real number, not 'NoneType'")
+    return column
+
+
+def cargo_columns(rows: Rows) -> Dict[str, np.ndarray]:
+    """
+    Struct-of-arrays view of cargo rows, from a list of row dicts or a dict of
+    column lists ({"cp_qty": [...], "frt_rate": [...], ...}).
+
+    option_pct is NaN for rows without their own option (the voyage
+    option_percentage applies); "option_pct_null" marks row dicts holding an
+    explicit None, which the breakeven quantity cannot use.
+    """
+    if isinstance(rows, Mapping):
+        rows = {k: list(v) for k, v in rows.items()}
+        lengths = {k: len(v) for k, v in rows.items()}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"Cargo columns differ in length: {lengths}")
+        count = next(iter(lengths.values()), 0)
+
+        def column(name: str, default=0.0) -> list:
+            return list(rows.get(name, [default] * count))
+
+        option = column("option_pct", np.nan)
+        null = np.zeros(count, dtype=bool)
+    else:
+        rows = list(rows or [])
+
+        def column(name: str, default=0.0) -> list:
+            return [r.get(name, default) for r in rows]
+
+        option = column("option_pct", np.nan)
+        null = np.array([v is None for v in option], dtype=bool)
+
+    return {
+        "cp_qty": _float_column(column("cp_qty")),
+        "option_pct": _float_column(option, allow_none=True),
+        "option_pct_null": null,
+        "frt_rate": _float_column(column("frt_rate")),
+        "lumpsum": _float_column(column("lumpsum")),
+    }
+
+
+def amount_column(rows: Union[Rows, Iterable[float]]) -> np.ndarray:
+    """Demurrage / despatch amounts from row dicts, {"amount": [...]} or plain numbers."""
+    if isinstance(rows, Mapping):
+        return _float_column(list(rows.get("amount", [])))
+    return _float_column([r.get("amount", 0.0) if isinstance(r, Mapping) else r for r in (rows or [])])
+
+
+def _running_total(values: np.ndarray) -> float:
+    """Left-to-right float total (same rounding as `total += x` in a loop)."""
+    return float(np.cumsum(np.concatenate(([0.0], values)))[-1])
+
+
+def voyage_pnl_columns(
+    cargo: Dict[str, np.ndarray],
+    demurrage: np.ndarray,
+    despatch: np.ndarray,
+    mis_revenue: float,
+    broker_commission: float,
+    voyage_days: float,
+    hire_rate: float,
+    tci_add_com: float,
+    tci_broker_com: float,
+    port_expenses: float,
+    misc_expenses: float,
+    address_commission: float = 0.0,
+    option_percentage: float = 0.0,
+    freight_tax_pct: float = 0.0,
+    demurrage_commission_pct: float = None,
+    despatch_commission_pct: float = 0.0,
+    canal_cost: float = 0.0,
+    ballast_bonus: float = 0.0,
+    suez_bonus: float = 0.0,
+    cp_qty: float = None,
+    option_qty: float = None,
+) -> dict:
+    """
+    Vectorized calculate_voyage_pnl over cargo_columns / amount_column inputs.
+
+    Per-row freight, commission and tax are computed as arrays and totalled
+    in row order, so results are identical to the row-by-row tool.
+    """
+    if demurrage_commission_pct is None:
+        demurrage_commission_pct = broker_commission
+
+    # --------- FREIGHT ---------
+    option_pct = np.where(np.isnan(cargo["option_pct"]), float(option_percentage), cargo["option_pct"])
+
+    if option_qty is not None:
+        effective_qty = cargo["cp_qty"] + float(option_qty)
+    else:
+        effective_qty = cargo["cp_qty"] * (1.0 + option_pct)
+
+    freight = np.where(cargo["lumpsum"] > 0, cargo["lumpsum"], effective_qty * cargo["frt_rate"])
+
+    total_freight = _running_total(freight)
+    total_freight_commission = _running_total(freight * float(broker_commission))
+    total_freight_tax = _running_total(freight * float(freight_tax_pct))
+
+    # --------- DEMURRAGE & DESPATCH ---------
+    # builtin sum() like the row tool (its rounding differs from a loop on newer Pythons)
+    total_demurrage = sum(demurrage.tolist())
+    total_despatch = sum(despatch.tolist())
+
+    total_demurrage_commission = total_demurrage * float(demurrage_commission_pct)
+    total_despatch_commission = total_despatch * float(despatch_commission_pct)
+
+    # --------- REVENUE ---------
+    gross_revenue = total_freight + mis_revenue + total_demurrage - total_despatch
+
+    total_revenue_commissions = (
+        total_freight_commission +
+        total_demurrage_commission +
+        total_despatch_commission +
+        total_freight_tax
+    )
+
+    net_revenue = gross_revenue - total_revenue_commissions
+
+    # --------- HIRE & EXPENSE ---------
+    vessel_hire_cost = float(hire_rate) * float(voyage_days)
+
+    tci_add_commission_value = vessel_hire_cost * float(tci_add_com)
+    tci_broker_commission_value = vessel_hire_cost * float(tci_broker_com)
+
+    total_bunker_expense = 0.0
+
+    gross_expense = (
+        vessel_hire_cost +
+        port_expenses +
+        misc_expenses +
+        total_bunker_expense +
+        canal_cost +
+        ballast_bonus +
+        suez_bonus
+    )
+
+    net_expense = gross_expense - (tci_add_commission_value + tci_broker_commission_value)
+
+    # --------- RESULTS ---------
+    pnl = net_revenue - net_expense
+    daily_profit = pnl / voyage_days if voyage_days > 0 else 0.0
+
+    address_commission_value_on_hire = vessel_hire_cost * float(address_commission)
+
+    tce_numerator = net_revenue - (
+        gross_expense - (vessel_hire_cost + ballast_bonus + suez_bonus - address_commission_value_on_hire)
+    )
+
+    tce = tce_numerator / voyage_days if voyage_days > 0 else 0.0
+    gross_tce = tce / (1.0 - float(address_commission)) if address_commission < 1 else tce
+
+    # --------- BREAKEVEN ---------
+    if cp_qty is not None:
+        total_cargo_qty = float(cp_qty) + float(option_qty or 0.0)
+    else:
+        if cargo["option_pct_null"].any():
+            raise TypeError("float() argument must be a string or a real number, not 'NoneType'")
+        total_cargo_qty = sum((cargo["cp_qty"] * (1.0 + option_pct)).tolist())
+
+    if total_cargo_qty > 0:
+        effective_comm_factor = 1.0 - float(broker_commission)
+        break_even_freight = net_expense / (total_cargo_qty * effective_comm_factor)
+    else:
+        break_even_freight = 0.0
+
+    return {
+        "pnl": pnl,
+        "daily_profit": daily_profit,
+        "tce": tce,
+        "gross_tce": gross_tce,
+        "break_even_freight_usd_per_mt": break_even_freight,
+        "total_cargo_qty_mt": total_cargo_qty,
+    }
+
+
+# calculate_voyage_pnl inputs the sampled / broadcast variant accepts
+VOYAGE_PNL_INPUTS = (
+    "cargo_rows", "demurrage_rows", "despatch_rows", "mis_revenue", "broker_commission",
+    "voyage_days", "hire_rate", "tci_add_com", "tci_broker_com", "port_expenses", "misc_expenses",
+    "address_commission", "option_percentage", "freight_tax_pct", "demurrage_commission_pct",
+    "despatch_commission_pct", "canal_cost", "ballast_bonus", "suez_bonus", "cp_qty", "option_qty",
+)
+
+
+def voyage_pnl_arrays(
+    cargo_rows: Rows,
+    demurrage_rows=(),
+    despatch_rows=(),
+    mis_revenue=0.0,
+    broker_commission=0.0,
+    voyage_days=0.0,
+    hire_rate=0.0,
+    tci_add_com=0.0,
+    tci_broker_com=0.0,
+    port_expenses=0.0,
+    misc_expenses=0.0,
+    address_commission=0.0,
+    option_percentage=0.0,
+    freight_tax_pct=0.0,
+    demurrage_commission_pct=None,
+    despatch_commission_pct=0.0,
+    canal_cost=0.0,
+    ballast_bonus=0.0,
+    suez_bonus=0.0,
+    cp_qty=None,
+    option_qty=None,
+) -> Dict[str, np.ndarray]:
+    """
+    voyage_pnl_columns broadcast over array-valued scalar inputs (Monte Carlo
+    samples); the cargo / demurrage / despatch rows stay fixed. Rows × samples
+    are evaluated in one pass, so results match the tool to rounding.
+    """
+    cargo = cargo_columns(cargo_rows)
+    if cp_qty is None and cargo["option_pct_null"].any():
+        raise TypeError("float() argument must be a string or a real number, not 'NoneType'")
+
+    def arr(value) -> np.ndarray:
+        return np.asarray(value, dtype=np.float64)
+
+    broker = arr(broker_commission)
+    days = arr(voyage_days)
+
+    # --------- FREIGHT (rows × samples) ---------
+    row_option = cargo["option_pct"][:, None]
+    option_pct = np.where(np.isnan(row_option), arr(option_percentage), row_option)
+    if option_qty is not None:
+        effective_qty = cargo["cp_qty"][:, None] + arr(option_qty)
+    else:
+        effective_qty = cargo["cp_qty"][:, None] * (1.0 + option_pct)
+
+    lumpsum = cargo["lumpsum"][:, None]
+    freight = np.where(lumpsum > 0, lumpsum, effective_qty * cargo["frt_rate"][:, None]).sum(axis=0)
+
+    # --------- REVENUE ---------
+    demurrage = float(amount_column(demurrage_rows).sum())
+    despatch = float(amount_column(despatch_rows).sum())
+    demurrage_pct = broker if demurrage_commission_pct is None else arr(demurrage_commission_pct)
+
+    net_revenue = freight + arr(mis_revenue) + demurrage - despatch - (
+        freight * broker + demurrage * demurrage_pct + despatch * arr(despatch_commission_pct)
+        + freight * arr(freight_tax_pct)
+    )
+
+    # --------- HIRE & EXPENSE ---------
+    hire = arr(hire_rate) * days
+    bonuses = arr(ballast_bonus) + arr(suez_bonus)
+    gross_expense = hire + arr(port_expenses) + arr(misc_expenses) + arr(canal_cost) + bonuses
+    net_expense = gross_expense - hire * (arr(tci_add_com) + arr(tci_broker_com))
+
+    # --------- RESULTS ---------
+    address = arr(address_commission)
+    pnl = net_revenue - net_expense
+    tce_numerator = net_revenue - (gross_expense - (hire + bonuses - hire * address))
+
+    if cp_qty is not None:
+        total_qty = arr(cp_qty) + arr(option_qty or 0.0)
+    else:
+        total_qty = (cargo["cp_qty"][:, None] * (1.0 + option_pct)).sum(axis=0)
+
+    positive_days = days > 0
+    tce = _safe_divide(tce_numerator, days, positive_days)
+    return {
+        "pnl": pnl,
+        "daily_profit": _safe_divide(pnl, days, positive_days),
+        "tce": tce,
+        "gross_tce": np.where(address < 1, _safe_divide(tce, 1.0 - address, address < 1), tce),
+        "break_even_freight_usd_per_mt": _safe_divide(net_expense, total_qty * (1.0 - broker), total_qty > 0),
+        "total_cargo_qty_mt": np.broadcast_to(total_qty, np.shape(pnl)),
+    }
+
+
+# ==========================
+# Reverse Solvers — Batch
+# ==========================
+# Inputs of the scalar reverse-solver tools, with defaults (None = required).
+REVERSE_SOLVER_INPUTS = {
+    "required_freight_rate": {"target_tce": None, "voyage_days": None, "voyage_cost": None, "cargo_qty": None},
+    "reverse_freight_rate": {"cargo_qty": None, "voyage_cost": None, "expected_profit": None, "commission_pct": 0.0},
+    "reverse_daily_hire": {
+        "cargo_qty": None,
+        "freight_rate": None,
+        "hire_days": None,
+        "voyage_cost_excl_hire": None,
+        "expected_profit": 0.0,
+    },
+    "reverse_tce": {"total_revenue": None, "total_voyage_cost": None, "voyage_days": None},
+}
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _numeric_column(values) -> np.ndarray:
+    """float64 array (0-d for scalars); missing or non-numeric entries become NaN."""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        if np.ndim(values) == 0:
+            return np.array(_to_float(values))
+        return np.array([_to_float(v) for v in values], dtype=np.float64)
+
+
+def _reject(errors: np.ndarray, mask: np.ndarray, message: str) -> None:
+    """Record `message` for masked rows that have no error yet (first failure wins)."""
+    errors[mask & (errors == None)] = message  # noqa: E711 — elementwise on an object array
+
+
+def reverse_solve_batch(solver: str, inputs: Mapping) -> Dict[str, np.ndarray]:
+    """
+    Vectorized version of the reverse-solver tools.
+
+    Each input is a scalar (shared by every row) or a list with one value per
+    row. Row problems never raise: "valid" is the per-row mask, "error" holds
+    the scalar tool's message for invalid rows, and their outputs are NaN.
+    Unknown solvers / inputs, missing required inputs and mismatched list
+    lengths still raise ValueError.
+    """
+    if solver not in REVERSE_SOLVER_INPUTS:
+        raise ValueError(f"Unknown solver: {solver}. Available: {', '.join(REVERSE_SOLVER_INPUTS)}")
+
+    spec = REVERSE_SOLVER_INPUTS[solver]
+    missing = [k for k, v in spec.items() if v is None and k not in inputs]
+    if missing:
+        raise ValueError(f"Missing required inputs: {', '.join(missing)}")
+    unknown = set(inputs) - set(spec)
+    if unknown:
+        raise ValueError(f"Unknown inputs: {', '.join(sorted(unknown))}")
+
+    values = {**{k: v for k, v in spec.items() if v is not None}, **inputs}
+    names = list(values)
+    columns = np.broadcast_arrays(*(np.atleast_1d(_numeric_column(values[k])) for k in names))
+    f = dict(zip(names, columns))
+
+    errors = np.full(columns[0].shape, None, dtype=object)
+    for name in names:
+        _reject(errors, np.isnan(f[name]), f"{name} is missing or not a number.")
+
+    with np.errstate(all="ignore"):
+        if solver == "required_freight_rate":
+            _reject(errors, f["cargo_qty"] <= 0, "Cargo quantity must be greater than zero.")
+            gross_freight = (f["target_tce"] * f["voyage_days"]) + f["voyage_cost"]
+            outputs = {"gross_freight": gross_freight, "freight_rate": gross_freight / f["cargo_qty"]}
+
+        elif solver == "reverse_freight_rate":
+            _reject(errors, f["cargo_qty"] <= 0, "Cargo quantity must be greater than zero.")
+            _reject(errors, f["commission_pct"] >= 1, "Commission percentage must be less than 1 (i.e., <100%).")
+            denominator = f["cargo_qty"] * (1 - f["commission_pct"])
+            outputs = {"freight_rate": (f["voyage_cost"] + f["expected_profit"]) / denominator}
+
+        elif solver == "reverse_daily_hire":
+            _reject(
+                errors,
+                (f["cargo_qty"] <= 0) | (f["hire_days"] <= 0),
+                "Cargo quantity and hire days must be greater than zero.",
+            )
+            total_revenue = f["cargo_qty"] * f["freight_rate"]
+            hire_rate = (total_revenue - f["voyage_cost_excl_hire"] - f["expected_profit"]) / f["hire_days"]
+            outputs = {
+                "total_revenue": total_revenue,
+                "hire_rate": hire_rate,
+                "profit_status": np.where(hire_rate >= 0, "target_reached_or_better", "loss_condition"),
+            }
+
+        else:  # reverse_tce
+            _reject(errors, f["voyage_days"] <= 0, "Voyage days must be greater than zero.")
+            profit_value = f["total_revenue"] - f["total_voyage_cost"]
+            tce = profit_value / f["voyage_days"]
+            outputs = {
+                "tce": tce,
+                "profit_value": profit_value,
+                "profit_status": np.where(tce >= 0, "profit", "loss"),
+            }
+
+    valid = errors == None  # noqa: E711
+    for name, column in outputs.items():
+        if column.dtype.kind == "f":
+            outputs[name] = np.where(valid, column, np.nan)
+        else:
+            outputs[name] = np.where(valid, column, None).astype(object)
+
+    return {"valid": valid, "error": errors, **outputs}
@@ -0,0 +1,334 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import heapq
+import json
+import math
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# ==========================
+# Graph Configuration
+# ==========================
+_DEFAULT_GRAPH_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sea_routes.json"
+)
+SEA_ROUTE_GRAPH_PATH = os.getenv("SEA_ROUTE_GRAPH_PATH", _DEFAULT_GRAPH_PATH)
+
+EARTH_RADIUS_NM = 3440.065
+
+# Routing flags, interpreted positionally like the Distance API payload:
+#   canalOptions "111" → (suez, panama, kiel); "1" = canal may be used, "0" = blocked
+#   piracyArea   "001" → (west_africa, southeast_asia, hra); "1" = transit allowed,
+#                        "0" = avoid where an alternative exists (edge weight penalised)
+#   seca         1     → minimise SECA/ECA mileage (SECA edges penalised); any
+#                        other value routes by distance and only reports SECA length
+CANAL_FLAGS = ("suez", "panama", "kiel")
+PIRACY_ZONES = ("west_africa", "southeast_asia", "hra")
+PIRACY_AVOID_PENALTY = 25.0
+SECA_AVOID_PENALTY = 3.0
+
+_ROUTE_MEMO_MAX = 20_000
+
+
+def great_circle_nm(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine distance in nautical miles."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _normalize(name: str) -> str:
+    return " ".join(str(name).upper().replace("_", " ").split())
+
+
+# ==========================
+# Sea Route Graph
+# ==========================
+class SeaRouteGraph:
+    """
+    Port/waypoint graph with canal, SECA and piracy-zone edge attributes.
+
+    - shortest_path(): A* with a great-circle heuristic
+    - precompute():    single-source Dijkstra trees for hub ports, so
+                       hub-to-hub queries are plain dict lookups
+    - route():         API-shaped response (distance, legs, SECA/HRA length,
+                       LineString) memoised per (from, to, options)
+    """
+
+    def __init__(self, data: dict):
+        self.nodes: Dict[str, Tuple[float, float]] = {}
+        self.ports: set = set()
+        self.hubs: List[str] = []
+        self.aliases: Dict[str, str] = {}
+        self.adjacency: Dict[str, List[Tuple[str, float, dict]]] = {}
+
+        for name, node in data["nodes"].items():
+            self.nodes[name] = (float(node["lat"]), float(node["lon"]))
+            self.adjacency[name] = []
+
+            if node.get("type") == "port":
+                self.ports.add(name)
+                self.aliases[_normalize(name)] = name
+                for alias in node.get("aliases", []):
+                    self.aliases[_normalize(alias)] = name
+                if node.get("hub"):
+                    self.hubs.append(name)
+
+        for edge in data["edges"]:
+            a, b = edge["from"], edge["to"]
+            # Never shorter than the great circle, so the A* heuristic stays admissible
+            distance = max(
+                float(edge.get("distance_nm") or 0.0),
+                great_circle_nm(*self.nodes[a], *self.nodes[b]),
+            )
+            attrs = {
+                "seca": bool(edge.get("seca", False)),
+                "canal": edge.get("canal"),
+                "piracy": edge.get("piracy"),
+            }
+            self.adjacency[a].append((b, distance, attrs))
+            self.adjacency[b].append((a, distance, attrs))
+
+        self._trees: Dict[Tuple[str, tuple], Dict[str, Tuple[Optional[str], Optional[dict], float]]] = {}
+        self._memo: Dict[tuple, dict] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = SEA_ROUTE_GRAPH_PATH) -> "SeaRouteGraph":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    # ------------------------------
+    # Options & weights
+    # ------------------------------
+    @staticmethod
+    def routing_options(seca: int = 3, canalOptions: str = "111", piracyArea: str = "001") -> tuple:
+        canals = str(canalOptions).ljust(len(CANAL_FLAGS), "1")
+        piracy = str(piracyArea).ljust(len(PIRACY_ZONES), "1")
+
+        blocked_canals = frozenset(c for c, flag in zip(CANAL_FLAGS, canals) if flag == "0")
+        avoided_zones = frozenset(z for z, flag in zip(PIRACY_ZONES, piracy) if flag == "0")
+
+        return blocked_canals, avoided_zones, int(seca) == 1
+
+    @staticmethod
+    def _weight(distance: float, attrs: dict, options: tuple) -> Optional[float]:
+        blocked_canals, avoided_zones, avoid_seca = options
+
+        if attrs["canal"] in blocked_canals:
+            return None
+
+        weight = distance
+        if attrs["piracy"] in avoided_zones:
+            weight *= PIRACY_AVOID_PENALTY
+        if avoid_seca and attrs["seca"]:
+            weight *= SECA_AVOID_PENALTY
+        return weight
+
+    def resolve(self, port_name: str) -> Optional[str]:
+        return self.aliases.get(_normalize(port_name))
+
+    # ------------------------------
+    # Shortest paths
+    # ------------------------------
+    def shortest_path(self, source: str, target: str, options: tuple) -> Optional[List[Tuple[str, Optional[dict], float]]]:
+        """
+        A* from source to target.
+        Returns [(node, attrs_of_edge_into_node, edge_distance_nm), ...] or None.
+        """
+        goal = self.nodes[target]
+        heuristic = lambda n: great_circle_nm(*self.nodes[n], *goal)
+
+        best = {source: 0.0}
+        previous: Dict[str, Tuple[Optional[str], Optional[dict], float]] = {source: (None, None, 0.0)}
+        frontier = [(heuristic(source), 0.0, source)]
+
+        while frontier:
+            _, cost, node = heapq.heappop(frontier)
+            if node == target:
+                return self._unwind(previous, target)
+            if cost > best.get(node, math.inf):
+                continue
+
+            for neighbor, distance, attrs in self.adjacency[node]:
+                weight = self._weight(distance, attrs, options)
+                if weight is None:
+                    continue
+                new_cost = cost + weight
+                if new_cost < best.get(neighbor, math.inf):
+                    best[neighbor] = new_cost
+                    previous[neighbor] = (node, attrs, distance)
+                    heapq.heappush(frontier, (new_cost + heuristic(neighbor), new_cost, neighbor))
+
+        return None
+
+    def shortest_tree(self, source: str, options: tuple) -> Dict[str, Tuple[Optional[str], Optional[dict], float]]:
+        """Single-source Dijkstra; returns the predecessor tree."""
+        best = {source: 0.0}
+        previous: Dict[str, Tuple[Optional[str], Optional[dict], float]] = {source: (None, None, 0.0)}
+        frontier = [(0.0, source)]
+
+        while frontier:
+            cost, node = heapq.heappop(frontier)
+            if cost > best.get(node, math.inf):
+                continue
+
+            for neighbor, distance, attrs in self.adjacency[node]:
+                weight = self._weight(distance, attrs, options)
+                if weight is None:
+                    continue
+                new_cost = cost + weight
+                if new_cost < best.get(neighbor, math.inf):
+                    best[neighbor] = new_cost
+                    previous[neighbor] = (node, attrs, distance)
+                    heapq.heappush(frontier, (new_cost, neighbor))
+
+        return previous
+
+    @staticmethod
+    def _unwind(previous: dict, target: str) -> List[Tuple[str, Optional[dict], float]]:
+        path = []
+        node = target
+        while node is not None:
+            parent, attrs, distance = previous[node]
+            path.append((node, attrs, distance))
+            node = parent
+        path.reverse()
+        return path
+
+    def precompute(self, ports: Optional[List[str]] = None, options: Optional[tuple] = None) -> None:
+        """Build Dijkstra trees (all-pairs for the given ports) for one option set."""
+        options = options or self.routing_options()
+        for port in ports or self.hubs:
+            name = self.resolve(port)
+            if name is None:
+                continue
+            tree = self.shortest_tree(name, options)
+            with self._lock:
+                self._trees[(name, options)] = tree
+
+    # ------------------------------
+    # API-shaped response
+    # ------------------------------
+    def route(
+        self,
+        from_port: str,
+        to_port: str,
+        localEca: int = 1,
+        seca: int = 3,
+        canalOptions: str = "111",
+        piracyArea: str = "001",
+    ) -> Optional[dict]:
+        source, target = self.resolve(from_port), self.resolve(to_port)
+        if source is None or target is None:
+            return None
+
+        options = self.routing_options(seca, canalOptions, piracyArea)
+        # Every argument echoed in the response is part of the key
+        key = (source, target, localEca, seca, canalOptions, piracyArea)
+
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+
+        tree = self._trees.get((source, options))
+        if tree is not None:
+            path = self._unwind(tree, target) if target in tree else None
+        else:
+            path = self.shortest_path(source, target, options)
+
+        if path is None:
+            return None
+
+        result = self._build_response(path, localEca, seca, canalOptions, piracyArea)
+
+        with self._lock:
+            if len(self._memo) >= _ROUTE_MEMO_MAX:
+                self._memo.clear()
+            self._memo[key] = result
+
+        return result
+
+    def _build_response(self, path: list, localEca, seca, canalOptions, piracyArea) -> dict:
+        legs = []
+        total = seca_length = hra_length = 0.0
+        canals: List[str] = []
+
+        for (prev_node, _, _), (node, attrs, distance) in zip(path, path[1:]):
+            total += distance
+            if attrs["seca"]:
+                seca_length += distance
+            if attrs["piracy"] == "hra":
+                hra_length += distance
+            if attrs["canal"] and attrs["canal"] not in canals:
+                canals.append(attrs["canal"])
+
+            legs.append({
+                "from": prev_node,
+                "to": node,
+                "distance": round(distance, 2),
+                "seca": attrs["seca"],
+                "canal": attrs["canal"],
+                "piracy_area": attrs["piracy"],
+            })
+
+        return {
+            "status": "success",
+            "source": "offline_graph",
+            "from": path[0][0],
+            "to": path[-1][0],
+            "distance": round(total, 2),
+            "secaLength": round(seca_length, 2),
+            "hraLength": round(hra_length, 2),
+            "canals": canals,
+            "legs": legs,
+            "lineString": {
+                "type": "LineString",
+                "coordinates": [[self.nodes[n][1], self.nodes[n][0]] for n, _, _ in path],
+            },
+            "options": {
+                "localEca": localEca,
+                "seca": seca,
+                "canalOptions": canalOptions,
+                "piracyArea": piracyArea,
+            },
+        }
+
+
+# ==========================
+# Module-level Engine
+# ==========================
+@lru_cache(maxsize=1)
+def get_sea_route_graph() -> SeaRouteGraph:
+    """Load the graph once and precompute hub-to-hub trees for default options."""
+    graph = SeaRouteGraph.load()
+
+    hubs = os.getenv("SEA_ROUTE_PRECOMPUTE_PORTS")
+    graph.precompute([p for p in hubs.split(",") if p.strip()] if hubs else None)
+
+    return graph
+
+
+def offline_port_distance(
+    from_port: str,
+    to_port: str,
+    localEca: int = 1,
+    seca: int = 3,
+    canalOptions: str = "111",
+    piracyArea: str = "001",
+) -> Optional[dict]:
+    """
+    Distance from the local sea-route graph, or None when either port is
+    unknown to the graph / no route exists under the given options.
+    """
+    try:
+        graph = get_sea_route_graph()
+    except (OSError, ValueError, KeyError):
+        return None
+
+    return graph.route(from_port, to_port, localEca, seca, canalOptions, piracyArea)
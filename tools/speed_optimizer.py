@@ -0,0 +1,221 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+from typing import List, Mapping, Optional, Sequence, Tuple
+
+# ==========================
+# Third-Party Libraries
+# ==========================
+import numpy as np
+
+# =========================
+# Custom
+# =========================
+from tools.pnl_engine import QUICK_PNL_INPUTS, quick_voyage_pnl_arrays
+
+# ==========================
+# Optimiser Configuration
+# ==========================
+OBJECTIVES = ("tce", "daily_profit", "pnl")
+
+SPEED_LIMITS = (5.0, 25.0)    # knots; sweep range is clipped to this
+COARSE_STEP = 0.05            # knots
+FINE_STEP = 0.001             # knots, local refinement around the coarse optimum
+TABLE_STEP = 0.5              # knots, rows of the returned sweep table
+
+# Inputs the optimiser derives from speed
+DERIVED = ("voyage_days", "total_bunker_mt")
+
+
+# ==========================
+# Consumption Curve
+# ==========================
+def consumption_points(parsed: Mapping, condition: str) -> List[Tuple[float, float]]:
+    """
+    (speed, consumption) points for "ballast" / "laden" from a
+    parse_speed_and_consumption_ai result: the primary figures, every
+    operating mode (eco / full / ...) and optional explicit
+    "<condition>_points" [[speed, mt_per_day], ...].
+    """
+    sources = [parsed] + list((parsed.get("modes") or {}).values())
+    points = []
+    for source in sources:
+        speed = source.get(f"{condition}_speed")
+        consumption = source.get(f"{condition}_consumption")
+        if speed and consumption:
+            points.append((float(speed), float(consumption)))
+
+    points.extend((float(s), float(c)) for s, c in parsed.get(f"{condition}_points") or [])
+    return sorted(set(points))
+
+
+def fit_consumption_curve(points: Sequence[Tuple[float, float]]) -> dict:
+    """
+    Least-squares fit of consumption = base + k × speed³ (propeller law with a
+    speed-independent base load). One point, or a fit with a negative base,
+    falls back to the pure cube law through the points.
+    """
+    if not points:
+        raise ValueError("At least one speed / consumption point is required")
+
+    speeds = np.array([p[0] for p in points], dtype=np.float64)
+    consumptions = np.array([p[1] for p in points], dtype=np.float64)
+    if np.any(speeds <= 0) or np.any(consumptions <= 0):
+        raise ValueError("Speeds and consumptions must be greater than zero")
+
+    cubes = speeds ** 3
+    base, k = 0.0, float(cubes @ consumptions / (cubes @ cubes))
+
+    if np.unique(speeds).size > 1:
+        design = np.column_stack([np.ones_like(cubes), cubes])
+        fit_base, fit_k = np.linalg.lstsq(design, consumptions, rcond=None)[0]
+        if fit_base >= 0 and fit_k > 0:
+            base, k = float(fit_base), float(fit_k)
+
+    residuals = consumptions - (base + k * cubes)
+    return {
+        "base_mt_per_day": base,
+        "cubic_coefficient": k,
+        "points": [list(p) for p in points],
+        "max_abs_residual_mt": float(np.max(np.abs(residuals))),
+    }
+
+
+def consumption_at(curve: Mapping, speeds) -> np.ndarray:
+    return curve["base_mt_per_day"] + curve["cubic_coefficient"] * np.asarray(speeds, dtype=np.float64) ** 3
+
+
+# ==========================
+# Speed Sweep
+# ==========================
+def _speed_axis(curve: Mapping, speed_range: Optional[Sequence[float]], step: float) -> np.ndarray:
+    if speed_range is None:
+        observed = [p[0] for p in curve["points"]]
+        speed_range = (min(observed) * 0.7, max(observed) * 1.15)
+    lo = max(SPEED_LIMITS[0], float(speed_range[0]))
+    hi = min(SPEED_LIMITS[1], float(speed_range[1]))
+    if not lo < hi:
+        raise ValueError(f"Invalid speed range: {lo} … {hi}")
+    return np.round(np.arange(lo, hi + step / 2, step), 6)
+
+
+def _evaluate(base: Mapping, laden_speed, ballast_speed, voyage: Mapping) -> dict:
+    """Quick P&L for broadcast laden / ballast speed arrays (compute_voyage_days / compute_bunker_consumption per leg)."""
+    laden_days = voyage["laden_distance_nm"] / (laden_speed * 24)
+    ballast_days = voyage["ballast_distance_nm"] / (ballast_speed * 24)
+
+    bunkers = (
+        laden_days * consumption_at(voyage["laden_curve"], laden_speed) +
+        ballast_days * consumption_at(voyage["ballast_curve"], ballast_speed) +
+        voyage["port_days"] * voyage["port_consumption"]
+    )
+    outputs = quick_voyage_pnl_arrays(
+        **base,
+        voyage_days=laden_days + ballast_days + voyage["port_days"],
+        total_bunker_mt=bunkers,
+    )
+    return {
+        **outputs,
+        "voyage_days": np.broadcast_to(laden_days + ballast_days + voyage["port_days"], outputs["pnl"].shape),
+        "total_bunker_mt": np.broadcast_to(bunkers, outputs["pnl"].shape),
+    }
+
+
+def _point(outputs: Mapping, index, laden_speed: float, ballast_speed: Optional[float]) -> dict:
+    point = {"laden_speed": laden_speed}
+    if ballast_speed is not None:
+        point["ballast_speed"] = ballast_speed
+    for key in ("voyage_days", "total_bunker_mt", "bunker_cost", "hire_cost", "pnl", "daily_profit", "tce"):
+        point[key] = float(outputs[key][index])
+    return point
+
+
+def optimise_speed(
+    base: Mapping,
+    laden_distance_nm: float,
+    laden_curve: Mapping,
+    ballast_distance_nm: float = 0.0,
+    ballast_curve: Optional[Mapping] = None,
+    port_days: float = 0.0,
+    port_consumption: float = 0.0,
+    objective: str = "tce",
+    speed_range: Optional[Sequence[float]] = None,
+    current: Optional[Mapping[str, float]] = None,
+) -> dict:
+    """
+    Service speed(s) maximising TCE, daily profit or P&L of the quick P&L model.
+
+    Laden (and, with a ballast distance, ballast) speed is swept on a
+    COARSE_STEP grid — a 2-D grid when both legs are free — in one vectorized
+    evaluation, then refined on a FINE_STEP grid around the best cell.
+    `base` holds the quick P&L inputs except voyage_days / total_bunker_mt.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}. Available: {', '.join(OBJECTIVES)}")
+    if laden_distance_nm <= 0:
+        raise ValueError("laden_distance_nm must be greater than zero")
+    clash = set(base) & set(DERIVED)
+    if clash:
+        raise ValueError(f"Derived from speed, do not pass: {', '.join(sorted(clash))}")
+    unknown = set(base) - set(QUICK_PNL_INPUTS)
+    if unknown:
+        raise ValueError(f"Unknown inputs: {', '.join(sorted(unknown))}")
+
+    has_ballast = ballast_distance_nm > 0
+    if has_ballast and ballast_curve is None:
+        raise ValueError("A ballast leg needs a ballast consumption curve")
+
+    voyage = {
+        "laden_distance_nm": float(laden_distance_nm),
+        "ballast_distance_nm": float(ballast_distance_nm) if has_ballast else 0.0,
+        "laden_curve": laden_curve,
+        "ballast_curve": ballast_curve or laden_curve,
+        "port_days": float(port_days),
+        "port_consumption": float(port_consumption),
+    }
+
+    laden_axis = _speed_axis(laden_curve, speed_range, COARSE_STEP)
+    ballast_axis = _speed_axis(ballast_curve, speed_range, COARSE_STEP) if has_ballast else np.array([1.0])
+
+    # --------- COARSE SWEEP ---------
+    coarse = _evaluate(base, laden_axis[:, None], ballast_axis[None, :], voyage)
+    i, j = np.unravel_index(int(np.argmax(coarse[objective])), coarse[objective].shape)
+
+    # --------- LOCAL REFINEMENT ---------
+    def fine_axis(axis: np.ndarray, k: int) -> np.ndarray:
+        lo, hi = axis[max(k - 1, 0)], axis[min(k + 1, axis.size - 1)]
+        return np.round(np.arange(lo, hi + FINE_STEP / 2, FINE_STEP), 6)
+
+    fine_laden = fine_axis(laden_axis, i)
+    fine_ballast = fine_axis(ballast_axis, j) if has_ballast else ballast_axis
+    fine = _evaluate(base, fine_laden[:, None], fine_ballast[None, :], voyage)
+    fi, fj = np.unravel_index(int(np.argmax(fine[objective])), fine[objective].shape)
+
+    best_ballast = float(fine_ballast[fj]) if has_ballast else None
+    optimal = _point(fine, (fi, fj), float(fine_laden[fi]), best_ballast)
+
+    # --------- SWEEP TABLE (best ballast speed per laden speed) ---------
+    rows = max(1, int(round(TABLE_STEP / COARSE_STEP)))
+    best_j = np.argmax(coarse[objective], axis=1)
+    table = [
+        _point(coarse, (k, best_j[k]), float(laden_axis[k]), float(ballast_axis[best_j[k]]) if has_ballast else None)
+        for k in range(0, laden_axis.size, rows)
+    ]
+
+    result = {
+        "objective": objective,
+        "optimal": optimal,
+        "sweep": table,
+        "evaluated_speeds": int(coarse[objective].size + fine[objective].size),
+        "at_boundary": bool(i in (0, laden_axis.size - 1) or (has_ballast and j in (0, ballast_axis.size - 1))),
+    }
+
+    current = current or {}
+    if current.get("laden_speed") and (current.get("ballast_speed") or not has_ballast):
+        laden_now = float(current["laden_speed"])
+        ballast_now = float(current["ballast_speed"]) if has_ballast else None
+        now = _evaluate(base, np.float64(laden_now), np.float64(ballast_now or 1.0), voyage)
+        result["current"] = _point(now, (), laden_now, ballast_now)
+        result["improvement"] = {objective: optimal[objective] - result["current"][objective]}
+
+    return result
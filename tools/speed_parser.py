@@ -0,0 +1,391 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+# =========================
+# Custom
+# =========================
+from db.cache_store import SqliteCache
+
+# ==========================
+# Speed & Consumption Grammar
+# ==========================
+# Handles the formats found in Lloyd's / market "speed and consumption" strings:
+#
+#   14.0kts (b) / 13.5kts (l) on 24.0 mt (b) / 26.0 mt (l) vlsfo
+#   eco (wog): 12.5kts (b) / 12.0kts (l) on 18.5 mt (b) / 20.0 mt (l) vlsfo
+#   ballast 14 kn on 24 mts, laden 13.5 kn on 26 mts ifo + 0.1 mgo
+#   b/l 14/13.5 kts on 24/26 mt vlsfo, port idle 2.5 mt mgo
+#   abt 13 kts on abt 25 mt vlsfo
+#
+# parse_speed_consumption() reports `confident=True` only when ballast / laden
+# speed and consumption were each read from an explicit marker (or a single
+# unmarked value that applies to both) with no leftover numbers.
+
+PARSER_VERSION = "2"
+
+SPEED_RANGE = (3.0, 30.0)
+CONSUMPTION_RANGE = (0.5, 300.0)
+
+FUEL_NAMES = {
+    "vlsfo": "VLSFO", "ulsfo": "ULSFO", "lsfo": "LSFO", "hsfo": "HSFO",
+    "ifo380": "IFO380", "ifo180": "IFO180", "ifo": "IFO",
+    "lsmgo": "LSMGO", "mgo": "MGO", "mdo": "MDO", "lsgo": "LSGO", "lng": "LNG",
+}
+
+# Weather qualifiers whose numbers are not speeds or consumptions ("bf 4", "ds 3")
+WEATHER_WORDS = {"bf", "beaufort", "force", "ds", "douglas", "ss"}
+
+_BROKEN_DECIMAL = re.compile(r"(\d)\s*\.\s*(\d)|(\d)\s*,(\d{1,2})(?![\d.])")
+
+_TOKEN = re.compile(
+    r"""
+      (?P<num>\d+(?:\.\d+)?)
+    | (?P<pair>\(?\s*\b(?:b\s*/\s*l|l\s*/\s*b)\b\s*\)?)
+    | (?P<ballast>\(\s*b(?:allast)?\s*\)|\b(?:ballast|blst|bllst|bal|b)\b)
+    | (?P<laden>\(\s*l(?:aden)?\s*\)|\b(?:laden|ldn|loaded|l)\b)
+    | (?P<speed>(?:knots?|kts?|kns?|k)\b)
+    | (?P<mass>(?:mts?|tons?|tpd|t)\b(?:\s*/\s*(?:day|d)\b|\s*pd\b|\s*per\s+day\b)?)
+    | (?P<fuel>(?:vlsfo|ulsfo|lsfo|hsfo|ifo\s*380|ifo\s*180|ifo|lsmgo|mgo|mdo|lsgo|lng)\b)
+    | (?P<eco>\b(?:super\s+eco|eco(?:nomical|nomy)?|slow)\b)
+    | (?P<full>\b(?:full|service|svc|max|normal|design)\b)
+    | (?P<wog>\b(?:w\.?o\.?g\.?|without\s+guarantee)(?!\w))
+    | (?P<port>\b(?:port|idle|idling|working|wkg|anchorage|anch)\b)
+    | (?P<sep>[/,])
+    | (?P<plus>\+|&)
+    | (?P<clause>[;:|\n])
+    | (?P<word>[a-z][a-z.]*)
+    """,
+    re.VERBOSE,
+)
+
+
+def normalize_speed_text(text: str) -> str:
+    """Lower-case and repair broken decimals: '14. 0' → '14.0', '11,80' → '11.80' (not '24, 26')."""
+    text = str(text).lower()
+    return _BROKEN_DECIMAL.sub(
+        lambda m: f"{m.group(1)}.{m.group(2)}" if m.group(1) else f"{m.group(3)}.{m.group(4)}",
+        text,
+    )
+
+
+def tokenize(text: str) -> List[Tuple[str, str]]:
+    return [(m.lastgroup, m.group(m.lastgroup)) for m in _TOKEN.finditer(normalize_speed_text(text))]
+
+
+def _fuel_name(raw: str) -> str:
+    return FUEL_NAMES.get(re.sub(r"\s+", "", raw), raw.upper())
+
+
+# ==========================
+# Parser
+# ==========================
+class _Quantity:
+    __slots__ = ("value", "kind", "condition", "fuel", "mode", "port", "assumed")
+
+    def __init__(self, value: float, kind: str, condition: Optional[str], mode: str, port: bool):
+        self.value = value
+        self.kind = kind            # "speed" | "consumption"
+        self.condition = condition  # "ballast" | "laden" | None
+        self.fuel: Optional[str] = None
+        self.mode = mode
+        self.port = port
+        self.assumed = False        # condition inferred from an unmarked "a/b" pair
+
+
+def _read_quantities(tokens: List[Tuple[str, str]]) -> Tuple[List[_Quantity], dict]:
+    quantities: List[_Quantity] = []
+    meta = {"wog": False, "orphans": 0}
+
+    mode = "full"
+    pending: Optional[str] = None
+    pair_order: Optional[Tuple[str, str]] = None
+    port = False
+    last_group: List[_Quantity] = []
+    last_was_group = False
+    previous_word = None
+
+    i = 0
+    while i < len(tokens):
+        kind, text = tokens[i]
+
+        if kind == "num":
+            if previous_word in WEATHER_WORDS:
+                i += 1
+                previous_word = None
+                continue
+
+            # Gather "a / b / c" then the unit (if any)
+            numbers = [float(text)]
+            j = i + 1
+            while j + 1 < len(tokens) and tokens[j][0] == "sep" and tokens[j][1] == "/" and tokens[j + 1][0] == "num":
+                numbers.append(float(tokens[j + 1][1]))
+                j += 2
+
+            unit = tokens[j][0] if j < len(tokens) else None
+            if unit == "speed":
+                qty_kind = "speed"
+                j += 1
+            elif unit in ("mass", "fuel"):
+                qty_kind = "consumption"
+                j += 1 if unit == "mass" else 0
+            else:
+                meta["orphans"] += len(numbers)
+                i = j
+                last_was_group = False
+                continue
+
+            group = [_Quantity(n, qty_kind, None, mode, port) for n in numbers]
+            if len(group) == 1:
+                group[0].condition = pending
+            else:
+                # "14 kts ballast / 13 kts laden on 23.5 / 25 mt": an unmarked pair
+                # follows the order the speeds were explicitly marked in
+                order = pair_order
+                if order is None:
+                    marked = [q.condition for q in quantities if q.mode == mode and q.condition and not q.assumed]
+                    if set(marked[-2:]) == {"ballast", "laden"}:
+                        order = tuple(marked[-2:])
+                for q, condition in zip(group, order or ("ballast", "laden")):
+                    q.condition = condition
+                    q.assumed = order is None
+                if len(group) > 2:
+                    meta["orphans"] += len(group) - 2
+                    group = group[:2]
+
+            quantities.extend(group)
+            last_group = group
+            last_was_group = True
+            previous_word = None
+            i = j
+            continue
+
+        if kind in ("ballast", "laden"):
+            # Postfix marker ("14 kts (b)") unless the group already took a prefix one
+            if last_was_group and len(last_group) == 1 and last_group[0].condition is None:
+                last_group[0].condition = kind
+            else:
+                pending = kind
+            last_was_group = False
+
+        elif kind == "pair":
+            pair_order = ("ballast", "laden") if text.strip("() ").startswith("b") else ("laden", "ballast")
+            last_was_group = False
+
+        elif kind == "fuel":
+            fuel = _fuel_name(text)
+            for q in reversed(quantities):
+                if q.kind != "consumption" or q.fuel is not None:
+                    break
+                q.fuel = fuel
+            last_was_group = False
+
+        elif kind in ("eco", "full"):
+            mode = kind
+            pending = None
+            pair_order = None
+            port = False
+            last_was_group = False
+
+        elif kind == "wog":
+            meta["wog"] = True
+
+        elif kind == "port":
+            port = True
+            pending = None
+            last_was_group = False
+
+        elif kind == "clause":
+            pending = None
+            pair_order = None
+            port = False
+            last_was_group = False
+
+        elif kind == "plus":
+            last_was_group = False
+
+        elif kind == "word":
+            previous_word = text.rstrip(".")
+            i += 1
+            continue
+
+        previous_word = None
+        i += 1
+
+    return quantities, meta
+
+
+def _pick(values: List[_Quantity], condition: str) -> Tuple[Optional[float], bool]:
+    """(value, unambiguous) for one condition from a mode's speeds or consumptions."""
+    marked = [q for q in values if q.condition == condition]
+    unmarked = [q for q in values if q.condition is None]
+
+    if marked:
+        distinct = {q.value for q in marked}
+        return marked[0].value, len(distinct) == 1 and not any(q.assumed for q in marked)
+
+    # A single unmarked value applies to both conditions (e.g. "abt 13 kts")
+    if len(unmarked) == 1 and not any(q.condition for q in values):
+        return unmarked[0].value, True
+
+    return None, False
+
+
+def _summarize_mode(quantities: List[_Quantity]) -> dict:
+    speeds = [q for q in quantities if q.kind == "speed" and not q.port]
+    consumptions = [q for q in quantities if q.kind == "consumption" and not q.port]
+
+    main_fuel = next((q.fuel for q in consumptions if q.fuel), None)
+    main = [q for q in consumptions if q.fuel in (None, main_fuel)]
+    extra = [q for q in consumptions if q.fuel not in (None, main_fuel)]
+
+    ballast_speed, ok_bs = _pick(speeds, "ballast")
+    laden_speed, ok_ls = _pick(speeds, "laden")
+    ballast_cons, ok_bc = _pick(main, "ballast")
+    laden_cons, ok_lc = _pick(main, "laden")
+
+    in_range = all(
+        v is not None and lo <= v <= hi
+        for v, (lo, hi) in (
+            (ballast_speed, SPEED_RANGE),
+            (laden_speed, SPEED_RANGE),
+            (ballast_cons, CONSUMPTION_RANGE),
+            (laden_cons, CONSUMPTION_RANGE),
+        )
+    )
+
+    return {
+        "ballast_speed": ballast_speed,
+        "laden_speed": laden_speed,
+        "ballast_consumption": ballast_cons,
+        "laden_consumption": laden_cons,
+        "fuel_type": main_fuel,
+        "additional_fuels": [
+            {"fuel": q.fuel, "condition": q.condition, "mt_per_day": q.value} for q in extra
+        ],
+        "complete": ok_bs and ok_ls and ok_bc and ok_lc and in_range,
+    }
+
+
+def parse_speed_consumption(text: str) -> dict:
+    """
+    Deterministic speed / consumption extraction.
+
+    Returns the primary (full / service) figures plus every operating mode
+    found, and `confident` — False means the caller should escalate (LLM or
+    manual entry) rather than trust the numbers.
+    """
+    empty = {
+        "ballast_speed": None,
+        "laden_speed": None,
+        "ballast_consumption": None,
+        "laden_consumption": None,
+        "fuel_type": None,
+        "operating_mode": None,
+        "modes": {},
+        "port_consumption": [],
+        "wog": False,
+        "confident": False,
+    }
+    if not text or not isinstance(text, str):
+        return empty
+
+    quantities, meta = _read_quantities(tokenize(text))
+
+    modes: Dict[str, dict] = {}
+    for mode in dict.fromkeys(q.mode for q in quantities):
+        modes[mode] = _summarize_mode([q for q in quantities if q.mode == mode])
+
+    primary_mode = "full" if modes.get("full", {}).get("complete") else next(
+        (m for m, s in modes.items() if s["complete"]), next(iter(modes), None)
+    )
+    if primary_mode is None:
+        return {**empty, "wog": meta["wog"]}
+
+    primary = modes[primary_mode]
+    fuel_type = primary["fuel_type"] or next((s["fuel_type"] for s in modes.values() if s["fuel_type"]), None)
+
+    return {
+        "ballast_speed": primary["ballast_speed"],
+        "laden_speed": primary["laden_speed"],
+        "ballast_consumption": primary["ballast_consumption"],
+        "laden_consumption": primary["laden_consumption"],
+        "fuel_type": fuel_type or "VLSFO",
+        "additional_fuels": primary["additional_fuels"],
+        "operating_mode": primary_mode,
+        "modes": {m: {k: v for k, v in s.items() if k != "complete"} for m, s in modes.items()},
+        "port_consumption": [
+            {"fuel": q.fuel, "mt_per_day": q.value} for q in quantities if q.port and q.kind == "consumption"
+        ],
+        "wog": meta["wog"],
+        "confident": primary["complete"] and meta["orphans"] == 0,
+    }
+
+
+# ==========================
+# LLM Parse Memo
+# ==========================
+def memo_version(prompt_template: str, model: Optional[str] = None) -> str:
+    """Changes whenever the grammar, the LLM prompt or the model deployment changes."""
+    digest = hashlib.sha256(f"{PARSER_VERSION}|{model or ''}|{prompt_template}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class ParseMemo:
+    """
+    Content-addressed store of LLM speed/consumption parses.
+
+    Key = sha256(version | normalized input), so the same description parsed
+    in any thread is answered from disk, and a new prompt / model version
+    simply stops matching old entries (invalidate() drops them).
+    """
+
+    def __init__(self, cache: SqliteCache, version: str):
+        self.cache = cache
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(normalize_speed_text(text).split())
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.version}|{self.normalize(text)}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[dict]:
+        entry = self.cache.get(self.key(text))
+        if entry is None or entry.get("version") != self.version:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry["result"]
+
+    def set(self, text: str, result: dict) -> None:
+        self.cache.set(self.key(text), {"version": self.version, "result": result})
+
+    def invalidate(self, all_versions: bool = False) -> int:
+        """Drop entries written under other versions (or every entry). Returns rows removed."""
+        if all_versions:
+            removed = len(self.cache)
+            self.cache.clear()
+            return removed
+
+        stale = [k for k, v in self.cache.items() if v.get("version") != self.version]
+        for key in stale:
+            self.cache.delete(key)
+        return len(stale)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
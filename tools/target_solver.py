@@ -0,0 +1,289 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+from typing import List, Mapping, Optional, Sequence, Tuple
+
+# ==========================
+# Third-Party Libraries
+# ==========================
+import numpy as np
+
+# =========================
+# Custom
+# =========================
+from tools.pnl_engine import (
+    QUICK_PNL_INPUTS,
+    QUICK_PNL_OUTPUTS,
+    VOYAGE_PHYSICS_INPUTS,
+    expand_voyage_inputs,
+    quick_voyage_pnl_arrays,
+)
+
+# ==========================
+# Solver Configuration
+# ==========================
+SOLVABLE_INPUTS = tuple(k for k in QUICK_PNL_INPUTS if k != "freight_is_lumpsum") + VOYAGE_PHYSICS_INPUTS
+
+# Inputs the metrics are not linear-fractional in (cube-law consumption)
+NONLINEAR_INPUTS = ("speed_knots", "reference_speed_knots")
+
+# Valid range of each input: the bracketed search range, and closed-form roots
+# outside it are reported as no solution
+SEARCH_BOUNDS = {
+    "cargo_quantity_mt": (1.0, 500_000.0),
+    "freight_rate": (0.0, 500.0),
+    "voyage_days": (0.1, 365.0),
+    "hire_rate_per_day": (0.0, 250_000.0),
+    "total_bunker_mt": (0.0, 50_000.0),
+    "bunker_price_per_mt": (0.0, 5_000.0),
+    "port_cost_usd": (0.0, 10_000_000.0),
+    "misc_cost_usd": (0.0, 10_000_000.0),
+    "canal_cost_usd": (0.0, 10_000_000.0),
+    "broker_commission_pct": (0.0, 0.99),
+    "address_commission_pct": (0.0, 0.99),
+    "weather_factor_pct": (0.0, 100.0),
+    "distance_nm": (1.0, 30_000.0),
+    "speed_knots": (4.0, 25.0),
+    "port_days": (0.0, 120.0),
+    "sea_consumption_mt_per_day": (0.0, 200.0),
+    "reference_speed_knots": (4.0, 25.0),
+    "port_consumption_mt_per_day": (0.0, 50.0),
+}
+
+GRID_POINTS = 65          # points in the vectorized bracket scan
+MAX_ITERATIONS = 100
+REL_TOL = 1e-12
+
+
+# ==========================
+# Scalar Model
+# ==========================
+def _ratio(v: Mapping, metric: str) -> Tuple[float, float]:
+    """
+    (numerator, denominator) of a quick P&L metric for scalar inputs, with the
+    arithmetic of quick_voyage_pnl_arrays. Both are affine in any single input
+    except speed, so `numerator - target × denominator = 0` has a closed form.
+    """
+    days = v["voyage_days"] * (1 + v["weather_factor_pct"] / 100)
+    freight = v["freight_rate"] if v["freight_is_lumpsum"] else v["cargo_quantity_mt"] * v["freight_rate"]
+    net_revenue = freight - freight * v["broker_commission_pct"]
+    hire_cost = v["hire_rate_per_day"] * days
+    bunker_cost = v["total_bunker_mt"] * v["bunker_price_per_mt"]
+    total_cost = hire_cost + v["port_cost_usd"] + v["misc_cost_usd"] + v["canal_cost_usd"] + bunker_cost
+    tce_numerator = net_revenue - (bunker_cost + v["port_cost_usd"] + v["misc_cost_usd"] + v["canal_cost_usd"])
+
+    if metric in ("total_freight", "gross_revenue"):
+        return freight, 1.0
+    if metric == "net_revenue":
+        return net_revenue, 1.0
+    if metric == "bunker_cost":
+        return bunker_cost, 1.0
+    if metric == "hire_cost":
+        return hire_cost, 1.0
+    if metric == "other_misc_cost":
+        return v["misc_cost_usd"], 1.0
+    if metric == "total_voyage_cost":
+        return total_cost, 1.0
+    if metric == "pnl":
+        return net_revenue - total_cost, 1.0
+    if metric == "daily_profit":
+        return net_revenue - total_cost, days
+    if metric == "tce":
+        return tce_numerator, days
+    if metric == "gross_tce":
+        return tce_numerator, days * (1.0 - v["address_commission_pct"])
+    # break_even_freight_usd_per_mt
+    return total_cost, v["cargo_quantity_mt"] * (1.0 - v["broker_commission_pct"])
+
+
+def _metric(v: Mapping, metric: str) -> float:
+    """Scalar metric with the model's guards (no days → 0, address ≥ 100% → TCE, ...)."""
+    numerator, denominator = _ratio(v, metric)
+
+    if metric in ("daily_profit", "tce"):
+        return numerator / denominator if denominator > 0 else 0.0
+    if metric == "gross_tce":
+        tce = _metric(v, "tce")
+        return tce / (1.0 - v["address_commission_pct"]) if 0.0 <= v["address_commission_pct"] < 1.0 else tce
+    if metric == "break_even_freight_usd_per_mt":
+        ok = v["cargo_quantity_mt"] > 0 and (1.0 - v["broker_commission_pct"]) > 0
+        return numerator / denominator if ok else 0.0
+    return numerator
+
+
+def _scalar_inputs(base: Mapping, variable: str, x: float) -> dict:
+    values = {k: v for k, v in QUICK_PNL_INPUTS.items() if v is not None}
+    values.update(expand_voyage_inputs({**base, variable: x}))
+
+    missing = [k for k in QUICK_PNL_INPUTS if k not in values]
+    if missing:
+        raise ValueError(f"Missing required inputs: {', '.join(missing)}")
+    unknown = set(values) - set(QUICK_PNL_INPUTS)
+    if unknown:
+        raise ValueError(f"Unknown inputs: {', '.join(sorted(unknown))}")
+
+    lumpsum = bool(values.pop("freight_is_lumpsum"))
+    return {"freight_is_lumpsum": lumpsum, **{k: float(v) for k, v in values.items()}}
+
+
+def _residual(base: Mapping, variable: str, metric: str, target: float, x: float) -> float:
+    try:
+        return _metric(_scalar_inputs(base, variable, x), metric) - target
+    except ZeroDivisionError:
+        return float("nan")
+
+
+def _evaluate(base: Mapping, variable: str, xs, metric: str) -> np.ndarray:
+    inputs = dict(base)
+    inputs[variable] = np.asarray(xs, dtype=np.float64)
+    with np.errstate(all="ignore"):
+        return quick_voyage_pnl_arrays(**expand_voyage_inputs(inputs))[metric]
+
+
+# ==========================
+# Root Finding
+# ==========================
+def _closed_form(base: Mapping, variable: str, metric: str, target: float, x0: float, x1: float) -> Optional[float]:
+    """Root of numerator − target × denominator (affine in the variable), or None."""
+    def g(x: float) -> float:
+        numerator, denominator = _ratio(_scalar_inputs(base, variable, x), metric)
+        return numerator - target * denominator
+
+    try:
+        g0, g1 = g(x0), g(x1)
+    except ZeroDivisionError:
+        return None
+    if g1 == g0:
+        raise ValueError(f"{metric} does not depend on {variable}")
+    if not np.isfinite(g1 - g0):
+        return None
+    return x0 - g0 * (x1 - x0) / (g1 - g0)
+
+
+def _bracketed(base: Mapping, variable: str, metric: str, target: float, lo: float, hi: float, y_lo: float, y_hi: float) -> float:
+    """Illinois (modified regula falsi) on a sign-change bracket."""
+    side = 0
+    x = lo
+    for _ in range(MAX_ITERATIONS):
+        x = (lo * y_hi - hi * y_lo) / (y_hi - y_lo)
+        y = _residual(base, variable, metric, target, x)
+        if y == 0 or not np.isfinite(y) or hi - lo <= REL_TOL * max(1.0, abs(x)):
+            break
+        if (y > 0) == (y_hi > 0):
+            hi, y_hi = x, y
+            if side == 1:
+                y_lo /= 2
+            side = 1
+        else:
+            lo, y_lo = x, y
+            if side == -1:
+                y_hi /= 2
+            side = -1
+    return float(x)
+
+
+def _tolerance(target: float, scale: float = 0.0) -> float:
+    return 1e-9 * max(1.0, abs(target), abs(scale))
+
+
+# ==========================
+# Solver
+# ==========================
+def solve_target(
+    base: Mapping,
+    variable: str,
+    metric: str = "pnl",
+    target: float = 0.0,
+    bounds: Optional[Sequence[float]] = None,
+) -> dict:
+    """
+    Value of one input that makes `metric` of the quick P&L model (with the
+    voyage physics inputs) equal `target`, e.g. the breakeven bunker price.
+
+    Every metric is a ratio of terms affine in any single input except speed,
+    so the answer is closed-form from two scalar evaluations. Speed (cube-law
+    consumption) and guarded edge cases fall back to a vectorized sign-change
+    scan of the bounds and Illinois refinement of each bracket; all roots in the
+    bounds are returned and "value" is the one closest to the base value.
+    "value" is None when no root lies within the bounds (a closed-form root
+    outside them is given as "out_of_bounds_value").
+    """
+    if metric not in QUICK_PNL_OUTPUTS:
+        raise ValueError(f"Unknown metric: {metric}. Available: {', '.join(QUICK_PNL_OUTPUTS)}")
+    if variable not in SOLVABLE_INPUTS:
+        raise ValueError(f"Cannot solve for {variable}. Available: {', '.join(SOLVABLE_INPUTS)}")
+
+    lo, hi = (float(b) for b in (bounds or SEARCH_BOUNDS[variable]))
+    if not lo < hi:
+        raise ValueError(f"Invalid bounds: {lo} … {hi}")
+
+    current = base.get(variable)
+    base = {k: v for k, v in base.items() if k != variable}
+    target = float(target)
+    result = {"variable": variable, "metric": metric, "target": target}
+
+    # --------- CLOSED FORM ---------
+    if variable not in NONLINEAR_INPUTS:
+        x0 = float(current) if current is not None else lo
+        x = _closed_form(base, variable, metric, target, x0, x0 + max(1.0, abs(x0)))
+
+        if x is not None:
+            inputs = _scalar_inputs(base, variable, x)
+            achieved = _metric(inputs, metric)
+            if abs(achieved - target) <= _tolerance(target, _ratio(inputs, metric)[0]):
+                if not lo <= x <= hi:
+                    # The only root lies outside the bounds: no solution, as below
+                    return {
+                        **result,
+                        "value": None,
+                        "method": "closed_form",
+                        "solutions": [],
+                        "within_bounds": False,
+                        "out_of_bounds_value": x,
+                        "range": {"bounds": [lo, hi]},
+                    }
+                return {
+                    **result,
+                    "value": x,
+                    "method": "closed_form",
+                    "solutions": [x],
+                    "within_bounds": True,
+                    "achieved": achieved,
+                }
+
+    # --------- BRACKETED ROOT FINDING ---------
+    xs = np.linspace(lo, hi, GRID_POINTS)
+    ys = _evaluate(base, variable, xs, metric) - target
+    finite = np.isfinite(ys)
+
+    solutions: List[float] = [float(x) for x in xs[finite & (ys == 0)]]
+    crossings = finite[:-1] & finite[1:] & (np.sign(ys[:-1]) * np.sign(ys[1:]) < 0)
+    for i in np.flatnonzero(crossings):
+        solutions.append(_bracketed(base, variable, metric, target, xs[i], xs[i + 1], ys[i], ys[i + 1]))
+
+    if not solutions:
+        return {
+            **result,
+            "value": None,
+            "method": "bracketed",
+            "solutions": [],
+            "within_bounds": False,
+            "range": {
+                "bounds": [lo, hi],
+                f"{metric}_min": float(np.min(ys[finite]) + target) if finite.any() else None,
+                f"{metric}_max": float(np.max(ys[finite]) + target) if finite.any() else None,
+            },
+        }
+
+    solutions.sort()
+    reference = float(current) if current is not None else solutions[0]
+    value = min(solutions, key=lambda s: abs(s - reference))
+
+    return {
+        **result,
+        "value": value,
+        "method": "bracketed",
+        "solutions": solutions,
+        "within_bounds": True,
+        "achieved": _residual(base, variable, metric, target, value) + target,
+    }
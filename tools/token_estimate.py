@@ -0,0 +1,10 @@
+# ==========================
+# Token Estimate
+# ==========================
+# ~4 characters per token for English text and JSON: good enough for logs,
+# history budgets and embedding quotas. Real counts come from the response usage.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
@@ -0,0 +1,381 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import bisect
+import csv
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# =========================
+# Custom
+# =========================
+from db.cache_store import SqliteCache
+
+# Field names seen in TheOceann / AIS registry payloads (matched case- and
+# underscore-insensitively).
+NAME_FIELDS = ("SHIPNAME", "SHIP_NAME", "VESSEL_NAME", "VESSELNAME", "NAME")
+MMSI_FIELDS = ("MMSI",)
+IMO_FIELDS = ("IMO", "IMO_NUMBER", "IMONUMBER")
+SHIP_ID_FIELDS = ("SHIP_ID", "SHIPID")
+
+# Wrapper keys under which a list of vessels may be returned
+LIST_FIELDS = ("data", "result", "results", "vessels", "items")
+
+_NAME_PREFIXES = re.compile(r"^(M/?V|M/?T|MV|MT|SS)\s+")
+_NON_ALNUM = re.compile(r"[^A-Z0-9 ]+")
+
+_MEMO_MAX = 10_000
+_FUZZY_CANDIDATES = 50
+_MISSING = object()
+
+
+def normalize_name(name: str) -> str:
+    """'m/v  Sara-Express ' → 'SARA EXPRESS'"""
+    text = " ".join(str(name).upper().split())
+    text = _NAME_PREFIXES.sub("", text)
+    text = _NON_ALNUM.sub(" ", text)
+    return " ".join(text.split())
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal-string-alignment distance (Levenshtein + adjacent transposition),
+    cut off early once every cell of a row exceeds `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+
+    return prev[-1]
+
+
+def _field(record: dict, candidates: Tuple[str, ...]) -> Optional[str]:
+    wanted = {c.replace("_", "") for c in candidates}
+    for key, value in record.items():
+        if str(key).upper().replace("_", "") in wanted and value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+def extract_vessels(payload) -> List[dict]:
+    """Pull vessel records out of a get-vessels-name response or a dump row list."""
+    if isinstance(payload, list):
+        return [r for r in payload if isinstance(r, dict)]
+
+    if isinstance(payload, dict):
+        for key in LIST_FIELDS:
+            if isinstance(payload.get(key), list):
+                return extract_vessels(payload[key])
+        if _field(payload, NAME_FIELDS):
+            return [payload]
+
+    return []
+
+
+def vessel_record(raw: dict) -> Optional[dict]:
+    """{"name", "mmsi", "imo", "ship_id", "raw"} for one vessel row, or None without a name."""
+    name = _field(raw, NAME_FIELDS)
+    if not name:
+        return None
+    return {
+        "name": normalize_name(name),
+        "mmsi": _field(raw, MMSI_FIELDS),
+        "imo": _field(raw, IMO_FIELDS),
+        "ship_id": _field(raw, SHIP_ID_FIELDS),
+        "raw": raw,
+    }
+
+
+# ==========================
+# Vessel Name Index
+# ==========================
+class VesselIndex:
+    """
+    In-process vessel registry (name → MMSI / IMO / SHIP_ID).
+
+    - exact:  normalized name → record keys (dict lookup)
+    - prefix: sorted (word-suffix, name) array searched with bisect, so
+              "SARA" matches both "SARA EXPRESS" and "STAR SARA"
+    - fuzzy:  trigram candidates re-ranked by bounded edit distance
+
+    Records come from a bulk registry dump (JSON list or CSV) and/or are
+    learned from live API responses; learned records persist in SQLite.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[SqliteCache] = None,
+        query_cache: Optional[SqliteCache] = None,
+        dump_path: Optional[str] = None,
+        max_results: int = 25,
+    ):
+        self.cache = cache
+        self.query_cache = query_cache
+        self.dump_path = dump_path
+        self.max_results = max_results
+
+        self.records: Dict[str, dict] = {}
+        self.authoritative = False
+
+        self._by_name: Dict[str, set] = {}
+        self._prefix: List[Tuple[str, str]] = []
+        self._trigrams: Dict[str, set] = {}
+        self._memo: Dict[str, Optional[dict]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    # ------------------------------
+    # Loading
+    # ------------------------------
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+
+        with self._lock:
+            if self._loaded:
+                return
+            if self.cache is not None:
+                self._add_records((r for _, r in self.cache.items()), persist=False)
+            if self.dump_path and os.path.exists(self.dump_path):
+                self.load_dump(self.dump_path)
+            self._loaded = True
+
+    def load_dump(self, path: str) -> int:
+        """Load a bulk registry dump (JSON list / {"data": [...]} or CSV). Returns rows indexed."""
+        if path.lower().endswith(".csv"):
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                rows = extract_vessels(json.load(f))
+
+        with self._lock:
+            added = self._add_records((vessel_record(r) for r in rows), persist=False)
+            self.authoritative = True
+        return added
+
+    @staticmethod
+    def _key(record: dict) -> str:
+        for field in ("imo", "mmsi", "ship_id"):
+            if record.get(field):
+                return f"{field}:{record[field]}"
+        return f"name:{record['name']}"
+
+    def _add_records(self, records: Iterable[Optional[dict]], persist: bool) -> int:
+        new_prefixes: List[Tuple[str, str]] = []
+        to_persist: List[Tuple[str, dict]] = []
+
+        for record in records:
+            if not record or not record.get("name"):
+                continue
+
+            key = self._key(record)
+            name = record["name"]
+            previous = self.records.get(key)
+            self.records[key] = record
+            to_persist.append((key, record))
+
+            if previous is not None and previous["name"] != name:
+                self._by_name.get(previous["name"], set()).discard(key)
+
+            if name not in self._by_name:
+                self._by_name[name] = set()
+                words = name.split(" ")
+                for i in range(len(words)):
+                    new_prefixes.append((" ".join(words[i:]), name))
+                for gram in _trigrams(name):
+                    self._trigrams.setdefault(gram, set()).add(name)
+            self._by_name[name].add(key)
+
+        if new_prefixes:
+            if len(new_prefixes) > 64:
+                self._prefix.extend(new_prefixes)
+                self._prefix.sort()
+            else:
+                for entry in new_prefixes:
+                    bisect.insort(self._prefix, entry)
+
+        if to_persist:
+            self._memo.clear()
+            if persist and self.cache is not None:
+                self.cache.set_many(to_persist)
+
+        return len(to_persist)
+
+    # ------------------------------
+    # Search
+    # ------------------------------
+    def _exact(self, name: str) -> List[str]:
+        return sorted(self._by_name.get(name, ()))
+
+    def _prefix_names(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._prefix, (prefix,))
+        names: Dict[str, None] = {}
+
+        for i in range(start, len(self._prefix)):
+            suffix, name = self._prefix[i]
+            if not suffix.startswith(prefix):
+                break
+            names[name] = None
+            if len(names) >= self.max_results:
+                break
+
+        return list(names)
+
+    def _fuzzy_names(self, query: str) -> Tuple[List[str], Optional[int]]:
+        """Names at the smallest edit distance within the allowed budget."""
+        limit = 1 if len(query) <= 8 else 2
+        grams = _trigrams(query)
+
+        # One edit changes at most 3 trigrams (4 for a transposition), so a
+        # name within `limit` edits shares one of the 4*limit+1 rarest ones...
+        postings = sorted((self._trigrams.get(g, ()) for g in grams), key=len)[: 4 * limit + 1]
+        candidates = {n for names in postings for n in names if abs(len(n) - len(query)) <= limit}
+
+        # ...and most of the rest, which is a cheap set check before edit distance.
+        min_shared = len(grams) - 4 * limit
+        scored = []
+        for name in candidates:
+            shared = len(grams & _trigrams(name))
+            if shared >= min_shared:
+                scored.append((-shared, name))
+        scored.sort()
+
+        best: List[str] = []
+        best_distance = limit + 1
+        for _, name in scored[:_FUZZY_CANDIDATES]:
+            distance = edit_distance(query, name, limit)
+            if distance < best_distance:
+                best, best_distance = [name], distance
+            elif distance == best_distance and distance <= limit:
+                best.append(name)
+
+        return (best, best_distance) if best_distance <= limit else ([], None)
+
+    def search(self, query: str) -> Optional[dict]:
+        """
+        Local answer for a vessel-name query, or None when only the API can answer.
+
+        A query the API answered before is replayed from the query cache.
+        Exact, prefix and fuzzy (1-2 edit) matches are served only when the
+        index holds a full registry dump: vessel names are not unique, so a
+        learned (partial) index cannot rule out other vessels of that name.
+        """
+        self._ensure_loaded()
+        q = normalize_name(query)
+        if not q:
+            return None
+
+        result = self._memo.get(q, _MISSING)
+        if result is _MISSING:
+            with self._lock:
+                result = self._search(q)
+                if len(self._memo) >= _MEMO_MAX:
+                    self._memo.clear()
+                self._memo[q] = result
+
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def _search(self, q: str) -> Optional[dict]:
+        if self.query_cache is not None:
+            known = self.query_cache.get(q)
+            if known is not None:
+                keys = [k for k in known if k in self.records]
+                if keys:
+                    return self._response(keys, "learned_query", q)
+
+        if not self.authoritative:
+            return None
+
+        keys = self._exact(q)
+        if keys:
+            return self._response(keys, "exact", q)
+
+        names = self._prefix_names(q)
+        if names:
+            keys = [k for n in names for k in self._exact(n)]
+            return self._response(keys, "prefix", q)
+
+        names, distance = self._fuzzy_names(q)
+        if names:
+            keys = [k for n in names for k in self._exact(n)]
+            return self._response(keys, "fuzzy", q, distance=distance)
+
+        return None
+
+    def _response(self, keys: List[str], match: str, query: str, **extra) -> dict:
+        return {
+            "status": "success",
+            "source": "local_index",
+            "match": match,
+            "query": query,
+            **extra,
+            "data": [self.records[k]["raw"] for k in keys[: self.max_results]],
+        }
+
+    def suggestions(self, query: str) -> List[str]:
+        """Closest known names (prefix first, then fuzzy): "did you mean" hints when the API finds nothing."""
+        self._ensure_loaded()
+        q = normalize_name(query)
+        names = self._prefix_names(q) or self._fuzzy_names(q)[0]
+        return names[:5]
+
+    # ------------------------------
+    # Learning
+    # ------------------------------
+    def learn(self, query: str, payload):
+        """Index the vessels in an API response and remember the query → results mapping."""
+        self._ensure_loaded()
+        vessels = extract_vessels(payload)
+        records = [vessel_record(r) for r in vessels]
+        records = [r for r in records if r]
+
+        with self._lock:
+            self._add_records(records, persist=True)
+
+        if records and self.query_cache is not None:
+            q = normalize_name(query)
+            self.query_cache.set(q, [self._key(r) for r in records])
+            self._memo.pop(q, None)
+
+        return payload
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "vessels": len(self.records),
+            "names": len(self._by_name),
+            "authoritative": self.authoritative,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
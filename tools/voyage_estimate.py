@@ -10,6 +10,7 @@ load_dotenv()
 # ==========================
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 from typing import Dict
 
@@ -17,13 +18,206 @@ from typing import Dict
 # Third-Party Libraries
 # ==========================
 from langchain_core.tools import tool
+import httpx
+import numpy as np
 import requests
 
+# =========================
+# Custom
+# =========================
+from db.cache_store import SqliteCache, is_cacheable
+from tools.bunker_prices import BunkerPriceStore
+from tools.fleet_ranking import (
+    MAX_CANDIDATES as FLEET_MAX_CANDIDATES,
+    MAX_WORKERS as FLEET_MAX_WORKERS,
+    PARTICULARS_FIELDS,
+    fleet_candidates,
+    rank_fleet,
+    unique_open_ports,
+    vessel_speeds,
+)
+from tools.http_client import endpoint_timeout, get_async_client, http_session
+from tools.itinerary import compute_itinerary
+from tools.particulars_cache import ParticularsCache
+from tools.pnl_engine import (
+    amount_column,
+    cargo_columns,
+    grid_rows,
+    grid_summary,
+    reverse_solve_batch,
+    scenario_grid,
+    voyage_pnl_columns,
+)
+from tools.sea_routes import offline_port_distance
+from tools.speed_optimizer import consumption_points, fit_consumption_curve, optimise_speed
+from tools.speed_parser import ParseMemo, memo_version, parse_speed_consumption
+from tools.target_solver import solve_target
+from tools.vessel_index import VesselIndex, extract_vessels
+from tools.voyage_risk import simulate
+
 # ==========================
 # OCEAN Setup
 # ==========================
 YOUR_TOKEN = os.getenv("YOUR_TOKEN")
 
+# Request headers shared by the sync and async variants of each tool.
+MAP_INTELLIGENCE_HEADERS = {
+    "accept": "*/*",
+    "authorization": YOUR_TOKEN,
+    "endpoint": "Map Intelligence",
+}
+
+DISTANCE_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Authorization": YOUR_TOKEN,
+    "Content-Type": "application/json",
+    "endpoint": "Chartering Dashboard",
+}
+
+BUNKER_PRICE_HEADERS = {
+    "accept": "*/*",
+    "accept-language": "en-US,en;q=0.9",
+    "authorization": YOUR_TOKEN,   # <-- Use your stored token
+    "cache-control": "no-cache",
+    "endpoint": "Bunker Prices",
+    "origin": "https://devmail-thor.theoceann.com",
+    "pragma": "no-cache",
+    "priority": "u=1, i",
+    "referer": "https://devmail-thor.theoceann.com/",
+    "sec-ch-ua": '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": '"Linux"',
+    "sec-fetch-dest": "empty",
+    "sec-fetch-mode": "cors",
+    "sec-fetch-site": "same-site",
+    "user-agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36"
+    ),
+}
+
+WEATHER_SPEED_HEADERS = {
+    "Authorization": YOUR_TOKEN,
+    "Accept": "application/json, text/plain, */*",
+    "Content-Type": "application/json",
+    "endpoint": "Chartering Dashboard",
+    "User-Agent": "Python/Requests Script"
+}
+
+CARGO_MATCH_HEADERS = {
+    "Authorization": YOUR_TOKEN,
+    "Content-Type": "application/json",
+    "Accept": "*/*",
+    "endpoint": "Cargo",
+    "Origin": "https://devmail-thor.theoceann.com",
+    "Referer": "https://devmail-thor.theoceann.com/"
+}
+
+VESSEL_MATCH_HEADERS = {
+    "Authorization": YOUR_TOKEN,
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+}
+
+# Prompt for llm_parser. Editing it changes the memo version, so earlier
+# parses are no longer served.
+SPEED_PARSE_PROMPT = """
+You are a maritime technical data parser.
+
+Extract and normalize this vessel data:
+
+INPUT:
+{speed_and_consumption}
+
+Return STRICT JSON:
+
+{{
+  "ballast_speed": float | null,
+  "laden_speed": float | null,
+  "ballast_consumption": float | null,
+  "laden_consumption": float | null,
+  "fuel_type": string | null
+}}
+
+Rules:
+- Fix broken decimals like "11, 80" → 11.8
+- If only one speed → use it for both
+- If only one consumption → use it for both
+- If nothing found → return all fields as null
+"""
+
+speed_parse_memo = ParseMemo(
+    SqliteCache(
+        "speed_parse_memo",
+        max_entries=int(os.getenv("SPEED_PARSE_MEMO_MAX_ENTRIES", "20000")),
+    ),
+    version=memo_version(SPEED_PARSE_PROMPT, os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME")),
+)
+
+
+# ==========================
+# Response Caches
+# ==========================
+# Port distances do not change; repeat trade lanes are served from disk.
+port_distance_cache = SqliteCache(
+    "port_distance",
+    ttl_seconds=float(os.getenv("PORT_DISTANCE_CACHE_TTL_HOURS", "720")) * 3600,
+    max_entries=int(os.getenv("PORT_DISTANCE_CACHE_MAX_ENTRIES", "5000")),
+)
+
+
+def _port_distance_cache_key(payload: dict) -> str:
+    """Normalize port names (case / whitespace) and append the routing options."""
+    return "|".join([
+        " ".join(str(payload["from"]).upper().split()),
+        " ".join(str(payload["to"]).upper().split()),
+        str(payload["localEca"]),
+        str(payload["seca"]),
+        str(payload["canalOptions"]),
+        str(payload["piracyArea"]),
+    ])
+
+
+def _offline_distance_fallback(payload: dict, error: dict) -> dict:
+    """
+    Answer from the local sea-route graph when the Distance API is down or
+    too slow; keep the original error if the graph cannot route the pair.
+    """
+    offline = offline_port_distance(
+        payload["from"], payload["to"],
+        localEca=payload["localEca"],
+        seca=payload["seca"],
+        canalOptions=payload["canalOptions"],
+        piracyArea=payload["piracyArea"],
+    )
+    if offline is None:
+        return error
+
+    return {**offline, "fallback_reason": error.get("type"), "api_error": error.get("message")}
+
+
+vessel_index = VesselIndex(
+    cache=SqliteCache("vessel_index"),
+    query_cache=SqliteCache(
+        "vessel_index_queries",
+        ttl_seconds=float(os.getenv("VESSEL_INDEX_QUERY_TTL_DAYS", "30")) * 86400,
+        max_entries=20000,
+    ),
+    dump_path=os.getenv("VESSEL_INDEX_DUMP"),
+)
+
+
+def _with_vessel_suggestions(query: str, data):
+    """Attach close local matches to an error / empty vessel-name response."""
+    failed = isinstance(data, dict) and data.get("status") == "error"
+    if failed or not extract_vessels(data):
+        suggestions = vessel_index.suggestions(query)
+        if suggestions:
+            if not isinstance(data, dict):
+                data = {"status": "success", "data": data or []}
+            return {**data, "local_suggestions": suggestions}
+    return data
+
 
 from langchain_openai import AzureChatOpenAI
 
@@ -40,21 +234,16 @@ llm_parser = AzureChatOpenAI(
 # VOYAGE INTERNAL TOOLS
 # ==========================
 
-@tool
-def get_vessels_by_name(query: str) -> dict:
+def _fetch_vessels_by_name(query: str) -> dict:
     """
-    Fetch vessel list by vessel name or partial name with error handling.
+    Raw Map Intelligence vessel-name search (no local index).
     """
     url = f"https://<your_url>/get-vessels-name/{query}"
 
-    headers = {
-        "accept": "*/*",
-        "authorization": YOUR_TOKEN,
-        "endpoint": "Map Intelligence",
-    }
+    headers = MAP_INTELLIGENCE_HEADERS
 
     try:
-        r = requests.get(url, headers=headers, timeout=15)
+        r = http_session.get(url, headers=headers, timeout=endpoint_timeout("get_vessels_by_name"))
         r.raise_for_status()
         return r.json()
 
@@ -91,6 +280,21 @@ def get_vessels_by_name(query: str) -> dict:
             "url": url,
         }
 
+@tool
+def get_vessels_by_name(query: str) -> dict:
+    """
+    Fetch vessel list by vessel name or partial name with error handling.
+    Repeated queries (and, with a full registry dump, any name) are answered
+    from the local vessel index; otherwise the API is called and close known
+    names are attached as suggestions when it finds nothing.
+    """
+    local = vessel_index.search(query)
+    if local is not None:
+        return local
+
+    data = vessel_index.learn(query, _fetch_vessels_by_name(query))
+    return _with_vessel_suggestions(query, data)
+
 @tool
 def get_vessel_particulars(mmsi: str, imo: str, ship_id: str, vessel_name: str) -> dict:
     """
@@ -106,17 +310,20 @@ def get_vessel_particulars(mmsi: str, imo: str, ship_id: str, vessel_name: str)
     Returns:
         dict: JSON response containing full vessel particulars, or error dict.
     """
-    
+    return vessel_particulars_cache.get(mmsi, imo, ship_id, vessel_name)
+
+def _fetch_vessel_particulars(mmsi: str, imo: str, ship_id: str, vessel_name: str) -> dict:
+    """
+    Raw Lloyd's particulars API call (no IMO cache).
+    """
+    timeout = endpoint_timeout("get_vessel_particulars")
+
     try:
         url = f"https://<your_url>/get-vessel-particulars/{mmsi}/{imo}/{ship_id}/{vessel_name}"
 
-        headers = {
-            "accept": "*/*",
-            "authorization": YOUR_TOKEN,
-            "endpoint": "Map Intelligence",
-        }
+        headers = MAP_INTELLIGENCE_HEADERS
 
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_session.get(url, headers=headers, timeout=timeout)
         response.raise_for_status()
         
         data = response.json()
@@ -140,7 +347,7 @@ def get_vessel_particulars(mmsi: str, imo: str, ship_id: str, vessel_name: str)
     except requests.exceptions.Timeout:
         return {
             "error": "Request timeout",
-            "message": "The API request timed out after 30 seconds"
+            "message": f"The API request timed out after {timeout:g} seconds"
         }
     
     except requests.exceptions.HTTPError as e:
@@ -182,14 +389,10 @@ def categorize_single_port_call(v: str, shipid: str, msgtype: str) -> dict:
         "msgtype": msgtype,
     }
 
-    headers = {
-        "accept": "*/*",
-        "authorization": YOUR_TOKEN,
-        "endpoint": "Map Intelligence",
-    }
+    headers = MAP_INTELLIGENCE_HEADERS
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=15)
+        response = http_session.get(url, headers=headers, params=params, timeout=endpoint_timeout("categorize_single_port_call"))
         response.raise_for_status()
         return response.json()
 
@@ -247,14 +450,10 @@ def expected_port_arrivals(port_name: str, msg_type: str = "simple") -> dict:
         "msgType": msg_type
     }
 
-    headers = {
-        "accept": "*/*",
-        "authorization": YOUR_TOKEN,
-        "endpoint": "Map Intelligence",
-    }
+    headers = MAP_INTELLIGENCE_HEADERS
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=15)
+        response = http_session.get(url, headers=headers, params=params, timeout=endpoint_timeout("expected_port_arrivals"))
         response.raise_for_status()
         return response.json()
 
@@ -307,16 +506,13 @@ def get_port_distance(
     """
     Get port-to-port distance with route geometry, SECA length, canal options,
     HRA length, and detailed LineString coordinates.
+    If the Distance API is unavailable, an estimate from the local sea-route
+    graph is returned instead ("source": "offline_graph").
     """
 
     url = "https://<your_url>/distance"
 
-    headers = {
-        "Accept": "application/json, text/plain, */*",
-        "Authorization": YOUR_TOKEN,
-        "Content-Type": "application/json",
-        "endpoint": "Chartering Dashboard",
-    }
+    headers = DISTANCE_HEADERS
 
     payload = {
         "from": from_port,
@@ -327,52 +523,61 @@ def get_port_distance(
         "piracyArea": piracyArea
     }
 
+    cache_key = _port_distance_cache_key(payload)
+    cached = port_distance_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=20)
+        response = http_session.post(url, json=payload, headers=headers, timeout=endpoint_timeout("get_port_distance"))
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+
+        if is_cacheable(data):
+            port_distance_cache.set(cache_key, data)
+
+        return data
 
     except requests.exceptions.HTTPError as http_err:
-        return {
+        return _offline_distance_fallback(payload, {
             "status": "error",
             "type": "http_error",
             "message": str(http_err),
             "url": url,
             "payload": payload,
-        }
+        })
 
     except requests.exceptions.ConnectionError as conn_err:
-        return {
+        return _offline_distance_fallback(payload, {
             "status": "error",
             "type": "connection_error",
             "message": "Failed to connect to TheOceann Distance API.",
             "details": str(conn_err),
             "url": url,
             "payload": payload,
-        }
+        })
 
     except requests.exceptions.Timeout:
-        return {
+        return _offline_distance_fallback(payload, {
             "status": "error",
             "type": "timeout",
             "message": "TheOceann Distance API request timed out.",
             "url": url,
             "payload": payload,
-        }
+        })
 
     except Exception as e:
-        return {
+        return _offline_distance_fallback(payload, {
             "status": "error",
             "type": "unknown_error",
             "message": str(e),
             "url": url,
             "payload": payload,
-        }
+        })
 
-@tool
-def get_bunker_spotprice_by_port(port_name: str) -> dict:
+def _fetch_bunker_spotprice(port_name: str) -> dict:
     """
-    Fetch bunker spot prices and future price curves by searching a port name.
+    Raw Bunker Prices API call (no snapshot store).
     Uses partial search API: searchport-full?portName=<name>
     """
 
@@ -381,30 +586,10 @@ def get_bunker_spotprice_by_port(port_name: str) -> dict:
         f"searchport-full?portName={port_name}"
     )
 
-    headers = {
-        "accept": "*/*",
-        "accept-language": "en-US,en;q=0.9",
-        "authorization": YOUR_TOKEN,   # <-- Use your stored token
-        "cache-control": "no-cache",
-        "endpoint": "Bunker Prices",
-        "origin": "https://devmail-thor.theoceann.com",
-        "pragma": "no-cache",
-        "priority": "u=1, i",
-        "referer": "https://devmail-thor.theoceann.com/",
-        "sec-ch-ua": '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
-        "sec-ch-ua-mobile": "?0",
-        "sec-ch-ua-platform": '"Linux"',
-        "sec-fetch-dest": "empty",
-        "sec-fetch-mode": "cors",
-        "sec-fetch-site": "same-site",
-        "user-agent": (
-            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36"
-        ),
-    }
+    headers = BUNKER_PRICE_HEADERS
 
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = http_session.get(url, headers=headers, timeout=endpoint_timeout("get_bunker_spotprice_by_port"))
         response.raise_for_status()
         return response.json()
 
@@ -445,6 +630,25 @@ def get_bunker_spotprice_by_port(port_name: str) -> dict:
             "port_name": port_name,
         }
 
+@tool
+def get_bunker_spotprice_by_port(port_name: str) -> dict:
+    """
+    Fetch bunker spot prices and future price curves by searching a port name.
+    Uses partial search API: searchport-full?portName=<name>
+    """
+    return bunker_price_store.get(port_name)
+
+@tool
+def get_bunker_spotprices_for_ports(port_names: list[str]) -> dict:
+    """
+    Fetch bunker spot prices and future price curves for several ports in ONE call
+    (e.g. load port and discharge port).
+
+    Returns:
+        dict: {"status": "success", "ports": {<port_name>: <same payload as get_bunker_spotprice_by_port>}}
+    """
+    return {"status": "success", "ports": bunker_price_store.get_many(port_names)}
+
 @tool
 def get_weather_speed(payload: dict) -> dict:
     """
@@ -456,16 +660,10 @@ def get_weather_speed(payload: dict) -> dict:
 
     url = "https://<your_url>/get-weather-speed"
 
-    headers = {
-        "Authorization": YOUR_TOKEN,
-        "Accept": "application/json, text/plain, */*",
-        "Content-Type": "application/json",
-        "endpoint": "Chartering Dashboard",
-        "User-Agent": "Python/Requests Script"
-    }
+    headers = WEATHER_SPEED_HEADERS
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=20)
+        response = http_session.post(url, json=payload, headers=headers, timeout=endpoint_timeout("get_weather_speed"))
         response.raise_for_status()
         return response.json()
 
@@ -514,14 +712,7 @@ def best_match_cargo(cargo_size: int, cargo_type: str, load_port: str, change_ta
 
     url = "https://<your_url>/best-match-cargo"
 
-    headers = {
-        "Authorization": YOUR_TOKEN,
-        "Content-Type": "application/json",
-        "Accept": "*/*",
-        "endpoint": "Cargo",
-        "Origin": "https://devmail-thor.theoceann.com",
-        "Referer": "https://devmail-thor.theoceann.com/"
-    }
+    headers = CARGO_MATCH_HEADERS
 
     payload = {
         "cargo_size": cargo_size,
@@ -531,7 +722,7 @@ def best_match_cargo(cargo_size: int, cargo_type: str, load_port: str, change_ta
     }
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=20)
+        response = http_session.post(url, json=payload, headers=headers, timeout=endpoint_timeout("best_match_cargo"))
         response.raise_for_status()
         return response.json()
 
@@ -580,11 +771,7 @@ def match_open_vessels(dwt: str, open_port: str) -> dict:
 
     url = "https://<your_url>/best_match_vessel"
 
-    headers = {
-        "Authorization": YOUR_TOKEN,
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-    }
+    headers = VESSEL_MATCH_HEADERS
 
     payload = {
         "dwt": dwt,
@@ -592,7 +779,7 @@ def match_open_vessels(dwt: str, open_port: str) -> dict:
     }
     
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=20)
+        response = http_session.post(url, json=payload, headers=headers, timeout=endpoint_timeout("match_open_vessels"))
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -606,6 +793,303 @@ def match_open_vessels(dwt: str, open_port: str) -> dict:
             }
         }
 
+# ==========================
+# ASYNC VARIANTS (HTTP TOOLS)
+# ==========================
+# Attached to the tools above as their coroutine, so a graph run with
+# ainvoke/astream lets ToolNode overlap independent tool calls.
+
+def _async_error(exc: Exception, service: str, **context) -> dict:
+    """Map httpx exceptions onto the error dicts returned by the sync tools."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return {"status": "error", "type": "http_error", "message": str(exc), **context}
+
+    if isinstance(exc, httpx.TimeoutException):
+        return {"status": "error", "type": "timeout", "message": f"{service} request timed out.", **context}
+
+    if isinstance(exc, httpx.TransportError):
+        return {
+            "status": "error",
+            "type": "connection_error",
+            "message": f"Failed to connect to {service}.",
+            "details": str(exc),
+            **context,
+        }
+
+    return {"status": "error", "type": "unknown_error", "message": str(exc), **context}
+
+
+async def _afetch_vessels_by_name(query: str) -> dict:
+    url = f"https://<your_url>/get-vessels-name/{query}"
+
+    try:
+        r = await get_async_client().get(
+            url, headers=MAP_INTELLIGENCE_HEADERS, timeout=endpoint_timeout("get_vessels_by_name")
+        )
+        r.raise_for_status()
+        return r.json()
+    except Exception as e:
+        return _async_error(e, "TheOceann API", url=url)
+
+
+async def aget_vessels_by_name(query: str) -> dict:
+    local = vessel_index.search(query)
+    if local is not None:
+        return local
+
+    data = vessel_index.learn(query, await _afetch_vessels_by_name(query))
+    return _with_vessel_suggestions(query, data)
+
+
+async def aget_vessel_particulars(mmsi: str, imo: str, ship_id: str, vessel_name: str) -> dict:
+    return await vessel_particulars_cache.aget(mmsi, imo, ship_id, vessel_name)
+
+
+async def _afetch_vessel_particulars(mmsi: str, imo: str, ship_id: str, vessel_name: str) -> dict:
+    timeout = endpoint_timeout("get_vessel_particulars")
+    url = f"https://<your_url>/get-vessel-particulars/{mmsi}/{imo}/{ship_id}/{vessel_name}"
+
+    try:
+        response = await get_async_client().get(url, headers=MAP_INTELLIGENCE_HEADERS, timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+
+        if data is None:
+            return {
+                "error": "No data returned",
+                "message": "API returned null response for the vessel"
+            }
+
+        if not data:
+            return {
+                "error": "Empty response",
+                "message": "API returned empty data for the vessel"
+            }
+
+        return data
+
+    except httpx.TimeoutException:
+        return {
+            "error": "Request timeout",
+            "message": f"The API request timed out after {timeout:g} seconds"
+        }
+
+    except httpx.HTTPStatusError as e:
+        return {
+            "error": "HTTP error",
+            "status_code": e.response.status_code,
+            "message": str(e)
+        }
+
+    except (httpx.HTTPError, ValueError) as e:
+        # requests' JSONDecodeError is a RequestException, so the sync tool reports bad JSON here too
+        return {
+            "error": "Request failed",
+            "message": f"Failed to fetch vessel particulars: {str(e)}"
+        }
+
+    except Exception as e:
+        return {
+            "error": "Unexpected error",
+            "message": f"An unexpected error occurred: {str(e)}"
+        }
+
+
+async def acategorize_single_port_call(v: str, shipid: str, msgtype: str) -> dict:
+    url = "https://<your_url>/categorize-single-port-call"
+    params = {"v": v, "shipid": shipid, "msgtype": msgtype}
+
+    try:
+        response = await get_async_client().get(
+            url, headers=MAP_INTELLIGENCE_HEADERS, params=params,
+            timeout=endpoint_timeout("categorize_single_port_call"),
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        return _async_error(e, "TheOceann API", params=params, url=url)
+
+
+async def aexpected_port_arrivals(port_name: str, msg_type: str = "simple") -> dict:
+    url = "https://<your_url>/expected-port-arrivals"
+    params = {"portName": port_name, "msgType": msg_type}
+
+    try:
+        response = await get_async_client().get(
+            url, headers=MAP_INTELLIGENCE_HEADERS, params=params,
+            timeout=endpoint_timeout("expected_port_arrivals"),
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        return _async_error(e, "TheOceann API", params=params, url=url)
+
+
+async def aget_port_distance(
+    from_port: str,
+    to_port: str,
+    localEca: int = 1,
+    seca: int = 3,
+    canalOptions: str = "111",
+    piracyArea: str = "001"
+) -> dict:
+    url = "https://<your_url>/distance"
+    payload = {
+        "from": from_port,
+        "to": to_port,
+        "localEca": localEca,
+        "seca": seca,
+        "canalOptions": canalOptions,
+        "piracyArea": piracyArea
+    }
+
+    cache_key = _port_distance_cache_key(payload)
+    cached = port_distance_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        response = await get_async_client().post(
+            url, json=payload, headers=DISTANCE_HEADERS, timeout=endpoint_timeout("get_port_distance")
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        if is_cacheable(data):
+            port_distance_cache.set(cache_key, data)
+
+        return data
+    except Exception as e:
+        return _offline_distance_fallback(
+            payload, _async_error(e, "TheOceann Distance API", url=url, payload=payload)
+        )
+
+
+async def _afetch_bunker_spotprice(port_name: str) -> dict:
+    url = (
+        "https://<your_url>/port-bunker-activity/"
+        f"searchport-full?portName={port_name}"
+    )
+
+    try:
+        response = await get_async_client().get(
+            url, headers=BUNKER_PRICE_HEADERS, timeout=endpoint_timeout("get_bunker_spotprice_by_port")
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        return _async_error(e, "TheOceann API", url=url, port_name=port_name)
+
+
+async def aget_bunker_spotprice_by_port(port_name: str) -> dict:
+    return await bunker_price_store.aget(port_name)
+
+
+async def aget_bunker_spotprices_for_ports(port_names: list[str]) -> dict:
+    return {"status": "success", "ports": await bunker_price_store.aget_many(port_names)}
+
+
+async def aget_weather_speed(payload: dict) -> dict:
+    url = "https://<your_url>/get-weather-speed"
+
+    try:
+        response = await get_async_client().post(
+            url, json=payload, headers=WEATHER_SPEED_HEADERS, timeout=endpoint_timeout("get_weather_speed")
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        return _async_error(e, "TheOceann Weather Speed API", url=url, payload=payload)
+
+
+async def abest_match_cargo(cargo_size: int, cargo_type: str, load_port: str, change_tab: str) -> dict:
+    url = "https://<your_url>/best-match-cargo"
+    payload = {
+        "cargo_size": cargo_size,
+        "cargo_type": cargo_type,
+        "load_port": load_port,
+        "change_tab": change_tab
+    }
+
+    try:
+        response = await get_async_client().post(
+            url, json=payload, headers=CARGO_MATCH_HEADERS, timeout=endpoint_timeout("best_match_cargo")
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        return _async_error(e, "Best-Match-Cargo API", url=url, payload=payload)
+
+
+async def amatch_open_vessels(dwt: str, open_port: str) -> dict:
+    url = "https://<your_url>/best_match_vessel"
+    payload = {"dwt": dwt, "open_port": open_port}
+
+    try:
+        response = await get_async_client().post(
+            url, json=payload, headers=VESSEL_MATCH_HEADERS, timeout=endpoint_timeout("match_open_vessels")
+        )
+        response.raise_for_status()
+        return response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        # a non-JSON body is a RequestException in the sync tool
+        response = getattr(e, "response", None)
+        return {
+            "status": "error",
+            "reason": "network_or_http",
+            "message": "Vessel service reachable but request failed.",
+            "debug": {
+                "error": str(e),
+                "raw_response": getattr(response, "text", None)
+            }
+        }
+
+
+# Lloyd's records rarely change: regular tonnage goes over the wire at most once a day.
+vessel_particulars_cache = ParticularsCache(
+    fetcher=_fetch_vessel_particulars,
+    afetcher=_afetch_vessel_particulars,
+    cache=SqliteCache(
+        "vessel_particulars",
+        max_entries=int(os.getenv("PARTICULARS_CACHE_MAX_ENTRIES", "20000")),
+        compress=True,
+    ),
+    static_ttl=float(os.getenv("PARTICULARS_STATIC_TTL_DAYS", "90")) * 86400,
+    volatile_ttl=float(os.getenv("PARTICULARS_VOLATILE_TTL_HOURS", "24")) * 3600,
+)
+
+
+def prefetch_vessel_particulars(fleet: list[dict]) -> dict:
+    """
+    Bulk-warm the particulars cache for a fleet list of
+    {"mmsi", "imo", "ship_id", "vessel_name"} dicts.
+    """
+    return vessel_particulars_cache.prefetch(fleet)
+
+# Spot prices move a few times a day: serve snapshots, refresh in the background.
+bunker_price_store = BunkerPriceStore(
+    fetcher=_fetch_bunker_spotprice,
+    afetcher=_afetch_bunker_spotprice,
+    cache=SqliteCache(
+        "bunker_prices",
+        max_entries=int(os.getenv("BUNKER_PRICE_CACHE_MAX_ENTRIES", "2000")),
+        compress=True,
+    ),
+    fresh_seconds=float(os.getenv("BUNKER_PRICE_FRESH_MINUTES", "240")) * 60,
+    max_stale_seconds=float(os.getenv("BUNKER_PRICE_MAX_STALE_HOURS", "48")) * 3600,
+)
+
+get_vessels_by_name.coroutine = aget_vessels_by_name
+get_vessel_particulars.coroutine = aget_vessel_particulars
+categorize_single_port_call.coroutine = acategorize_single_port_call
+expected_port_arrivals.coroutine = aexpected_port_arrivals
+get_port_distance.coroutine = aget_port_distance
+get_bunker_spotprice_by_port.coroutine = aget_bunker_spotprice_by_port
+get_bunker_spotprices_for_ports.coroutine = aget_bunker_spotprices_for_ports
+get_weather_speed.coroutine = aget_weather_speed
+best_match_cargo.coroutine = abest_match_cargo
+match_open_vessels.coroutine = amatch_open_vessels
+
 @tool 
 def calculate_dwt(cargo_quantity: float) -> dict:
     """
@@ -619,6 +1103,75 @@ def calculate_dwt(cargo_quantity: float) -> dict:
     """
     return {"dwt": cargo_quantity + (cargo_quantity / 10)}
 
+@tool
+def record_voyage_inputs(
+    cargo_quantity: float = None,
+    freight_rate: float = None,
+    freight_is_lumpsum: bool = None,
+    load_port: str = None,
+    discharge_port: str = None,
+    hire_rate: float = None,
+    weather_factor_pct: float = None,
+    address_commission_pct: float = None,
+    selected_vessel_name: str = None,
+    selected_vessel_open_port: str = None,
+    selected_vessel_speed_consumption: str = None,
+    ballast_speed: float = None,
+    laden_speed: float = None,
+    ballast_consumption: float = None,
+    laden_consumption: float = None,
+    fuel_type: str = None,
+) -> dict:
+    """
+    Record voyage inputs as soon as the user gives (or changes) them.
+    Pass ONLY the values given in the latest message.
+
+    The pure calculation / lookup steps (DWT, vessel match, vessel particulars,
+    speed parsing, route distance, voyage days, bunkers, bunker prices) then
+    run automatically and their tool results appear in the conversation.
+
+    Args:
+        cargo_quantity, freight_rate, freight_is_lumpsum, load_port,
+        discharge_port, hire_rate: Step 1 inputs.
+        weather_factor_pct, address_commission_pct: Step 1B optional inputs
+            (record 0 when the user skips them).
+        selected_vessel_name, selected_vessel_open_port,
+        selected_vessel_speed_consumption: the Step 3 vessel selection, as
+            shown in the match_open_vessels result.
+        ballast_speed, laden_speed, ballast_consumption, laden_consumption,
+        fuel_type: manually entered speed / consumption (Step 6 manual input).
+
+    Returns:
+        dict: {"status": "success", "recorded": {...}} or an invalid_input error.
+    """
+    values = {k: v for k, v in locals().items() if v is not None and v != ""}
+
+    positive = (
+        "cargo_quantity", "freight_rate", "hire_rate",
+        "ballast_speed", "laden_speed", "ballast_consumption", "laden_consumption",
+    )
+    non_negative = ("weather_factor_pct", "address_commission_pct")
+
+    for key in positive + non_negative:
+        if key not in values:
+            continue
+        try:
+            values[key] = float(values[key])
+        except (TypeError, ValueError):
+            return {"status": "error", "type": "invalid_input", "message": f"{key} must be numeric."}
+        if values[key] < 0 or (key in positive and values[key] == 0):
+            return {
+                "status": "error",
+                "type": "invalid_input",
+                "message": f"{key} must be {'greater than zero' if key in positive else 'zero or more'}.",
+            }
+
+    for key in ("load_port", "discharge_port", "selected_vessel_name", "selected_vessel_open_port", "fuel_type"):
+        if key in values:
+            values[key] = str(values[key]).strip()
+
+    return {"status": "success", "recorded": values}
+
 @tool
 def parse_speed_and_consumption_ai(
     speed_and_consumption: str = None,
@@ -629,39 +1182,41 @@ def parse_speed_and_consumption_ai(
     manual_fuel_type: str = None,
 ) -> dict:
     """
-    AI → Try to extract speed + consumption.
+    RULES → Deterministic grammar for the common speed/consumption formats.
+    AI → Try to extract speed + consumption when the rules are not fully confident.
     MANUAL → If AI fails, force user to enter all values.
     """
 
     # ---------------------------------
-    # ✅ 1. TRY AI EXTRACTION FIRST
+    # ✅ 0. DETERMINISTIC FAST PATH (no LLM round trip)
     # ---------------------------------
     if speed_and_consumption and isinstance(speed_and_consumption, str):
+        parsed = parse_speed_consumption(speed_and_consumption)
 
-        prompt = f"""
-You are a maritime technical data parser.
-
-Extract and normalize this vessel data:
-
-INPUT:
-{speed_and_consumption}
+        if parsed["confident"]:
+            return {
+                "status": "auto_extracted",
+                "ballast_speed": parsed["ballast_speed"],
+                "laden_speed": parsed["laden_speed"],
+                "ballast_consumption": parsed["ballast_consumption"],
+                "laden_consumption": parsed["laden_consumption"],
+                "fuel_type": parsed["fuel_type"],
+                "operating_mode": parsed["operating_mode"],
+                "modes": parsed["modes"],
+                "wog": parsed["wog"],
+                "mode": "rules"
+            }
 
-Return STRICT JSON:
+    # ---------------------------------
+    # ✅ 1. TRY AI EXTRACTION
+    # ---------------------------------
+    if speed_and_consumption and isinstance(speed_and_consumption, str):
 
-{{
-  "ballast_speed": float | null,
-  "laden_speed": float | null,
-  "ballast_consumption": float | null,
-  "laden_consumption": float | null,
-  "fuel_type": string | null
-}}
+        cached = speed_parse_memo.get(speed_and_consumption)
+        if cached is not None:
+            return {**cached, "mode": "ai_cached"}
 
-Rules:
-- Fix broken decimals like "11, 80" → 11.8
-- If only one speed → use it for both
-- If only one consumption → use it for both
-- If nothing found → return all fields as null
-"""
+        prompt = SPEED_PARSE_PROMPT.format(speed_and_consumption=speed_and_consumption)
 
         try:
             resp = llm_parser.invoke(prompt)
@@ -675,15 +1230,16 @@ Rules:
                 parsed.get("ballast_consumption") is not None and
                 parsed.get("laden_consumption") is not None
             ):
-                return {
+                result = {
                     "status": "auto_extracted",
                     "ballast_speed": parsed["ballast_speed"],
                     "laden_speed": parsed["laden_speed"],
                     "ballast_consumption": parsed["ballast_consumption"],
                     "laden_consumption": parsed["laden_consumption"],
                     "fuel_type": parsed.get("fuel_type", "VLSFO"),
-                    "mode": "ai"
                 }
+                speed_parse_memo.set(speed_and_consumption, result)
+                return {**result, "mode": "ai"}
 
         except Exception:
             pass  # ✅ HARD FAIL → Fall through to manual
@@ -788,6 +1344,73 @@ def compute_bunker_consumption(
         "fuel_type": fuel_type or "VLSFO"
     }
 
+@tool
+def compute_voyage_itinerary(legs: list, speeds: dict = None) -> dict:
+    """
+    Days and bunkers for a whole multi-leg voyage in ONE call.
+
+    Args:
+        legs (list): Ordered legs, each one of
+            {"type": "ballast" | "laden", "from": port, "to": port, "distance_nm",
+             "speed_knots", "consumption_mt_per_day", "fuel_type", "eca_fraction",
+             "weather_factor_pct"}
+            {"type": "port", "port": name, "days", "consumption_mt_per_day", "fuel_type"}
+            Sea legs without distance_nm are resolved with get_port_distance
+            (their ECA share from the route's SECA length).
+        speeds (dict): Defaults for missing leg values — the validated
+            parse_speed_and_consumption_ai result (ballast_speed, laden_speed,
+            ballast_consumption, laden_consumption, port_consumption, fuel_type).
+
+    Returns:
+        dict: per-leg days / bunkers, ballast / laden / sea / port / total days,
+        distances, bunkers_by_fuel and total_bunker_mt.
+    """
+    legs = [dict(leg) for leg in (legs or [])]
+
+    # --------- RESOLVE MISSING DISTANCES (CONCURRENTLY, CACHED) ---------
+    pending = [
+        leg for leg in legs
+        if str(leg.get("type", "")).lower() != "port"
+        and not leg.get("distance_nm") and leg.get("from") and leg.get("to")
+    ]
+
+    def resolve(leg: dict) -> dict:
+        return get_port_distance.func(from_port=leg["from"], to_port=leg["to"])
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(8, len(pending)), thread_name_prefix="itinerary") as pool:
+            routes = list(pool.map(resolve, pending))
+
+        for leg, route in zip(pending, routes):
+            distance = route.get("distance") if isinstance(route, dict) else None
+            if not distance:
+                return {
+                    "status": "error",
+                    "type": "distance_unavailable",
+                    "message": f"No distance for {leg['from']} → {leg['to']}.",
+                    "details": route,
+                }
+            leg["distance_nm"] = float(distance)
+            if leg.get("eca_fraction") is None and route.get("secaLength") is not None:
+                leg["eca_fraction"] = min(1.0, float(route["secaLength"]) / float(distance))
+
+    try:
+        result = compute_itinerary(legs, speeds)
+    except ValueError as e:
+        return {"status": "error", "type": "invalid_input", "message": str(e)}
+
+    # ✅ Same 2-decimal presentation as compute_voyage_days / compute_bunker_consumption
+    for leg in result["legs"]:
+        for key in ("distance_nm", "sea_days", "port_days", "eca_days", "days"):
+            leg[key] = round(leg[key], 2)
+        leg["bunkers_mt"] = {fuel: round(mt, 2) for fuel, mt in leg["bunkers_mt"].items()}
+    for key, value in result.items():
+        if isinstance(value, float):
+            result[key] = round(value, 2)
+    result["bunkers_by_fuel"] = {fuel: round(mt, 2) for fuel, mt in result["bunkers_by_fuel"].items()}
+
+    return {"status": "success", **result}
+
 @tool
 def calculate_required_freight_rate(target_tce: float, voyage_days: int, voyage_cost: float, cargo_qty: float) -> dict:
     """
@@ -1025,6 +1648,59 @@ def calculate_reverse_tce(total_revenue: float, total_voyage_cost: float, voyage
             }
         }
 
+@tool
+def calculate_reverse_solutions_batch(solver: str, inputs: dict, labels: list = None) -> dict:
+    """
+    Batch version of the reverse solvers: one call for a whole candidate list.
+
+    Args:
+        solver (str): One of
+            "required_freight_rate"  (target_tce, voyage_days, voyage_cost, cargo_qty),
+            "reverse_freight_rate"   (cargo_qty, voyage_cost, expected_profit, commission_pct),
+            "reverse_daily_hire"     (cargo_qty, freight_rate, hire_days, voyage_cost_excl_hire, expected_profit),
+            "reverse_tce"            (total_revenue, total_voyage_cost, voyage_days).
+        inputs (dict): The solver's arguments, each a single value shared by all
+            rows or a list with one value per row (e.g. per vessel).
+            Example: {"cargo_qty": 55000, "voyage_cost": [812000, 790500, 845250], "expected_profit": 0}
+        labels (list): Optional row labels (e.g. vessel names), returned as-is.
+
+    Returns:
+        dict: Columnar results — one list per output, plus "valid" (per-row mask)
+        and "errors" (per-row message or None). Invalid rows have null outputs.
+    """
+    try:
+        batch = reverse_solve_batch(solver, inputs)
+    except ValueError as e:
+        return {"status": "error", "type": "invalid_input", "message": str(e)}
+
+    count = batch["valid"].size
+    if labels is not None and len(labels) != count:
+        return {
+            "status": "error",
+            "type": "invalid_input",
+            "message": f"Got {len(labels)} labels for {count} rows.",
+        }
+
+    results = {}
+    for name, column in batch.items():
+        if name in ("valid", "error"):
+            continue
+        values = column.tolist()
+        if column.dtype.kind == "f":
+            values = [None if v != v else v for v in values]  # NaN → null
+        results[name] = values
+
+    return {
+        "status": "success",
+        "solver": solver,
+        "count": count,
+        "valid_count": int(batch["valid"].sum()),
+        "labels": labels,
+        "valid": batch["valid"].tolist(),
+        "errors": batch["error"].tolist(),
+        "results": results,
+    }
+
 @tool
 def calculate_voyage_pnl(
     cargo_rows: list,
@@ -1082,151 +1758,42 @@ def calculate_voyage_pnl(
 
     try:
         # ------------------------------
-        # 1. HANDLE DEFAULTS
-        # ------------------------------
-        if demurrage_commission_pct is None:
-            demurrage_commission_pct = broker_commission
-
-        cargo_rows = cargo_rows or []
-        demurrage_rows = demurrage_rows or []
-        despatch_rows = despatch_rows or []
-
-        # bunkers = bunkers or {}
-        # sea_days = bunkers.get("sea_days", 0.0)
-        # sea_cons = bunkers.get("sea_cons", 0.0)
-        # sea_cost = bunker_sea_cost_per_mt if bunker_sea_cost_per_mt is not None else bunkers.get("sea_cost", 0.0)
-
-        # base_port_days = bunkers.get("port_days", 0.0)
-        # effective_port_days = port_days if port_days is not None else base_port_days
-        # port_cons = bunkers.get("port_cons", 0.0)
-        # port_cost = bunker_port_cost_per_mt if bunker_port_cost_per_mt is not None else bunkers.get("port_cost", 0.0)
-
-        # effective_sea_days = sea_days * weather_factor
-
-        # ------------------------------
-        # 2. FREIGHT
-        # ------------------------------
-        total_freight = 0.0
-        total_freight_commission = 0.0
-        total_freight_tax = 0.0
-
-        for row in cargo_rows:
-            row_cp_qty = float(row.get("cp_qty", 0.0))
-            row_option_pct = row.get("option_pct", None)
-            frt_rate = float(row.get("frt_rate", 0.0))
-            lumpsum = float(row.get("lumpsum", 0.0))
-
-            if option_qty is not None:
-                effective_qty = row_cp_qty + float(option_qty)
-            else:
-                pct = row_option_pct if row_option_pct is not None else option_percentage
-                effective_qty = row_cp_qty * (1.0 + float(pct))
-
-            freight = lumpsum if lumpsum > 0 else effective_qty * frt_rate
-
-            freight_commission = freight * float(broker_commission)
-            freight_tax = freight * float(freight_tax_pct)
-
-            total_freight += freight
-            total_freight_commission += freight_commission
-            total_freight_tax += freight_tax
-
-        # ------------------------------
-        # 3. DEMURRAGE & DESPATCH
+        # 1. COLUMNAR CARGO / DEMURRAGE / DESPATCH ROWS
         # ------------------------------
-        total_demurrage = sum(float(x.get("amount", 0.0)) for x in demurrage_rows)
-        total_despatch = sum(float(x.get("amount", 0.0)) for x in despatch_rows)
-
-        total_demurrage_commission = total_demurrage * float(demurrage_commission_pct)
-        total_despatch_commission = total_despatch * float(despatch_commission_pct)
+        cargo = cargo_columns(cargo_rows)
+        demurrage = amount_column(demurrage_rows)
+        despatch = amount_column(despatch_rows)
 
         # ------------------------------
-        # 4. REVENUE
+        # 2. FREIGHT, REVENUE, EXPENSE, RESULTS, BREAKEVEN (vectorized)
         # ------------------------------
-        gross_revenue = total_freight + mis_revenue + total_demurrage - total_despatch
-
-        total_revenue_commissions = (
-            total_freight_commission +
-            total_demurrage_commission +
-            total_despatch_commission +
-            total_freight_tax
+        results = voyage_pnl_columns(
+            cargo,
+            demurrage,
+            despatch,
+            mis_revenue=mis_revenue,
+            broker_commission=broker_commission,
+            voyage_days=voyage_days,
+            hire_rate=hire_rate,
+            tci_add_com=tci_add_com,
+            tci_broker_com=tci_broker_com,
+            port_expenses=port_expenses,
+            misc_expenses=misc_expenses,
+            address_commission=address_commission,
+            option_percentage=option_percentage,
+            freight_tax_pct=freight_tax_pct,
+            demurrage_commission_pct=demurrage_commission_pct,
+            despatch_commission_pct=despatch_commission_pct,
+            canal_cost=canal_cost,
+            ballast_bonus=ballast_bonus,
+            suez_bonus=suez_bonus,
+            cp_qty=cp_qty,
+            option_qty=option_qty,
         )
 
-        net_revenue = gross_revenue - total_revenue_commissions
-
-        # ------------------------------
-        # 5. HIRE
-        # ------------------------------
-        vessel_hire_cost = float(hire_rate) * float(voyage_days)
-
-        tci_add_commission_value = vessel_hire_cost * float(tci_add_com)
-        tci_broker_commission_value = vessel_hire_cost * float(tci_broker_com)
-
-        # ------------------------------
-        # 6. BUNKERS
-        # ------------------------------
-        # bunker_sea_amount = effective_sea_days * sea_cons * sea_cost
-        # bunker_port_amount = effective_port_days * port_cons * port_cost
-        # total_bunker_expense = bunker_sea_amount + bunker_port_amount
-        total_bunker_expense = 0.0
-
-        # ------------------------------
-        # 7. EXPENSE
-        # ------------------------------
-        gross_expense = (
-            vessel_hire_cost +
-            port_expenses +
-            misc_expenses +
-            total_bunker_expense +
-            canal_cost +
-            ballast_bonus +
-            suez_bonus
-        )
-
-        net_expense = gross_expense - (tci_add_commission_value + tci_broker_commission_value)
-
-        # ------------------------------
-        # 8. RESULTS
-        # ------------------------------
-        pnl = net_revenue - net_expense
-        daily_profit = pnl / voyage_days if voyage_days > 0 else 0.0
-
-        address_commission_value_on_hire = vessel_hire_cost * float(address_commission)
-
-        tce_numerator = net_revenue - (
-            gross_expense - (vessel_hire_cost + ballast_bonus + suez_bonus - address_commission_value_on_hire)
-        )
-
-        tce = tce_numerator / voyage_days if voyage_days > 0 else 0.0
-        gross_tce = tce / (1.0 - float(address_commission)) if address_commission < 1 else tce
-
-        # ------------------------------
-        # 9. BREAKEVEN
-        # ------------------------------
-        if cp_qty is not None:
-            total_cargo_qty = float(cp_qty) + float(option_qty or 0.0)
-        else:
-            total_cargo_qty = sum(
-                float(r.get("cp_qty", 0.0)) * (1.0 + float(r.get("option_pct", option_percentage)))
-                for r in cargo_rows
-            )
-
-        if total_cargo_qty > 0:
-            effective_comm_factor = 1.0 - float(broker_commission)
-            break_even_freight = net_expense / (total_cargo_qty * effective_comm_factor)
-        else:
-            break_even_freight = 0.0
-
         return {
             "status": "success",
-            "results": {
-                "pnl": pnl,
-                "daily_profit": daily_profit,
-                "tce": tce,
-                "gross_tce": gross_tce,
-                "break_even_freight_usd_per_mt": break_even_freight,
-                "total_cargo_qty_mt": total_cargo_qty,
-            }
+            "results": results,
         }
 
     except Exception as e:
@@ -1344,3 +1911,338 @@ def calculate_quick_voyage_pnl(
         "gross_tce": gross_tce,
         "break_even_freight_usd_per_mt": break_even_freight,
     }
+
+@tool
+def calculate_quick_voyage_pnl_grid(
+    base_inputs: dict,
+    sensitivities: dict,
+    max_scenarios: int = 200,
+) -> dict:
+    """
+    Sensitivity table for calculate_quick_voyage_pnl in ONE call.
+
+    Args:
+        base_inputs (dict): The same arguments as calculate_quick_voyage_pnl
+            (cargo_quantity_mt, freight_rate, freight_is_lumpsum, voyage_days,
+            hire_rate_per_day, total_bunker_mt, bunker_price_per_mt, ...).
+        sensitivities (dict): Inputs to vary, each as a list of values or a range
+            {"start", "stop", "step"} / {"start", "stop", "num"}.
+            Example: {"freight_rate": [20, 22.5, 25], "bunker_price_per_mt": {"start": 500, "stop": 700, "step": 50}}
+        max_scenarios (int): Return every scenario row up to this grid size;
+            larger grids return ranges and best / worst scenarios only.
+
+    Returns:
+        dict: axes, grid shape, per-scenario rows (revenue, cost, P&L, TCE,
+        gross TCE, breakeven freight) and a P&L / TCE summary.
+    """
+    try:
+        grid = scenario_grid(base_inputs, sensitivities)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"status": "error", "type": "invalid_input", "message": str(e)}
+
+    count = int(np.prod(grid["shape"]))
+    result = {
+        "status": "success",
+        "axes": {name: values.tolist() for name, values in grid["axes"].items()},
+        "shape": list(grid["shape"]),
+        "scenario_count": count,
+        "summary": {
+            "pnl": grid_summary(grid, "pnl"),
+            "tce": grid_summary(grid, "tce"),
+        },
+    }
+
+    if count <= max_scenarios:
+        result["scenarios"] = grid_rows(grid)
+    else:
+        result["note"] = f"{count} scenarios; narrow the ranges to list individual rows."
+
+    return result
+
+
+@tool
+def solve_voyage_target(
+    base_inputs: dict,
+    solve_for: str,
+    metric: str = "pnl",
+    target: float = 0.0,
+    bounds: list = None,
+) -> dict:
+    """
+    Breakeven / target solver for the quick voyage P&L: finds the value of ONE
+    input that makes a metric hit a target, in a single call.
+
+    Args:
+        base_inputs (dict): calculate_quick_voyage_pnl arguments. Instead of
+            voyage_days / total_bunker_mt you may give distance_nm, speed_knots,
+            port_days, sea_consumption_mt_per_day (at reference_speed_knots,
+            cube law) and port_consumption_mt_per_day.
+        solve_for (str): The input to solve for, e.g. "bunker_price_per_mt",
+            "hire_rate_per_day", "freight_rate", "port_days", "speed_knots".
+        metric (str): "pnl" (default), "tce", "gross_tce", "daily_profit", ...
+        target (float): Target value of the metric (0 = breakeven).
+        bounds (list): Optional [low, high] search range for the input.
+
+    Returns:
+        dict: value, all solutions within the bounds, method
+        ("closed_form" or "bracketed") and the achieved metric; a
+        "no_solution" error when no value within the bounds reaches the target.
+    """
+    try:
+        result = solve_target(base_inputs, solve_for, metric=metric, target=target, bounds=bounds)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"status": "error", "type": "invalid_input", "message": str(e)}
+
+    if result["value"] is None:
+        lo, hi = result["range"]["bounds"]
+        message = f"No {solve_for} within the search range {lo:g} … {hi:g} reaches {metric} = {target}."
+        if "out_of_bounds_value" in result:
+            message += f" It would take {solve_for} = {result['out_of_bounds_value']:g}."
+        return {
+            "status": "error",
+            "type": "no_solution",
+            "message": message,
+            **result,
+        }
+    return {"status": "success", **result}
+
+
+@tool
+def optimise_voyage_speed(
+    base_inputs: dict,
+    laden_distance_nm: float,
+    speed_and_consumption: dict,
+    ballast_distance_nm: float = 0.0,
+    port_days: float = 0.0,
+    port_consumption_mt_per_day: float = 0.0,
+    objective: str = "tce",
+    min_speed: float = None,
+    max_speed: float = None,
+) -> dict:
+    """
+    Speed optimisation: the service speed(s) that maximise TCE (default),
+    daily profit or P&L for this voyage.
+
+    Args:
+        base_inputs (dict): calculate_quick_voyage_pnl arguments WITHOUT
+            voyage_days and total_bunker_mt (cargo_quantity_mt, freight_rate,
+            freight_is_lumpsum, hire_rate_per_day, bunker_price_per_mt, costs,
+            commissions, weather_factor_pct).
+        laden_distance_nm (float): Load → discharge distance.
+        speed_and_consumption (dict): The validated parse_speed_and_consumption_ai
+            result; ballast / laden points of every mode (eco, full, ...) are
+            fitted to consumption = base + k × speed³.
+        ballast_distance_nm (float): Open port → load port distance (0 = none);
+            when given, the ballast speed is optimised too.
+        port_days (float): Days in port.
+        port_consumption_mt_per_day (float): Port consumption.
+        objective (str): "tce", "daily_profit" or "pnl".
+        min_speed (float), max_speed (float): Optional sweep range in knots.
+
+    Returns:
+        dict: optimal speed(s) with days, bunkers, P&L and TCE; the same at the
+        parsed speeds and the improvement; a sweep table every 0.5 kn; the
+        fitted consumption curves.
+    """
+    try:
+        laden_curve = fit_consumption_curve(consumption_points(speed_and_consumption, "laden"))
+        ballast_curve = None
+        if ballast_distance_nm and ballast_distance_nm > 0:
+            ballast_curve = fit_consumption_curve(consumption_points(speed_and_consumption, "ballast"))
+
+        speed_range = None
+        if min_speed is not None or max_speed is not None:
+            speed_range = (min_speed or 0.0, max_speed or 99.0)
+
+        result = optimise_speed(
+            base_inputs,
+            laden_distance_nm=laden_distance_nm,
+            laden_curve=laden_curve,
+            ballast_distance_nm=ballast_distance_nm or 0.0,
+            ballast_curve=ballast_curve,
+            port_days=port_days or 0.0,
+            port_consumption=port_consumption_mt_per_day or 0.0,
+            objective=objective,
+            speed_range=speed_range,
+            current={
+                "laden_speed": speed_and_consumption.get("laden_speed"),
+                "ballast_speed": speed_and_consumption.get("ballast_speed"),
+            },
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        return {"status": "error", "type": "invalid_input", "message": str(e)}
+
+    curves = {"laden": laden_curve}
+    if ballast_curve is not None:
+        curves["ballast"] = ballast_curve
+
+    return {"status": "success", **result, "consumption_curves": curves}
+
+
+@tool
+def simulate_voyage_pnl_risk(
+    base_inputs: dict,
+    distributions: dict,
+    n_samples: int = 100000,
+    seed: int = None,
+    model: str = "quick",
+) -> dict:
+    """
+    Monte Carlo risk profile of calculate_quick_voyage_pnl (model "quick")
+    or calculate_voyage_pnl (model "full").
+
+    Args:
+        base_inputs (dict): The fixed arguments of the chosen model:
+            "quick" → calculate_quick_voyage_pnl (cargo_quantity_mt, freight_rate,
+            freight_is_lumpsum, voyage_days, ...); "full" → calculate_voyage_pnl
+            (cargo_rows, demurrage_rows, despatch_rows, hire_rate, voyage_days, ...;
+            no bunkers argument).
+        distributions (dict): Uncertain inputs, each as one of
+            {"dist": "normal", "mean", "std"}, {"dist": "lognormal", "mean", "std"},
+            {"dist": "uniform", "low", "high"}, {"dist": "triangular", "low", "mode", "high"},
+            {"dist": "choice", "values", "probs"}; optional "min" / "max" clip the samples.
+            "port_days" may be given to add port delays on top of voyage_days, and
+            speed / distance / consumption inputs as in solve_voyage_target
+            (the full model takes distance_nm / speed_knots / port_days only).
+            Example: {"bunker_price_per_mt": {"dist": "normal", "mean": 620, "std": 60},
+                      "port_days": {"dist": "triangular", "low": 0, "mode": 1, "high": 5}}
+        n_samples (int): Number of simulated voyages (default 100,000).
+        seed (int): Optional seed for reproducible results.
+        model (str): "quick" (default) or "full".
+
+    Returns:
+        dict: P&L / TCE mean, std, min, max and percentiles (p1 … p99),
+        probability of loss, VaR and CVaR at 95% / 99%.
+    """
+    try:
+        result = simulate(base_inputs, distributions, n_samples=n_samples, seed=seed, model=model)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"status": "error", "type": "invalid_input", "message": str(e)}
+
+    return {"status": "success", **result}
+
+
+@tool
+def rank_open_vessels(
+    dwt: str,
+    load_port: str,
+    discharge_port: str,
+    cargo_inputs: dict,
+    speeds: dict = None,
+    port_days: float = 0.0,
+    port_consumption_mt_per_day: float = 0.0,
+    objective: str = "tce",
+    top_n: int = 10,
+) -> dict:
+    """
+    Rank ALL vessels returned by match_open_vessels for this cargo in ONE call.
+
+    For every matched vessel: ballast distance from its open port to the load
+    port, ballast + laden days, bunkers and the quick P&L (TCE, daily profit,
+    P&L). Distances (one per distinct open port) and particulars are fetched
+    concurrently through the caches; the voyage math runs as one batch.
+
+    Args:
+        dwt (str): DWT as passed to match_open_vessels.
+        load_port (str): Load port (the match_open_vessels open_port).
+        discharge_port (str): Discharge port.
+        cargo_inputs (dict): calculate_quick_voyage_pnl arguments WITHOUT
+            voyage_days / total_bunker_mt (cargo_quantity_mt, freight_rate,
+            freight_is_lumpsum, bunker_price_per_mt, hire_rate_per_day, port_cost_usd, ...).
+            hire_rate_per_day is used for vessels without their own hire rate.
+        speeds (dict): Fallback ballast_speed / laden_speed / ballast_consumption /
+            laden_consumption for vessels whose own figures are unknown.
+        port_days (float): Days in port (load + discharge).
+        port_consumption_mt_per_day (float): Port consumption.
+        objective (str): "tce" (default), "daily_profit" or "pnl".
+        top_n (int): Number of ranked vessels to return.
+
+    Returns:
+        dict: ranked vessels (best first) with voyage days, bunkers, TCE and P&L,
+        plus the vessels that could not be evaluated and why.
+    """
+    matched = match_open_vessels.func(dwt=dwt, open_port=load_port)
+    if isinstance(matched, dict) and matched.get("status") == "error":
+        return matched
+
+    candidates = fleet_candidates(matched, limit=FLEET_MAX_CANDIDATES)
+    if not candidates:
+        return {
+            "status": "error",
+            "type": "no_candidates",
+            "message": f"No matched vessels for {dwt} DWT open at {load_port}.",
+        }
+
+    # --------- CONCURRENT, CACHED LOOKUPS ---------
+    load_key = load_port.strip().upper()
+    ports = [p for p in unique_open_ports(candidates) if p != load_key]
+    need_particulars = [c for c in candidates if not c["parsed_speeds"]]
+
+    def distance(from_port: str, to_port: str):
+        route = get_port_distance.func(from_port=from_port, to_port=to_port)
+        value = route.get("distance") if isinstance(route, dict) else None
+        return float(value) if value else None
+
+    def particulars(c: dict) -> dict:
+        return vessel_particulars_cache.get(
+            c["mmsi"] or "", c["imo"] or "", c["ship_id"] or "", c["name"], fields=PARTICULARS_FIELDS
+        )
+
+    with ThreadPoolExecutor(max_workers=FLEET_MAX_WORKERS, thread_name_prefix="fleet") as pool:
+        laden_future = pool.submit(distance, load_port, discharge_port)
+        route_futures = {p: pool.submit(distance, p, load_port) for p in ports}
+        particulars_futures = {id(c): pool.submit(particulars, c) for c in need_particulars}
+
+        laden_distance = laden_future.result()
+        ballast = {p: f.result() for p, f in route_futures.items()}
+        records = {k: f.result() for k, f in particulars_futures.items()}
+
+    if not laden_distance:
+        return {
+            "status": "error",
+            "type": "distance_unavailable",
+            "message": f"No distance for {load_port} → {discharge_port}.",
+        }
+
+    ballast[load_key] = 0.0
+    ballast_distances = [
+        ballast.get(c["open_port"].upper()) if c.get("open_port") else None for c in candidates
+    ]
+    vessel_figures = [vessel_speeds(c, records.get(id(c)), speeds) for c in candidates]
+
+    # --------- BATCH EVALUATION ---------
+    try:
+        rows = rank_fleet(
+            candidates,
+            vessel_figures,
+            ballast_distances,
+            laden_distance,
+            cargo_inputs,
+            port_days=float(port_days),
+            port_consumption=float(port_consumption_mt_per_day),
+            objective=objective,
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        return {"status": "error", "type": "invalid_input", "message": str(e)}
+
+    # ✅ Same 2-decimal presentation as the other voyage tools
+    for row in rows:
+        for key, value in row.items():
+            if isinstance(value, float):
+                row[key] = round(value, 2)
+
+    ranked = [r for r in rows if r["rank"] is not None]
+    excluded = [r for r in rows if r["rank"] is None]
+
+    return {
+        "status": "success",
+        "objective": objective,
+        "laden_distance_nm": round(laden_distance, 2),
+        "candidates": len(candidates),
+        "evaluated": len(ranked),
+        "ranked": ranked[: max(1, int(top_n))],
+        "excluded": [
+            {"vessel_name": r["vessel_name"], "open_port": r["open_port"], "reason": r["excluded_reason"]}
+            for r in excluded
+        ],
+    }
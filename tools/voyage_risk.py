@@ -0,0 +1,218 @@
+# ==========================
+# Standard Library Imports
+# ==========================
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# ==========================
+# Third-Party Libraries
+# ==========================
+import numpy as np
+
+# =========================
+# Custom
+# =========================
+from tools.pnl_engine import (
+    QUICK_PNL_INPUTS,
+    VOYAGE_PHYSICS_INPUTS,
+    VOYAGE_PNL_INPUTS,
+    expand_voyage_inputs,
+    quick_voyage_pnl_arrays,
+    voyage_pnl_arrays,
+)
+
+# ==========================
+# Simulation Configuration
+# ==========================
+BATCH_SIZE = int(os.getenv("VOYAGE_RISK_BATCH_SIZE", "250000"))
+MAX_SAMPLES = int(os.getenv("VOYAGE_RISK_MAX_SAMPLES", "20000000"))
+# Runs above this size are spread over a process pool
+PROCESS_POOL_THRESHOLD = int(os.getenv("VOYAGE_RISK_PROCESS_THRESHOLD", "2000000"))
+MAX_WORKERS = int(os.getenv("VOYAGE_RISK_MAX_WORKERS") or os.cpu_count() or 1)
+
+PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+
+# Voyage physics the full model takes (it has no bunker term, so no consumption)
+FULL_PHYSICS_INPUTS = ("distance_nm", "speed_knots", "port_days")
+
+
+def _full_voyage_pnl(**inputs) -> Dict[str, np.ndarray]:
+    return voyage_pnl_arrays(**expand_voyage_inputs(inputs))
+
+# model name → (accepted inputs, vectorized calculator)
+MODELS: Dict[str, Tuple[Sequence[str], Callable[..., Dict[str, np.ndarray]]]] = {
+    "quick": (
+        tuple(QUICK_PNL_INPUTS) + VOYAGE_PHYSICS_INPUTS,
+        lambda **inputs: quick_voyage_pnl_arrays(**expand_voyage_inputs(inputs)),
+    ),
+    # calculate_voyage_pnl: fixed cargo / demurrage / despatch rows, sampled scalars
+    "full": (VOYAGE_PNL_INPUTS + FULL_PHYSICS_INPUTS, _full_voyage_pnl),
+}
+
+
+# ==========================
+# Distributions
+# ==========================
+def draw(spec, rng: np.random.Generator, n: int):
+    """
+    Sample an input. `spec` is a fixed number or a dict:
+
+    - {"dist": "normal", "mean", "std"}
+    - {"dist": "lognormal", "mean", "std"}       (mean / std of the value itself)
+    - {"dist": "uniform", "low", "high"}
+    - {"dist": "triangular", "low", "mode", "high"}
+    - {"dist": "choice", "values", "probs"?}
+
+    Optional "min" / "max" clip the samples (e.g. no negative port days).
+    """
+    if not isinstance(spec, Mapping):
+        return spec
+
+    dist = str(spec.get("dist", "normal")).lower()
+
+    if dist == "normal":
+        samples = rng.normal(float(spec["mean"]), float(spec["std"]), n)
+    elif dist == "lognormal":
+        mean, std = float(spec["mean"]), float(spec["std"])
+        sigma2 = math.log1p((std / mean) ** 2)
+        samples = rng.lognormal(math.log(mean) - sigma2 / 2, math.sqrt(sigma2), n)
+    elif dist == "uniform":
+        samples = rng.uniform(float(spec["low"]), float(spec["high"]), n)
+    elif dist == "triangular":
+        samples = rng.triangular(float(spec["low"]), float(spec["mode"]), float(spec["high"]), n)
+    elif dist == "choice":
+        values = np.asarray(spec["values"], dtype=np.float64)
+        probs = spec.get("probs")
+        samples = rng.choice(values, n, p=None if probs is None else np.asarray(probs, dtype=np.float64))
+    else:
+        raise ValueError(f"Unknown distribution: {dist}")
+
+    if spec.get("min") is not None or spec.get("max") is not None:
+        samples = np.clip(samples, spec.get("min"), spec.get("max"))
+    return samples
+
+
+def _validate(model: str, base: Mapping, distributions: Mapping) -> None:
+    if model not in MODELS:
+        raise ValueError(f"Unknown model: {model}. Available: {', '.join(MODELS)}")
+
+    accepted = set(MODELS[model][0])
+    unknown = (set(base) | set(distributions)) - accepted
+    if unknown:
+        raise ValueError(f"Unknown inputs for model '{model}': {', '.join(sorted(unknown))}")
+
+
+def _simulate_batch(
+    model: str,
+    base: Mapping,
+    distributions: Mapping,
+    seed: np.random.SeedSequence,
+    n: int,
+    metrics: Sequence[str],
+) -> Dict[str, np.ndarray]:
+    """One vectorized batch (module-level so process-pool workers can import it)."""
+    rng = np.random.default_rng(seed)
+    inputs = dict(base)
+    for name, spec in distributions.items():
+        inputs[name] = draw(spec, rng, n)
+
+    outputs = MODELS[model][1](**inputs)
+    return {m: np.broadcast_to(outputs[m], (n,)).astype(np.float64, copy=False) for m in metrics}
+
+
+# ==========================
+# Risk Statistics
+# ==========================
+def _percentiles(sorted_values: np.ndarray, percentiles) -> np.ndarray:
+    """Linear-interpolated percentiles of an already sorted array (numpy's default method)."""
+    position = np.asarray(percentiles, dtype=np.float64) / 100 * (sorted_values.size - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, sorted_values.size - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def distribution_stats(sorted_values: np.ndarray) -> dict:
+    q = _percentiles(sorted_values, PERCENTILES)
+    return {
+        "mean": float(sorted_values.mean()),
+        "std": float(sorted_values.std()),
+        "min": float(sorted_values[0]),
+        "max": float(sorted_values[-1]),
+        "percentiles": {f"p{p}": float(v) for p, v in zip(PERCENTILES, q)},
+    }
+
+
+def loss_stats(sorted_pnl: np.ndarray) -> dict:
+    """Probability of loss, VaR (loss not exceeded with 95/99% confidence) and CVaR."""
+    stats = {"probability_of_loss": float(np.searchsorted(sorted_pnl, 0.0, side="left") / sorted_pnl.size)}
+
+    for confidence in (95, 99):
+        cutoff = float(_percentiles(sorted_pnl, [100 - confidence])[0])
+        tail = sorted_pnl[: np.searchsorted(sorted_pnl, cutoff, side="right")]
+        stats[f"var_{confidence}"] = max(0.0, -cutoff)
+        stats[f"cvar_{confidence}"] = float(max(0.0, -tail.mean())) if tail.size else 0.0
+
+    return stats
+
+
+# ==========================
+# Simulator
+# ==========================
+def simulate(
+    base: Mapping,
+    distributions: Mapping,
+    n_samples: int = 100_000,
+    model: str = "quick",
+    seed: Optional[int] = None,
+    metrics: Sequence[str] = ("pnl", "tce"),
+    workers: Optional[int] = None,
+    return_samples: bool = False,
+) -> dict:
+    """
+    Monte Carlo P&L: sample `distributions` on top of the fixed `base` inputs
+    in vectorized batches and summarise each metric.
+
+    Batches get independent child seeds of `seed`, so results are identical
+    whether they run in-process or on the process pool (used automatically
+    above PROCESS_POOL_THRESHOLD samples).
+    """
+    _validate(model, base, distributions)
+
+    n_samples = int(n_samples)
+    if not 0 < n_samples <= MAX_SAMPLES:
+        raise ValueError(f"n_samples must be between 1 and {MAX_SAMPLES}")
+
+    metrics = tuple(dict.fromkeys(("pnl",) + tuple(metrics)))
+    sizes = [BATCH_SIZE] * (n_samples // BATCH_SIZE)
+    if n_samples % BATCH_SIZE:
+        sizes.append(n_samples % BATCH_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    workers = MAX_WORKERS if workers is None else workers
+    use_pool = n_samples > PROCESS_POOL_THRESHOLD and workers > 1 and len(sizes) > 1
+
+    args = [(model, dict(base), dict(distributions), s, n, metrics) for s, n in zip(seeds, sizes)]
+
+    if use_pool:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes)), mp_context=context) as pool:
+            batches: List[dict] = list(pool.map(_simulate_batch, *zip(*args)))
+    else:
+        batches = [_simulate_batch(*a) for a in args]
+
+    samples = {m: np.concatenate([b[m] for b in batches]) for m in metrics}
+    ordered = {m: np.sort(v) for m, v in samples.items()}
+
+    result = {
+        "model": model,
+        "n_samples": n_samples,
+        "parallel": use_pool,
+        "metrics": {m: distribution_stats(ordered[m]) for m in metrics},
+        "risk": loss_stats(ordered["pnl"]),
+    }
+    if return_samples:
+        result["samples"] = samples
+    return result